@@ -15,3 +15,12 @@ class BuscarPersonaSerializer(serializers.Serializer):
         max_value=99_999_999,
         help_text="DNI de 7 u 8 dígitos",
     )
+
+
+class PrecargarPersonasSerializer(serializers.Serializer):
+    dnis = serializers.ListField(
+        child=serializers.IntegerField(min_value=1_000_000, max_value=99_999_999),
+        allow_empty=False,
+        max_length=1000,
+        help_text="Hasta 1000 DNIs; para listas más grandes usar manage.py precargar_personas",
+    )
@@ -1,9 +1,11 @@
 from django.urls import path
-from .views import EmitirTurno, BuscarPersona, ConfiguracionAreaAPI
+from .views import EmitirTurno, BuscarPersona, PrecargarPersonas, PosicionTurno, ConfiguracionAreaAPI
 
 urlpatterns = [
     path("personas/buscar/", BuscarPersona.as_view(), name="api_buscar_persona"),
+    path("personas/precargar/", PrecargarPersonas.as_view(), name="api_precargar_personas"),
     path("turnos/emitir/",   EmitirTurno.as_view(),   name="api_emitir_turno"),
+    path("turnos/<int:turno_id>/posicion/", PosicionTurno.as_view(), name="api_posicion_turno"),
     path("config/",          ConfiguracionAreaAPI.as_view(), name="api_config"),
     path("config/<int:area_id>/", ConfiguracionAreaAPI.as_view(), name="api_config_area"),
 ]
@@ -1,10 +1,12 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import permissions, status
 
 from apps.core import services
 from apps.core.models import Tramite, Turno, Area
-from .serializers import TurnoEmitirSerializer, BuscarPersonaSerializer
+from apps.core.services_aportes import AportesNoDisponible
+from apps.administracion.views import es_director
+from .serializers import TurnoEmitirSerializer, BuscarPersonaSerializer, PrecargarPersonasSerializer
 
 
 class BuscarPersona(APIView):
@@ -12,13 +14,20 @@ class BuscarPersona(APIView):
     POST  /api/personas/buscar/   {"dni": 12345678}
     200 → {"dni": 12345678, "nombre": "MARÍA", "apellido": "SÁNCHEZ"}
     404 → {"detail": "..."}
+    503 → {"detail": "..."}  (padrón no disponible y DNI desconocido localmente)
     """
     def post(self, request):
         ser = BuscarPersonaSerializer(data=request.data)
         ser.is_valid(raise_exception=True)
         dni = ser.validated_data["dni"]
 
-        datos = services.buscar_persona_por_dni(dni)
+        try:
+            datos = services.buscar_persona_por_dni(dni)
+        except AportesNoDisponible:
+            return Response(
+                {"detail": "Padrón no disponible, puede continuar con la emisión"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
         if not datos:
             return Response({"detail": "DNI no encontrado"}, status=status.HTTP_404_NOT_FOUND)
         
@@ -27,6 +36,25 @@ class BuscarPersona(APIView):
         return Response(resp)
 
 
+class EsDirector(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and es_director(request.user)
+
+
+class PrecargarPersonas(APIView):
+    """
+    POST  /api/personas/precargar/   {"dnis": [12345678, 23456789, ...]}
+    Resuelve los DNIs contra Aportes y los guarda en Persona (sólo Director/SuperAdmin).
+    200 → {"solicitados": 2, "encontrados": 2, "no_encontrados": 0, "sin_respuesta": 0, "guardados": 2}
+    """
+    permission_classes = [EsDirector]
+
+    def post(self, request):
+        ser = PrecargarPersonasSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        return Response(services.precargar_personas(ser.validated_data["dnis"]))
+
+
 class EmitirTurno(APIView):
     """
     POST  /api/turnos/emitir/
@@ -52,11 +80,9 @@ class EmitirTurno(APIView):
         except ValueError as e:
             return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        espera = Turno.objects.filter(
-            area=tramite.area,
-            estado_id=Turno.PENDIENTE,
-            fecha_hora_creacion__lt=turno.fecha_hora_creacion,
-        ).count()
+        # Turnos adelante en la cola (prioridad y llegada), desde la cola en memoria
+        posicion = services.posicion_en_cola(turno.id)
+        espera = posicion['adelante'] if posicion else 0
 
         nombre_visible = (
             turno.ticket.persona.nombre_completo
@@ -69,10 +95,28 @@ class EmitirTurno(APIView):
             "nombre":     nombre_visible,
             "tramite":    tramite.nombre,
             "espera":     espera,
+            "espera_estimada_min":     posicion['espera_estimada_min'] if posicion else None,
+            "espera_estimada_max_min": posicion['espera_estimada_max_min'] if posicion else None,
             "prioridad":  turno.ticket.prioridad,
         })
 
 
+class PosicionTurno(APIView):
+    """
+    GET  /api/turnos/<turno_id>/posicion/
+    Posición del turno en la cola de su área (para el QR / el celular).
+    200 → {"turno_id": 142, "numero_visible": 12, "estado_id": 0, "estado": "PENDIENTE",
+           "posicion": 6, "adelante": 5, "espera_estimada_min": 12, "espera_estimada_max_min": 20}
+    `posicion` es null cuando el turno ya no está pendiente.
+    404 → {"detail": "..."}
+    """
+    def get(self, request, turno_id):
+        posicion = services.posicion_en_cola(turno_id)
+        if posicion is None:
+            return Response({"detail": "Turno no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(posicion)
+
+
 class ConfiguracionAreaAPI(APIView):
     """
     GET /api/config/          → configuración del área por defecto
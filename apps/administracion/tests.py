@@ -1,3 +1,44 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core import services
+from apps.core.models import Rol, Usuario, UsuarioRol
+from apps.core.tests.base import TurnosTestCase, persona_aportes
+
+
+class IndicadoresApiTests(TurnosTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        director = Usuario.objects.create(username="dir1", display_name="Director")
+        UsuarioRol.objects.create(usuario=director, rol=Rol.objects.create(id=2, nombre_rol="Director"))
+        cls.director = User.objects.create_user(director.username, password="x")
+        cls.sin_rol = User.objects.create_user(cls.operador.username, password="x")
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("administracion:indicadores_api")
+
+    @mock.patch.object(services, "buscar_persona_por_dni", side_effect=persona_aportes)
+    def test_indicadores_del_periodo(self, _buscar):
+        hoy = timezone.localdate()
+        with self.captureOnCommitCallbacks(execute=True):
+            services.emitir_turno(self.area, self.tramite, 30000001)
+        self.client.force_login(self.director)
+
+        datos = self.client.get(self.url, {"desde": hoy.isoformat(), "agrupar": "area"}).json()
+
+        self.assertEqual(datos["totales"]["emitidos"], 1)
+        self.assertEqual([(f["area_id"], f["emitidos"]) for f in datos["filas"]], [(self.area.pk, 1)])
+
+    def test_parametros_invalidos(self):
+        self.client.force_login(self.director)
+        self.assertEqual(self.client.get(self.url, {"agrupar": "mesa"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"desde": "ayer"}).status_code, 400)
+
+    def test_solo_directores(self):
+        self.client.force_login(self.sin_rol)
+        self.assertEqual(self.client.get(self.url).status_code, 302)
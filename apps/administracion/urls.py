@@ -10,4 +10,5 @@ from . import views
 urlpatterns = [
     path("", views.dashboard_admin, name="home"),
     path("api/stats/", views.dashboard_stats_api, name="stats_api"),
+    path("api/indicadores/", views.dashboard_indicadores_api, name="indicadores_api"),
 ]
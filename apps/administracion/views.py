@@ -1,49 +1,28 @@
+from datetime import date, timedelta
+
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.shortcuts import render
 from django.utils import timezone
 from django.http import JsonResponse
-from apps.core.models import Turno, Usuario, UsuarioRol
+from apps.core.estadisticas import obtener_stats_dashboard
+from apps.core.identidad import obtener_identidad
+from apps.core.models import Turno
+from apps.core.resumenes import obtener_indicadores, obtener_totales
+from apps.core.services_aportes import estadisticas_cache_personas
+
+# Días que muestra el dashboard en la tabla de indicadores
+DIAS_INDICADORES = 7
 
 
 def es_director(user):
     if user.is_superuser:
         return True
-    try:
-        usuario = Usuario.objects.get(username=user.username)
-        return UsuarioRol.objects.filter(
-            usuario=usuario,
-            rol__nombre_rol__in=["Director", "SuperAdmin"],
-        ).exists()
-    except Usuario.DoesNotExist:
-        return False
+    return obtener_identidad(user).es_director
 
 
 def get_dashboard_stats():
-    """Obtiene las estadísticas del dashboard."""
-    hoy = timezone.localdate()
-
-    pendientes_hoy = Turno.objects.filter(
-        estado_id=Turno.PENDIENTE, fecha_turno=hoy
-    ).count()
-
-    pendientes_vencidos = Turno.objects.filter(
-        estado_id=Turno.PENDIENTE, fecha_turno__lt=hoy
-    ).count()
-
-    stats = {
-        "pendientes":         pendientes_hoy,
-        "pendientes_vencidos": pendientes_vencidos,
-        "en_atencion":        Turno.objects.filter(estado_id=Turno.EN_ATENCION).count(),
-        "llamando":           Turno.objects.filter(estado_id=Turno.LLAMANDO).count(),
-        "finalizados":        Turno.objects.filter(estado_id=Turno.FINALIZADO, fecha_turno=hoy).count(),
-        "no_presento":        Turno.objects.filter(estado_id=Turno.NO_PRESENTO, fecha_turno=hoy).count(),
-        "no_presento_total":  Turno.objects.filter(estado_id=Turno.NO_PRESENTO).count(),
-    }
-    stats["total_hoy"] = (
-        pendientes_hoy + stats["en_atencion"] + stats["llamando"]
-        + stats["finalizados"] + stats["no_presento"]
-    )
-    return stats
+    """Obtiene las estadísticas del dashboard (snapshot compartido, ver apps.core.estadisticas)."""
+    return obtener_stats_dashboard()
 
 
 @login_required
@@ -62,16 +41,62 @@ def dashboard_admin(request):
         .order_by('-fecha_hora_creacion')[:10]
     )
 
+    # Indicadores de los últimos días (sólo ResumenTurnoHora, no recorre Turno)
+    desde = hoy - timedelta(days=DIAS_INDICADORES - 1)
+    indicadores = {
+        "desde": desde,
+        "totales": obtener_totales(desde, hoy),
+        "por_dia": obtener_indicadores(desde, hoy, agrupar="dia"),
+        "por_operador": obtener_indicadores(desde, hoy, agrupar="operador"),
+    }
+
     return render(
         request,
         "admin/dashboard_admin.html",
-        {"stats": stats, "turnos_recientes": turnos_recientes, "hoy": hoy},
+        {"stats": stats, "turnos_recientes": turnos_recientes, "hoy": hoy, "indicadores": indicadores},
     )
 
 
 @login_required
 @user_passes_test(es_director)
 def dashboard_stats_api(request):
-    """API endpoint para actualización de estadísticas del dashboard."""
-    stats = get_dashboard_stats()
+    """
+    API endpoint para actualización de estadísticas del dashboard.
+    `aportes`: caché de búsquedas por DNI y circuito de Aportes (del proceso que responde).
+    """
+    stats = dict(get_dashboard_stats(), aportes=estadisticas_cache_personas())
     return JsonResponse(stats)
+
+
+@login_required
+@user_passes_test(es_director)
+def dashboard_indicadores_api(request):
+    """
+    Indicadores por período desde ResumenTurnoHora.
+    GET ?desde=AAAA-MM-DD&hasta=AAAA-MM-DD&agrupar=dia|hora|area|tramite|operador|motivo&area=ID&operador=ID
+    (default: últimos DIAS_INDICADORES días agrupados por día).
+    """
+    hoy = timezone.localdate()
+    try:
+        hasta = date.fromisoformat(request.GET['hasta']) if request.GET.get('hasta') else hoy
+        desde = (
+            date.fromisoformat(request.GET['desde']) if request.GET.get('desde')
+            else hasta - timedelta(days=DIAS_INDICADORES - 1)
+        )
+        area_id = int(request.GET['area']) if request.GET.get('area') else None
+        operador_id = int(request.GET['operador']) if request.GET.get('operador') else None
+        filas = obtener_indicadores(
+            desde, hasta,
+            agrupar=request.GET.get('agrupar', 'dia'),
+            area_id=area_id,
+            operador_id=operador_id,
+        )
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    return JsonResponse({
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'totales': obtener_totales(desde, hasta, area_id=area_id, operador_id=operador_id),
+        'filas': filas,
+    })
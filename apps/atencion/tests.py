@@ -1,3 +1,49 @@
-from django.test import TestCase
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from apps.core.models import Rol, UsuarioRol
+from apps.core.tests.base import TurnosTestCase
+from apps.core.websocket_utils import siguiente_secuencia
+
+
+class ApiPanelTests(TurnosTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        rol = Rol.objects.create(id=1, nombre_rol="Operador")
+        UsuarioRol.objects.create(usuario=cls.operador, rol=rol)
+        cls.user = User.objects.create_user(cls.operador.username, password="x")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse("atencion:api_panel")
+
+    def test_304_con_if_none_match_vigente(self):
+        respuesta = self.client.get(self.url)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta["ETag"], f'"{respuesta.json()["version"]}"')
+
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(self.url, headers={"if-none-match": respuesta["ETag"]})
+
+        self.assertEqual(respuesta.status_code, 304)
+        # Sólo sesión y usuario: ni la cola ni los turnos
+        self.assertFalse([q["sql"] for q in consultas if "Turno" in q["sql"]])
+
+    def test_un_evento_del_area_cambia_la_version(self):
+        etag = self.client.get(self.url)["ETag"]
+        siguiente_secuencia(self.area.pk)
+
+        respuesta = self.client.get(self.url, headers={"if-none-match": etag})
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertNotEqual(respuesta["ETag"], etag)
+
+    def test_un_evento_de_otra_area_no_la_cambia(self):
+        etag = self.client.get(self.url)["ETag"]
+        siguiente_secuencia(self.otra_area.pk)
+
+        self.assertEqual(self.client.get(self.url, headers={"if-none-match": etag}).status_code, 304)
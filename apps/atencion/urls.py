@@ -5,6 +5,7 @@ app_name = "atencion"
 
 urlpatterns = [
     path("", views.panel_mesa, name="panel"),   # /atencion/
+    path("api/panel/", views.api_panel, name="api_panel"),  # estado del panel (JSON, ETag)
 
     # API endpoints para acciones del operador
     path("api/llamar/<int:turno_id>/",     views.api_llamar_turno,     name="api_llamar"),
@@ -3,109 +3,153 @@ import logging
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.shortcuts import render
 from django.http import JsonResponse
-from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.http import etag, require_GET, require_POST
 from django.utils import timezone
-from apps.core.models import Usuario, UsuarioRol, Turno, Mesa, Area, ConfiguracionArea, MotivoCierre, TurnoHistorialDerivacion
+from apps.core.models import Usuario, Turno, Area, ConfiguracionArea, MotivoCierre
 from apps.core import services
+from apps.core.cola import cola_de_area
+from apps.core.estados import nombre_estado_turno
+from apps.core.identidad import obtener_identidad
+from apps.core.websocket_utils import secuencia_actual
 
 logger = logging.getLogger(__name__)
 
+# Turnos en espera que muestra el panel del operador
+PANEL_MAX_PENDIENTES = 15
+
 
 def es_operador(user):
     # Superusers siempre tienen acceso
     if user.is_superuser:
         return True
-    
-    try:
-        usuario = Usuario.objects.get(username=user.username)
-        return UsuarioRol.objects.filter(
-            usuario=usuario,
-            rol__nombre_rol="Operador",
-        ).exists()
-    except Usuario.DoesNotExist:
-        return False
+    return obtener_identidad(user).es_operador
 
 
 def _get_usuario(request):
     """Obtiene el usuario de la tabla Usuario a partir del request Django."""
-    try:
-        return Usuario.objects.get(username=request.user.username)
-    except Usuario.DoesNotExist:
-        return None
+    return obtener_identidad(request.user).usuario
 
 
-def _get_mesa_operador(usuario):
+def _get_mesa_operador(request):
     """Obtiene la mesa asignada al operador."""
-    return Mesa.objects.filter(operador_asignado=usuario, activa=True).first()
+    return obtener_identidad(request.user).mesa
+
+
+def _hora(dt):
+    return timezone.localtime(dt).strftime('%H:%M') if dt else None
+
+
+def _estado_panel(usuario, mesa, area, horario_atencion) -> dict:
+    """
+    Estado del panel del operador en JSON: turno propio en curso y los
+    primeros PANEL_MAX_PENDIENTES turnos en espera del área.
+    Sale de la cola en memoria del área (apps.core.cola), sin consultar la BD
+    mientras no haya cambios.
+    """
+    cola = cola_de_area(area.pk) if area else None
+
+    # Turno actualmente en atención del operador
+    turno_actual = cola.turno_de_operador(usuario.pk) if cola and usuario else None
+
+    # Turnos pendientes del área del operador (incluye los que quedaron
+    # pendientes de días anteriores). Los derivados van primero.
+    pendientes = cola.pendientes(derivados_primero=True) if cola else []
+
+    return {
+        'mesa': mesa.nombre if mesa else None,
+        'area': area.nombre if area else None,
+        'horario': horario_atencion,
+        'total_espera': len(pendientes),
+        'turno_actual': {
+            'id': turno_actual.id,
+            'estado_id': turno_actual.estado_id,
+            'estado': nombre_estado_turno(turno_actual.estado_id),
+            'prioridad': turno_actual.prioridad,
+            'persona': turno_actual.persona,
+            'tramite': turno_actual.tramite,
+            'hora': _hora(turno_actual.fecha_hora_creacion),
+            'hora_inicio': _hora(turno_actual.fecha_hora_inicio_atencion),
+        } if turno_actual else None,
+        'pendientes': [
+            {
+                'id': t.id,
+                'numero_visible': t.numero_visible,
+                'prioridad': t.prioridad,
+                'derivado': t.derivado,
+                'persona': t.persona,
+                'tramite': t.tramite,
+                'hora': _hora(t.fecha_hora_creacion),
+            }
+            for t in pendientes[:PANEL_MAX_PENDIENTES]
+        ],
+    }
+
+
+def _etag_panel(request):
+    """
+    Versión del panel: cambia con cada evento de turno del área (secuencia en
+    caché), con la entrada/salida del horario de atención y con el día.
+    Se calcula sin consultar la BD.
+    """
+    identidad = obtener_identidad(request.user)
+    if not identidad.mesa:
+        return None
+    area_id = identidad.area_id
+    horario = services.esta_en_horario_atencion(identidad.mesa.area)
+    return (
+        f"{area_id}-{secuencia_actual(area_id)}-{identidad.usuario_id}-"
+        f"{int(horario['permitido'])}-{timezone.localdate().isoformat()}"
+    )
 
 
 @login_required
 @user_passes_test(es_operador)
 def panel_mesa(request):
     usuario = _get_usuario(request)
-    mesa = _get_mesa_operador(usuario) if usuario else None
+    mesa = _get_mesa_operador(request) if usuario else None
     
     # Obtener el área de la mesa del operador
     area = mesa.area if mesa else Area.objects.first()
     config = services.obtener_config_area(area) if area else {}
     horario_atencion = services.esta_en_horario_atencion(area) if area else {'permitido': True, 'mensaje': ''}
     
-    # Turno actualmente en atención del operador
-    turno_actual = None
-    if usuario:
-        turno_actual = Turno.objects.filter(
-            operador=usuario,
-            estado_id__in=[Turno.LLAMANDO, Turno.EN_ATENCION]
-        ).select_related('ticket__persona', 'tramite', 'area', 'estado').first()
-    
-    # Turnos pendientes del área del operador (sin filtrar por fecha,
-    # para que se vean los que quedaron pendientes de días anteriores)
-    area_filter = {'area': area} if area else {}
-    turnos_pendientes_qs = Turno.objects.filter(
-        estado_id=Turno.PENDIENTE,
-        **area_filter,
-    ).select_related(
-        'ticket__persona', 'tramite', 'area'
-    ).order_by('-ticket__prioridad', 'fecha_hora_creacion')
-
-    # IDs de turnos pendientes que fueron derivados (tienen historial de derivación)
-    turnos_derivados_ids = set(
-        TurnoHistorialDerivacion.objects.filter(
-            turno__estado_id=Turno.PENDIENTE,
-            **({'turno__area': area} if area else {}),
-        ).values_list('turno_id', flat=True)
-    )
-
-    # Separar derivados del resto y ponerlos primero
-    derivados = [t for t in turnos_pendientes_qs if t.id in turnos_derivados_ids]
-    no_derivados = [t for t in turnos_pendientes_qs if t.id not in turnos_derivados_ids]
-    turnos_pendientes = (derivados + no_derivados)[:15]
+    estado_panel = _estado_panel(usuario, mesa, area, horario_atencion)
+    estado_panel['version'] = _etag_panel(request)
 
-    # Contar turnos en espera
-    total_espera = Turno.objects.filter(
-        estado_id=Turno.PENDIENTE,
-        **area_filter,
-    ).count()
-    
     # Motivos de cierre activos para el select del modal
     motivos_cierre = MotivoCierre.objects.filter(activo=True).order_by('orden', 'nombre')
     
     context = {
-        'turno_actual': turno_actual,
-        'turnos_pendientes': turnos_pendientes,
-        'turnos_derivados_ids': turnos_derivados_ids,
-        'total_espera': total_espera,
+        'estado_panel': estado_panel,
         'mesa': mesa,
         'area': area,
         'config': config,
         'config_json': json.dumps(config),  # JSON válido para JS
-        'horario_atencion': horario_atencion,
         'motivos_cierre': motivos_cierre,
     }
     
     return render(request, "operador/panel.html", context)
 
 
+@login_required
+@user_passes_test(es_operador)
+@require_GET
+@etag(_etag_panel)
+def api_panel(request):
+    """
+    GET /atencion/api/panel/
+    Estado del panel (turno actual + cola). Con If-None-Match responde 304
+    sin consultar la BD mientras no haya eventos nuevos en el área.
+    """
+    usuario = _get_usuario(request)
+    mesa = _get_mesa_operador(request) if usuario else None
+    area = mesa.area if mesa else Area.objects.first()
+    horario_atencion = services.esta_en_horario_atencion(area) if area else {'permitido': True, 'mensaje': ''}
+    estado_panel = _estado_panel(usuario, mesa, area, horario_atencion)
+    estado_panel['version'] = _etag_panel(request)
+    return JsonResponse(estado_panel)
+
+
 # =====================================================================
 #  API ENDPOINTS PARA ACCIONES DEL OPERADOR
 # =====================================================================
@@ -116,19 +160,19 @@ def panel_mesa(request):
 def api_llamar_turno(request, turno_id):
     """POST /atencion/api/llamar/<turno_id>/"""
     usuario = _get_usuario(request)
-    mesa = _get_mesa_operador(usuario)
+    mesa = _get_mesa_operador(request)
     
     if not usuario or not mesa:
         return JsonResponse({'error': 'No tiene mesa asignada'}, status=400)
     
     try:
-        turno = Turno.objects.select_related('ticket__persona', 'tramite', 'area', 'estado').get(pk=turno_id)
+        turno = Turno.objects.select_related('ticket__persona', 'tramite', 'area').get(pk=turno_id)
         turno = services.llamar_turno(turno, usuario, mesa)
         
         return JsonResponse({
             'ok': True,
             'turno_id': turno.id,
-            'estado': turno.estado.nombre,
+            'estado': nombre_estado_turno(turno.estado_id),
             'persona': turno.ticket.persona.nombre_completo if turno.ticket.persona else f"N° {turno.numero_visible}",
             'mesa': mesa.nombre,
         })
@@ -142,13 +186,13 @@ def api_llamar_turno(request, turno_id):
 def api_iniciar_atencion(request, turno_id):
     """POST /atencion/api/iniciar/<turno_id>/"""
     try:
-        turno = Turno.objects.select_related('estado', 'mesa_asignada').get(pk=turno_id)
+        turno = Turno.objects.select_related('mesa_asignada').get(pk=turno_id)
         turno = services.iniciar_atencion(turno)
         
         return JsonResponse({
             'ok': True,
             'turno_id': turno.id,
-            'estado': turno.estado.nombre,
+            'estado': nombre_estado_turno(turno.estado_id),
             'hora_inicio': turno.fecha_hora_inicio_atencion.strftime('%H:%M:%S') if turno.fecha_hora_inicio_atencion else None,
         })
     except (Turno.DoesNotExist, ValueError) as e:
@@ -179,19 +223,19 @@ def api_finalizar_atencion(request, turno_id):
     logger.info(f"Finalizando turno {turno_id}: motivo={motivo_cierre_id}, prioridad={prioridad_consulta}, obs={observaciones}")
     
     try:
-        turno = Turno.objects.select_related('estado', 'area').get(pk=turno_id)
+        turno = Turno.objects.select_related('area').get(pk=turno_id)
         turno = services.finalizar_atencion(
             turno,
             motivo_cierre_id=motivo_cierre_id,
             prioridad_consulta=prioridad_consulta,
             observaciones=observaciones
         )
-        logger.info(f"Turno {turno_id} finalizado correctamente. Estado: {turno.estado.nombre}")
+        logger.info(f"Turno {turno_id} finalizado correctamente. Estado: {nombre_estado_turno(turno.estado_id)}")
         
         return JsonResponse({
             'ok': True,
             'turno_id': turno.id,
-            'estado': turno.estado.nombre,
+            'estado': nombre_estado_turno(turno.estado_id),
         })
     except (Turno.DoesNotExist, ValueError) as e:
         logger.error(f"Error finalizando turno {turno_id}: {str(e)}")
@@ -204,13 +248,13 @@ def api_finalizar_atencion(request, turno_id):
 def api_no_presento(request, turno_id):
     """POST /atencion/api/no-presento/<turno_id>/"""
     try:
-        turno = Turno.objects.select_related('estado').get(pk=turno_id)
+        turno = Turno.objects.get(pk=turno_id)
         turno = services.marcar_no_presento(turno)
         
         return JsonResponse({
             'ok': True,
             'turno_id': turno.id,
-            'estado': turno.estado.nombre,
+            'estado': nombre_estado_turno(turno.estado_id),
         })
     except (Turno.DoesNotExist, ValueError) as e:
         return JsonResponse({'error': str(e)}, status=400)
@@ -222,19 +266,15 @@ def api_no_presento(request, turno_id):
 def api_proximo_turno(request):
     """POST /atencion/api/proximo/"""
     usuario = _get_usuario(request)
-    mesa = _get_mesa_operador(usuario)
+    mesa = _get_mesa_operador(request)
     
     if not usuario or not mesa:
         return JsonResponse({'error': 'No tiene mesa asignada'}, status=400)
     
-    area = mesa.area
-    proximo = services.obtener_proximo_turno(area)
-    
-    if not proximo:
-        return JsonResponse({'error': 'No hay turnos pendientes'}, status=404)
-    
     try:
-        turno = services.llamar_turno(proximo, usuario, mesa)
+        turno = services.llamar_proximo_turno(mesa.area, usuario, mesa)
+        if not turno:
+            return JsonResponse({'error': 'No hay turnos pendientes'}, status=404)
         
         return JsonResponse({
             'ok': True,
@@ -244,7 +284,7 @@ def api_proximo_turno(request):
             'dni': turno.ticket.persona.dni if turno.ticket.persona else None,
             'tramite': turno.tramite.nombre,
             'mesa': mesa.nombre,
-            'prioridad': turno.ticket.prioridad,
+            'prioridad': turno.prioridad,
         })
     except ValueError as e:
         return JsonResponse({'error': str(e)}, status=400)
@@ -271,7 +311,7 @@ def api_derivar_turno(request, turno_id):
         return JsonResponse({'error': 'Usuario no encontrado'}, status=400)
 
     try:
-        turno = Turno.objects.select_related('estado', 'area').get(pk=turno_id)
+        turno = Turno.objects.select_related('area').get(pk=turno_id)
         operador_destino = Usuario.objects.get(pk=operador_destino_id)
         turno = services.derivar_turno(turno, usuario, operador_destino, motivo)
         return JsonResponse({
@@ -292,7 +332,7 @@ def api_operadores_area(request):
     if not usuario:
         return JsonResponse({'error': 'Usuario no encontrado'}, status=400)
 
-    mesa = _get_mesa_operador(usuario)
+    mesa = _get_mesa_operador(request)
     area = mesa.area if mesa else Area.objects.first()
 
     if not area:
@@ -331,7 +371,7 @@ def api_rellamar_turno(request, turno_id):
 
     try:
         turno = Turno.objects.select_related(
-            'estado', 'ticket__persona', 'mesa_asignada', 'tramite'
+            'ticket__persona', 'mesa_asignada', 'tramite'
         ).get(pk=turno_id)
         
         # Llamar al servicio que registra la re-llamada
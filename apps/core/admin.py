@@ -1,6 +1,9 @@
 from django.contrib import admin
 from django.utils import timezone
 
+from .estados import recargar_catalogo
+from .identidad import invalidar_identidades
+from .ruteo import invalidar_perfiles_ruteo
 from .models import (
     Usuario,
     Rol,
@@ -23,6 +26,37 @@ from .models import (
 )
 
 
+class InvalidaCachesMixin:
+    """Invalida cachés de proceso al modificar desde el admin (`invalidaciones`)."""
+    invalidaciones = ()
+
+    def _invalidar(self):
+        for invalidar in self.invalidaciones:
+            invalidar()
+
+    def save_related(self, request, form, formsets, change):
+        # Después de los inlines (UsuarioRol, MesaTramite, TramiteOperador)
+        super().save_related(request, form, formsets, change)
+        self._invalidar()
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        self._invalidar()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self._invalidar()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        self._invalidar()
+
+
+class InvalidaIdentidadesMixin(InvalidaCachesMixin):
+    """Usuario, roles y mesas forman la identidad cacheada (apps.core.identidad)."""
+    invalidaciones = (invalidar_identidades,)
+
+
 # ───────────────────────────────
 #   Inlines
 # ───────────────────────────────
@@ -47,7 +81,8 @@ class MesaTramiteInline(admin.TabularInline):
 #   Usuario
 # ───────────────────────────────
 @admin.register(Usuario)
-class UsuarioAdmin(admin.ModelAdmin):
+class UsuarioAdmin(InvalidaIdentidadesMixin, admin.ModelAdmin):
+    invalidaciones = (invalidar_identidades, invalidar_perfiles_ruteo)  # TramiteOperador (cascade)
     list_display  = ("username", "display_name", "is_active")
     list_editable = ("is_active",)
     search_fields = ("username", "display_name")
@@ -58,7 +93,7 @@ class UsuarioAdmin(admin.ModelAdmin):
 #   Rol
 # ───────────────────────────────
 @admin.register(Rol)
-class RolAdmin(admin.ModelAdmin):
+class RolAdmin(InvalidaIdentidadesMixin, admin.ModelAdmin):
     list_display  = ("nombre_rol", "descripcion")
     search_fields = ("nombre_rol",)
 
@@ -95,7 +130,8 @@ class AreaUsuarioAdmin(admin.ModelAdmin):
 #   Tramite (ex Categoría)
 # ───────────────────────────────
 @admin.register(Tramite)
-class TramiteAdmin(admin.ModelAdmin):
+class TramiteAdmin(InvalidaCachesMixin, admin.ModelAdmin):
+    invalidaciones = (invalidar_perfiles_ruteo,)  # TramiteOperador
     list_display  = ("nombre", "area", "activa")
     list_filter   = ("area", "activa")
     list_editable = ("activa",)
@@ -107,7 +143,8 @@ class TramiteAdmin(admin.ModelAdmin):
 #   Mesa
 # ───────────────────────────────
 @admin.register(Mesa)
-class MesaAdmin(admin.ModelAdmin):
+class MesaAdmin(InvalidaIdentidadesMixin, admin.ModelAdmin):
+    invalidaciones = (invalidar_identidades, invalidar_perfiles_ruteo)  # MesaTramite
     list_display  = ("nombre", "area", "operador_asignado", "color_preview", "activa")
     list_filter   = ("area", "activa", "operador_asignado")
     list_editable = ("activa",)
@@ -133,14 +170,23 @@ class PersonaAdmin(admin.ModelAdmin):
 # ───────────────────────────────
 #   Catálogos de estado
 # ───────────────────────────────
-@admin.register(EstadoTicket)
-class EstadoTicketAdmin(admin.ModelAdmin):
+class CatalogoEstadoAdmin(admin.ModelAdmin):
+    """Los nombres de estado se cachean por proceso (apps.core.estados)."""
     list_display = ("id", "nombre", "descripcion")
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        recargar_catalogo()
+
+
+@admin.register(EstadoTicket)
+class EstadoTicketAdmin(CatalogoEstadoAdmin):
+    pass
+
 
 @admin.register(EstadoTurno)
-class EstadoTurnoAdmin(admin.ModelAdmin):
-    list_display = ("id", "nombre", "descripcion")
+class EstadoTurnoAdmin(CatalogoEstadoAdmin):
+    pass
 
 
 # ───────────────────────────────
@@ -278,6 +324,15 @@ class ConfiguracionAreaAdmin(admin.ModelAdmin):
                 pass
 
         super().save_model(request, obj, form, change)
+        ConfiguracionArea.invalidar_cache(obj.area_id)
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        ConfiguracionArea.invalidar_cache(obj.area_id)
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        ConfiguracionArea.invalidar_cache()
 
 
 # ───────────────────────────────
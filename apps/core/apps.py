@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'      #  ← EXACTO
     label = 'core'          #  etiqueta breve (opcional, pero evita choques)
+
+    def ready(self):
+        from . import identidad  # noqa: F401  (receiver de login)
+
+        # Pool del driver manager de ODBC: debe fijarse antes de la primera conexión
+        try:
+            import pyodbc
+        except ImportError:
+            return
+        pyodbc.pooling = getattr(settings, 'ODBC_POOLING', True)
@@ -0,0 +1,112 @@
+# apps/core/asignacion.py
+"""
+Asignación atómica del próximo turno de un área ("Próximo" del operador).
+
+Leer el próximo pendiente y después marcarlo como llamado deja una ventana en
+la que dos operadores obtienen el mismo turno. Acá la selección y la
+actualización son una sola operación:
+
+  - SQL Server: UPDATE sobre un SELECT TOP (1) ... WITH (UPDLOCK, READPAST,
+    ROWLOCK) ordenado como la cola, con OUTPUT inserted.IdTurno. READPAST
+    saltea las filas que otro operador ya tiene bloqueadas, así que dos
+    llamados simultáneos obtienen turnos distintos sin esperar uno al otro.
+  - Otros backends: select_for_update(skip_locked=True) + UPDATE condicionado
+    al estado PENDIENTE, dentro de la misma transacción.
+
+Ambas variantes aplican el perfil de ruteo de la mesa/operador (trámites
+admitidos y pesos, ver apps.core.ruteo).
+
+El bloqueo dura hasta el commit de la transacción que registra la llamada.
+"""
+from django.db import connection
+
+from .models import Turno
+from .ruteo import PerfilRuteo
+
+# Orden de la cola dentro del área (IX_Turno_Cola_Prioridad)
+ORDEN_COLA = ("-prioridad", "fecha_hora_creacion")
+
+
+def _sql_reclamo(perfil: PerfilRuteo) -> tuple[str, list]:
+    """SQL del reclamo y parámetros del filtro/orden por trámite del perfil."""
+    q = connection.ops.quote_name
+    tramite = q('FkIdTramite')
+    filtro, params_filtro = "", []
+    if perfil.tramites is not None:
+        params_filtro = sorted(perfil.tramites)
+        filtro = f" AND {tramite} IN ({', '.join(['%s'] * len(params_filtro))})"
+    elif perfil.excluidos:
+        params_filtro = sorted(perfil.excluidos)
+        filtro = f" AND {tramite} NOT IN ({', '.join(['%s'] * len(params_filtro))})"
+
+    orden_peso, params_orden = "", []
+    if perfil.pesos:
+        orden_peso = f"CASE {tramite}{' WHEN %s THEN %s' * len(perfil.pesos)} ELSE 0 END DESC, "
+        params_orden = [valor for par in perfil.pesos for valor in par]
+
+    sql = (
+        f"WITH proximo AS ("
+        f" SELECT TOP (1) {q('IdTurno')}, {q('FkIdEstadoTurno')}, {q('FkIdOperador')}, {q('FkIdMesaAsignada')}"
+        f" FROM {q(Turno._meta.db_table)} WITH (UPDLOCK, READPAST, ROWLOCK)"
+        f" WHERE {q('FkIdArea')} = %s AND {q('FkIdEstadoTurno')} = %s{filtro}"
+        f" ORDER BY {orden_peso}{q('Prioridad')} DESC, {q('FechaHoraCreacion')}"
+        f") "
+        f"UPDATE proximo SET {q('FkIdEstadoTurno')} = %s, {q('FkIdOperador')} = %s, {q('FkIdMesaAsignada')} = %s "
+        f"OUTPUT inserted.{q('IdTurno')}"
+    )
+    return sql, params_filtro + params_orden
+
+
+def _reclamar_sqlserver(area_id: int, operador_id: int, mesa_id: int, perfil: PerfilRuteo) -> int | None:
+    sql, params = _sql_reclamo(perfil)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            sql,
+            [area_id, Turno.PENDIENTE, *params, Turno.LLAMANDO, operador_id, mesa_id],
+        )
+        fila = cursor.fetchone()
+    return fila[0] if fila else None
+
+
+def cola_ordenada(qs, perfil: PerfilRuteo):
+    """Aplica a un queryset de pendientes el filtro y el orden del perfil."""
+    qs = qs.filter(perfil.filtro())
+    peso = perfil.peso()
+    if peso is None:
+        return qs.order_by(*ORDEN_COLA)
+    return qs.annotate(peso_ruteo=peso).order_by("-peso_ruteo", *ORDEN_COLA)
+
+
+def _reclamar_portable(area_id: int, operador_id: int, mesa_id: int, perfil: PerfilRuteo) -> int | None:
+    turno_id = (
+        cola_ordenada(
+            Turno.objects.select_for_update(skip_locked=True)
+            .filter(area_id=area_id, estado_id=Turno.PENDIENTE),
+            perfil,
+        )
+        .values_list("pk", flat=True)
+        .first()
+    )
+    if turno_id is None:
+        return None
+    actualizados = Turno.objects.filter(pk=turno_id, estado_id=Turno.PENDIENTE).update(
+        estado_id=Turno.LLAMANDO, operador_id=operador_id, mesa_asignada_id=mesa_id,
+    )
+    return turno_id if actualizados else None
+
+
+def reclamar_proximo_turno(
+    area_id: int, operador_id: int, mesa_id: int, perfil: PerfilRuteo | None = None,
+) -> int | None:
+    """
+    Pasa el próximo turno pendiente del área a LLAMANDO, asignado al operador
+    y la mesa, y devuelve su id (None si no hay pendientes libres).
+    Con `perfil` sólo considera los trámites que admite la mesa/operador.
+    Debe llamarse dentro de la transacción que registra la llamada.
+    """
+    perfil = perfil or PerfilRuteo()
+    if perfil.sin_tramites:
+        return None
+    if connection.vendor == "microsoft":
+        return _reclamar_sqlserver(area_id, operador_id, mesa_id, perfil)
+    return _reclamar_portable(area_id, operador_id, mesa_id, perfil)
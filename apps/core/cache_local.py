@@ -0,0 +1,186 @@
+# apps/core/cache_local.py
+"""
+Cachés en memoria del proceso.
+
+CacheVersionada: TTL e invalidación entre procesos.
+
+Cada entrada guarda la versión vigente al momento de cargarla. La versión vive
+en la caché de Django (compartida si se configura REDIS_URL); invalidar una
+clave incrementa su versión y los demás procesos recargan al vencer el TTL
+local. Dentro del TTL la lectura no toca ni la base de datos ni la caché compartida.
+
+CacheLRU: read-through acotado (LRU) con TTL, caché negativa y métricas;
+opcionalmente respaldado por un alias de CACHES propio (nunca el `default`,
+que guarda las claves de coordinación: secuencias, versiones, candados).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache, caches
+
+
+class CacheVersionada:
+    """
+    Uso:
+        _configs = CacheVersionada('config_area', ttl=30)
+        config = _configs.obtener(area_id, lambda: cargar_desde_bd(area_id))
+        _configs.invalidar(area_id)      # p.ej. al guardar desde el admin
+        _configs.invalidar_todo()        # p.ej. tras un script de migración
+
+    Los objetos devueltos se comparten entre requests: tratarlos como solo lectura.
+    """
+
+    def __init__(self, nombre: str, ttl: float = 30):
+        self.nombre = nombre
+        self.ttl = ttl
+        self._entradas = {}   # clave -> (version, expira, valor)
+        self._lock = threading.Lock()
+
+    # ── Versiones en la caché compartida ──
+    def _key_version(self, clave) -> str:
+        return f'cache_local:{self.nombre}:v:{clave}'
+
+    def _key_generacion(self) -> str:
+        return f'cache_local:{self.nombre}:gen'
+
+    def _version(self, clave) -> tuple:
+        keys = [self._key_generacion(), self._key_version(clave)]
+        valores = cache.get_many(keys)
+        return tuple(valores.get(k, 0) for k in keys)
+
+    def _incrementar(self, key: str) -> None:
+        cache.add(key, 0, timeout=None)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=None)
+
+    # ── API ──
+    def obtener(self, clave, cargar):
+        """Devuelve el valor cacheado o lo carga con `cargar()`."""
+        ahora = time.monotonic()
+        entrada = self._entradas.get(clave)
+        if entrada and entrada[1] > ahora:
+            return entrada[2]
+
+        version = self._version(clave)
+        if entrada and entrada[0] == version:
+            # Nadie lo invalidó: renovar el TTL sin recargar
+            with self._lock:
+                self._entradas[clave] = (version, ahora + self.ttl, entrada[2])
+            return entrada[2]
+
+        valor = cargar()
+        with self._lock:
+            self._entradas[clave] = (version, ahora + self.ttl, valor)
+        return valor
+
+    def invalidar(self, clave) -> None:
+        """Descarta la clave en este proceso y la marca como vencida en los demás."""
+        with self._lock:
+            self._entradas.pop(clave, None)
+        self._incrementar(self._key_version(clave))
+
+    def invalidar_todo(self) -> None:
+        """Descarta todas las claves, en este proceso y en los demás."""
+        with self._lock:
+            self._entradas.clear()
+        self._incrementar(self._key_generacion())
+
+
+class CacheLRU:
+    """
+    Caché de lectura (read-through) con tamaño acotado, desalojo LRU y TTL.
+
+    Uso:
+        _personas = CacheLRU('aportes_persona', maximo=5000, ttl=600, ttl_negativo=60)
+        datos = _personas.obtener(dni, lambda: consultar_sp(dni))
+
+    Los resultados `None` se guardan con `ttl_negativo` (caché negativa); las
+    excepciones de `cargar()` no se cachean. Con `alias` (un alias de CACHES)
+    cada valor se guarda también ahí para que otro worker lo encuentre; sin
+    alias la caché es sólo del proceso.
+    """
+
+    _AUSENTE = object()
+
+    def __init__(
+        self,
+        nombre: str,
+        maximo: int = 1000,
+        ttl: float = 300,
+        ttl_negativo: float = 30,
+        alias: str | None = None,
+    ):
+        self.nombre = nombre
+        self.maximo = maximo
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self.alias = alias
+        self._entradas = OrderedDict()   # clave -> (expira, valor)
+        self._lock = threading.Lock()
+        self._metricas = dict.fromkeys(
+            ('hits', 'hits_negativos', 'hits_compartida', 'misses', 'desalojos'), 0
+        )
+
+    def _key(self, clave) -> str:
+        return f'cache_lru:{self.nombre}:{clave}'
+
+    @property
+    def _compartida(self):
+        return caches[self.alias] if self.alias else None
+
+    def _guardar_local(self, clave, valor, ttl: float) -> None:
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + ttl, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+                self._metricas['desalojos'] += 1
+
+    def _contar(self, metrica: str) -> None:
+        with self._lock:
+            self._metricas[metrica] += 1
+
+    # ── API ──
+    def obtener(self, clave, cargar):
+        """Devuelve el valor cacheado o lo carga con `cargar()`."""
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada and entrada[0] > time.monotonic():
+                self._entradas.move_to_end(clave)
+                self._metricas['hits' if entrada[1] is not None else 'hits_negativos'] += 1
+                return entrada[1]
+
+        # Caché compartida: el valor va envuelto en una tupla para distinguir None
+        compartida = self._compartida
+        if compartida is not None:
+            envuelto = compartida.get(self._key(clave), self._AUSENTE)
+            if envuelto is not self._AUSENTE:
+                valor = envuelto[0]
+                self._guardar_local(clave, valor, self.ttl if valor is not None else self.ttl_negativo)
+                self._contar('hits_compartida')
+                return valor
+
+        self._contar('misses')
+        valor = cargar()
+        ttl = self.ttl if valor is not None else self.ttl_negativo
+        self._guardar_local(clave, valor, ttl)
+        if compartida is not None:
+            compartida.set(self._key(clave), (valor,), timeout=ttl)
+        return valor
+
+    def invalidar(self, clave) -> None:
+        with self._lock:
+            self._entradas.pop(clave, None)
+        if self._compartida is not None:
+            self._compartida.delete(self._key(clave))
+
+    def estadisticas(self) -> dict:
+        """Contadores de hits/misses de este proceso y tamaño actual."""
+        with self._lock:
+            stats = dict(self._metricas, tamanio=len(self._entradas), maximo=self.maximo)
+        consultas = stats['hits'] + stats['hits_negativos'] + stats['hits_compartida'] + stats['misses']
+        stats['ratio_hits'] = round(1 - stats['misses'] / consultas, 3) if consultas else None
+        return stats
@@ -0,0 +1,359 @@
+# apps/core/cola.py
+"""
+Cola en memoria por área (espejo de lectura de Turno; la BD sigue siendo la
+fuente de verdad y la asignación sigue pasando por apps.core.asignacion).
+
+Cada proceso mantiene, por área, los turnos activos (PENDIENTE, LLAMANDO,
+EN_ATENCION):
+
+  - `_pendientes`: claves (-prioridad, fecha_hora_creacion, id) ordenadas
+    (bisect), el mismo orden que ORDEN_COLA. Próximo = primera clave
+    admitida; posición = bisect, O(log n).
+  - `_por_estado`: {estado_id: {turno_id: EntradaCola}} para "quién está
+    llamando" y los conteos por estado en O(1).
+
+Se hidrata con una consulta en la primera lectura y se mantiene al día con
+los mismos eventos que recibe el monitor (websocket_utils los aplica al
+publicarlos, con su número de secuencia). Como el monitor, antes de leer
+compara la secuencia del área (caché compartida) con la última aplicada.
+
+Con varios procesos (REDIS_URL) cada evento deja además su cambio de cola en
+el alias de caché `cola` (COLA_EVENTOS_TTL_SEG): los demás procesos aplican
+los eventos que les faltan con un get_many, sin consultar la BD. Sólo si
+falta alguno (vencido, o más de COLA_EVENTOS_MAX atrasados) se rehidrata.
+Cada COLA_RECONCILIACION_SEG se rehidrata igual y se registra cualquier
+desvío (cambios que no pasaron por los servicios, p.ej. ediciones desde el admin).
+"""
+import bisect
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Case, Exists, IntegerField, OuterRef, Value, When
+from django.utils import timezone
+
+from .models import Turno, TurnoHistorialDerivacion
+from .ruteo import PerfilRuteo
+from .websocket_utils import RELACIONES_EVENTO, secuencia_actual, serializar_turno, version_publica
+
+logger = logging.getLogger(__name__)
+
+ACTIVOS = (Turno.PENDIENTE, Turno.LLAMANDO, Turno.EN_ATENCION)
+
+_colas: dict[int, "ColaArea"] = {}
+_colas_lock = threading.Lock()
+
+# Registro compartido de eventos: (tipo, dato) por área y secuencia
+EVENTO_CACHE_KEY = 'cola:evento:{area_id}:{seq}'
+TURNO = 'turno'          # dato: EntradaCola con el estado nuevo del turno
+VENCIDOS = 'vencidos'    # dato: fecha `hasta` del vencimiento masivo
+
+
+def _registro_eventos():
+    """Alias de caché `cola` (sólo con REDIS_URL); None con un solo proceso."""
+    return caches['cola'] if 'cola' in settings.CACHES else None
+
+
+@dataclass(frozen=True)
+class EntradaCola:
+    id: int
+    numero_visible: int
+    estado_id: int
+    prioridad: int
+    tramite_id: int
+    tramite: str | None
+    fecha_turno: date | None
+    fecha_hora_creacion: datetime | None
+    fecha_hora_inicio_atencion: datetime | None
+    mesa_id: int | None
+    operador_id: int | None
+    persona: dict | None
+    derivado: bool
+    # Turno serializado como en los eventos del grupo del área, sin datos
+    # personales (snapshot del monitor, que no requiere sesión)
+    serializado: dict
+
+    @property
+    def clave(self) -> tuple:
+        return (-self.prioridad, self.fecha_hora_creacion, self.id)
+
+    @classmethod
+    def desde_turno(cls, turno: Turno, derivado: bool, serializado: dict | None = None) -> "EntradaCola":
+        persona = turno.ticket.persona
+        return cls(
+            id=turno.id,
+            numero_visible=turno.numero_visible,
+            estado_id=turno.estado_id,
+            prioridad=turno.prioridad,
+            tramite_id=turno.tramite_id,
+            tramite=turno.tramite.nombre if turno.tramite else None,
+            fecha_turno=turno.fecha_turno,
+            fecha_hora_creacion=turno.fecha_hora_creacion,
+            fecha_hora_inicio_atencion=turno.fecha_hora_inicio_atencion,
+            mesa_id=turno.mesa_asignada_id,
+            operador_id=turno.operador_id,
+            persona={
+                'apellido': persona.apellido, 'nombre': persona.nombre, 'dni': persona.dni,
+            } if persona else None,
+            derivado=derivado,
+            serializado=version_publica(serializado or serializar_turno(turno)),
+        )
+
+
+class ColaArea:
+    def __init__(self, area_id: int):
+        self.area_id = area_id
+        self.seq = None          # última secuencia aplicada (None = sin hidratar)
+        self._reconciliar_en = 0.0
+        self._turnos: dict[int, EntradaCola] = {}
+        self._pendientes: list[tuple] = []
+        self._por_estado: dict[int, dict[int, EntradaCola]] = {estado: {} for estado in ACTIVOS}
+        self._lock = threading.RLock()
+
+    # ── Mantenimiento del estado ──
+    def _quitar(self, turno_id: int) -> EntradaCola | None:
+        entrada = self._turnos.pop(turno_id, None)
+        if entrada is None:
+            return None
+        del self._por_estado[entrada.estado_id][turno_id]
+        if entrada.estado_id == Turno.PENDIENTE:
+            i = bisect.bisect_left(self._pendientes, entrada.clave)
+            if i < len(self._pendientes) and self._pendientes[i] == entrada.clave:
+                del self._pendientes[i]
+        return entrada
+
+    def _poner(self, entrada: EntradaCola) -> None:
+        self._quitar(entrada.id)
+        if entrada.estado_id not in ACTIVOS:
+            return
+        self._turnos[entrada.id] = entrada
+        self._por_estado[entrada.estado_id][entrada.id] = entrada
+        if entrada.estado_id == Turno.PENDIENTE:
+            bisect.insort(self._pendientes, entrada.clave)
+
+    def _hidratar(self) -> None:
+        # La secuencia se lee ANTES de la consulta (igual que el snapshot del
+        # monitor): los eventos posteriores se aplican encima sin perder cambios
+        seq = secuencia_actual(self.area_id)
+        turnos = (
+            Turno.objects.filter(area_id=self.area_id, estado_id__in=ACTIVOS)
+            .select_related(*RELACIONES_EVENTO)
+            .annotate(derivado=Case(
+                When(Exists(TurnoHistorialDerivacion.objects.filter(turno=OuterRef('pk'))), then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+        )
+        anteriores = {t.id: t.estado_id for t in self._turnos.values()}
+        reconciliacion = self.seq == seq
+
+        self._turnos.clear()
+        self._pendientes.clear()
+        for indice in self._por_estado.values():
+            indice.clear()
+        for turno in turnos:
+            self._poner(EntradaCola.desde_turno(turno, bool(turno.derivado)))
+
+        if reconciliacion:
+            actuales = {t.id: t.estado_id for t in self._turnos.values()}
+            if actuales != anteriores:
+                logger.warning(
+                    f"[Cola] Área {self.area_id}: desvío corregido en la reconciliación "
+                    f"({len(set(actuales.items()) ^ set(anteriores.items()))} diferencias)"
+                )
+        self.seq = seq
+        self._reconciliar_en = time.monotonic() + getattr(settings, 'COLA_RECONCILIACION_SEG', 300)
+
+    def _ponerse_al_dia(self, seq_actual: int) -> bool:
+        """Aplica los eventos que emitieron otros procesos; False si falta alguno."""
+        registro = _registro_eventos()
+        faltan = seq_actual - self.seq
+        if registro is None or faltan <= 0 or faltan > getattr(settings, 'COLA_EVENTOS_MAX', 500):
+            return False
+        claves = [
+            EVENTO_CACHE_KEY.format(area_id=self.area_id, seq=seq)
+            for seq in range(self.seq + 1, seq_actual + 1)
+        ]
+        eventos = registro.get_many(claves)
+        if len(eventos) != len(claves):
+            return False
+        for clave in claves:
+            self._aplicar(*eventos[clave])
+        self.seq = seq_actual
+        return True
+
+    def _sincronizar(self) -> None:
+        if self.seq is None or time.monotonic() >= self._reconciliar_en:
+            self._hidratar()
+            return
+        seq_actual = secuencia_actual(self.area_id)
+        if seq_actual != self.seq and not self._ponerse_al_dia(seq_actual):
+            self._hidratar()
+
+    def descartar(self) -> None:
+        """Fuerza a rehidratar en la próxima lectura (p.ej. la BD no coincide)."""
+        with self._lock:
+            self.seq = None
+
+    # ── Eventos (los aplica websocket_utils al publicarlos) ──
+    def _aceptar(self, seq: int) -> bool:
+        """True si el evento es el siguiente; ante un salto marca la cola para rehidratar."""
+        if self.seq is None or seq <= self.seq:
+            return False
+        if seq != self.seq + 1:
+            self.seq = None
+            return False
+        self.seq = seq
+        return True
+
+    def _aplicar(self, tipo: str, dato) -> None:
+        if tipo == VENCIDOS:
+            for entrada in list(self._turnos.values()):
+                if (
+                    entrada.estado_id in (Turno.PENDIENTE, Turno.LLAMANDO)
+                    and entrada.fecha_turno and entrada.fecha_turno < dato
+                ):
+                    self._quitar(entrada.id)
+            return
+        anterior = self._turnos.get(dato.id)
+        if anterior and anterior.derivado and not dato.derivado:
+            dato = replace(dato, derivado=True)
+        self._poner(dato)
+
+    def aplicar(self, seq: int, tipo: str, dato) -> None:
+        """Aplica un evento (TURNO o VENCIDOS) si es el siguiente de la secuencia."""
+        with self._lock:
+            if self._aceptar(seq):
+                self._aplicar(tipo, dato)
+
+    # ── Lecturas ──
+    def proximo(self, perfil: PerfilRuteo | None = None) -> EntradaCola | None:
+        """Próximo pendiente según ORDEN_COLA y el perfil de ruteo (como reclamar_proximo_turno)."""
+        perfil = perfil or PerfilRuteo()
+        if perfil.sin_tramites:
+            return None
+        pesos = dict(perfil.pesos)
+        tope = max([0, *pesos.values()])
+        with self._lock:
+            self._sincronizar()
+            mejor, mejor_peso = None, None
+            # Las claves están en orden de cola: la primera de cada peso es la mejor
+            for clave in self._pendientes:
+                entrada = self._turnos[clave[-1]]
+                if not perfil.admite(entrada.tramite_id):
+                    continue
+                peso = pesos.get(entrada.tramite_id, 0)
+                if mejor is None or peso > mejor_peso:
+                    mejor, mejor_peso = entrada, peso
+                    if peso >= tope:
+                        break
+            return mejor
+
+    def entrada(self, turno_id: int) -> EntradaCola | None:
+        """Turno activo del área (None si no está o ya no está activo)."""
+        with self._lock:
+            self._sincronizar()
+            return self._turnos.get(turno_id)
+
+    def posicion(self, turno_id: int) -> int | None:
+        """Posición (1 = próximo) de un turno pendiente en la cola del área."""
+        with self._lock:
+            self._sincronizar()
+            entrada = self._turnos.get(turno_id)
+            if entrada is None or entrada.estado_id != Turno.PENDIENTE:
+                return None
+            return bisect.bisect_left(self._pendientes, entrada.clave) + 1
+
+    def pendientes(self, limite: int | None = None, derivados_primero: bool = False) -> list[EntradaCola]:
+        """Pendientes en orden de cola (los derivados adelante si se pide)."""
+        with self._lock:
+            self._sincronizar()
+            entradas = [self._turnos[clave[-1]] for clave in self._pendientes]
+        if derivados_primero:
+            entradas = [e for e in entradas if e.derivado] + [e for e in entradas if not e.derivado]
+        return entradas[:limite] if limite is not None else entradas
+
+    def con_estado(self, estado_id: int) -> list[EntradaCola]:
+        """Turnos del área en LLAMANDO o EN_ATENCION (quién está llamando/atendiendo)."""
+        with self._lock:
+            self._sincronizar()
+            return list(self._por_estado[estado_id].values())
+
+    def contar(self) -> dict[int, int]:
+        """{estado_id: cantidad} de los turnos activos del área."""
+        with self._lock:
+            self._sincronizar()
+            return {estado: len(indice) for estado, indice in self._por_estado.items()}
+
+    def turno_de_operador(self, operador_id: int) -> EntradaCola | None:
+        """Turno LLAMANDO o EN_ATENCION del operador en el área."""
+        with self._lock:
+            self._sincronizar()
+            for estado in (Turno.LLAMANDO, Turno.EN_ATENCION):
+                for entrada in self._por_estado[estado].values():
+                    if entrada.operador_id == operador_id:
+                        return entrada
+        return None
+
+    def snapshot(self) -> tuple[int, list[dict]]:
+        """(seq, turnos activos del día serializados) para el monitor."""
+        hoy = timezone.localdate()
+        with self._lock:
+            self._sincronizar()
+            turnos = [e for e in self._turnos.values() if e.fecha_turno == hoy]
+            seq = self.seq
+        turnos.sort(key=lambda e: (e.fecha_hora_creacion, e.id))
+        return seq, [e.serializado for e in turnos]
+
+
+def cola_de_area(area_id: int) -> ColaArea:
+    """Cola en memoria del área (se hidrata en la primera lectura)."""
+    cola = _colas.get(area_id)
+    if cola is None:
+        with _colas_lock:
+            cola = _colas.setdefault(area_id, ColaArea(area_id))
+    return cola
+
+
+def buscar_turno(turno_id: int) -> tuple[ColaArea, EntradaCola] | None:
+    """Busca un turno activo en las colas ya cargadas en este proceso."""
+    for cola in list(_colas.values()):
+        entrada = cola.entrada(turno_id)
+        if entrada is not None:
+            return cola, entrada
+    return None
+
+
+def aplicar_evento(evento: dict, turno: Turno | None = None) -> None:
+    """
+    Aplica a la cola del área un evento ya numerado (lo llama websocket_utils)
+    y lo deja en el registro compartido para los demás procesos. Si la cola
+    de ese área todavía no se usó en este proceso sólo lo registra.
+    """
+    cola = _colas.get(evento['area_id'])
+    try:
+        if evento['type'] == 'turnos_vencidos':
+            tipo, dato = VENCIDOS, date.fromisoformat(evento['hasta'])
+        elif turno is not None:
+            derivado = bool((evento.get('cambios') or {}).get('derivado'))
+            tipo, dato = TURNO, EntradaCola.desde_turno(turno, derivado, evento['turno'])
+        else:
+            return
+        registro = _registro_eventos()
+        if registro is not None:
+            registro.set(
+                EVENTO_CACHE_KEY.format(area_id=evento['area_id'], seq=evento['seq']),
+                (tipo, dato),
+                timeout=getattr(settings, 'COLA_EVENTOS_TTL_SEG', 600),
+            )
+        if cola is not None:
+            cola.aplicar(evento['seq'], tipo, dato)
+    except Exception:
+        # No cortar la publicación: la próxima lectura rehidrata
+        logger.exception(f"[Cola] Área {evento['area_id']}: error aplicando {evento['type']}")
+        if cola is not None:
+            cola.seq = None
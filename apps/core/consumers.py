@@ -4,59 +4,93 @@ Utilizado por el Monitor Público y Panel del Operador
 """
 
 import json
+from collections import deque
+from urllib.parse import parse_qs
+
 from channels.generic.websocket import AsyncWebsocketConsumer
-from channels.db import database_sync_to_async
 from django.utils import timezone
 
+from .websocket_utils import grupo_area, grupo_mesa, grupo_operador
+
 
 class TurnosConsumer(AsyncWebsocketConsumer):
     """
     Consumer que maneja conexiones WebSocket para actualizaciones de turnos en tiempo real.
     
-    Grupos:
-    - turnos_updates: Todos los monitores y operadores reciben actualizaciones
-    - operador_{user_id}: Canal específico para cada operador
+    Grupos (ver websocket_utils.grupos_destino):
+    - turnos_area_{area_id}: monitores y paneles de un área
+    - turnos_mesa_{mesa_id}: eventos de los turnos de una mesa
+    - turnos_operador_{usuario_id}: eventos de los turnos de un operador
+
+    La suscripción se elige en la URL (ws/turnos/area/<id>/ o
+    ws/turnos/?area=<id>&mesa=<id>&operador=<id>) o con un mensaje
+    {"type": "subscribe", "area": <id>, "mesa": <id>, "operador": <id>}.
+    Sin suscripción el socket no recibe eventos.
+
+    Los grupos de mesa y operador llevan los datos completos de la persona
+    (DNI incluido): sólo se admiten con sesión iniciada. El grupo del área es
+    público (monitor) y recibe los turnos sin DNI.
     """
+
+    FILTROS = {
+        'area': grupo_area,
+        'mesa': grupo_mesa,
+        'operador': grupo_operador,
+    }
+    # Filtros que requieren usuario autenticado
+    PRIVADOS = {'mesa', 'operador'}
     
     async def connect(self):
         """Se ejecuta cuando un cliente se conecta al WebSocket"""
-        self.room_group_name = 'turnos_updates'
-        
-        # Unirse al grupo de actualizaciones
-        await self.channel_layer.group_add(
-            self.room_group_name,
-            self.channel_name
-        )
-        
+        self.grupos = set()
+        # Un mismo evento llega una vez por cada grupo suscrito que lo incluye
+        self._eventos_vistos = deque(maxlen=64)
+
         # Aceptar la conexión
         await self.accept()
+
+        filtros = {
+            clave: valores[0]
+            for clave, valores in parse_qs(self.scope.get('query_string', b'').decode()).items()
+        }
+        filtros.update(self.scope.get('url_route', {}).get('kwargs', {}))
+        rechazados = await self._suscribir(filtros)
         
         # Enviar mensaje de confirmación
         await self.send(text_data=json.dumps({
             'type': 'connection_established',
             'message': 'Conectado al sistema de turnos en tiempo real',
+            'grupos': sorted(self.grupos),
             'timestamp': timezone.now().isoformat()
         }))
+        await self._avisar_rechazados(rechazados)
     
     async def disconnect(self, close_code):
         """Se ejecuta cuando un cliente se desconecta"""
-        # Salir del grupo
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        # Salir de los grupos
+        for grupo in self.grupos:
+            await self.channel_layer.group_discard(grupo, self.channel_name)
+        self.grupos = set()
     
     async def receive(self, text_data):
         """
         Recibe mensajes del cliente WebSocket
-        Esto permite al cliente enviar comandos o solicitar datos
+        - subscribe: reemplaza las suscripciones actuales por las indicadas
         """
         try:
             data = json.loads(text_data)
             message_type = data.get('type', 'unknown')
+
+            if message_type == 'subscribe':
+                rechazados = await self._suscribir(data, reemplazar=True)
+                await self.send(text_data=json.dumps({
+                    'type': 'subscribed',
+                    'grupos': sorted(self.grupos),
+                    'timestamp': timezone.now().isoformat()
+                }))
+                await self._avisar_rechazados(rechazados)
+                return
             
-            # Aquí podrías manejar diferentes tipos de mensajes del cliente
-            # Por ahora, solo respondemos con un eco
             await self.send(text_data=json.dumps({
                 'type': 'message_received',
                 'original_type': message_type,
@@ -69,62 +103,99 @@ class TurnosConsumer(AsyncWebsocketConsumer):
                 'message': 'Formato de mensaje inválido',
                 'timestamp': timezone.now().isoformat()
             }))
+
+    def _autenticado(self):
+        usuario = self.scope.get('user')
+        return bool(usuario and usuario.is_authenticated)
+
+    async def _suscribir(self, filtros, reemplazar=False):
+        """
+        Une el socket a los grupos pedidos (ids inválidos se ignoran).
+        Retorna los filtros privados rechazados por falta de sesión.
+        """
+        nuevos = set()
+        rechazados = []
+        autenticado = self._autenticado()
+        for clave, grupo_de in self.FILTROS.items():
+            if clave not in filtros:
+                continue
+            if clave in self.PRIVADOS and not autenticado:
+                rechazados.append(clave)
+                continue
+            try:
+                nuevos.add(grupo_de(int(filtros[clave])))
+            except (TypeError, ValueError):
+                continue
+
+        if reemplazar:
+            for grupo in self.grupos - nuevos:
+                await self.channel_layer.group_discard(grupo, self.channel_name)
+            self.grupos &= nuevos
+
+        for grupo in nuevos - self.grupos:
+            await self.channel_layer.group_add(grupo, self.channel_name)
+        self.grupos |= nuevos
+        return rechazados
+
+    async def _avisar_rechazados(self, rechazados):
+        if not rechazados:
+            return
+        await self.send(text_data=json.dumps({
+            'type': 'error',
+            'message': f"Se requiere sesión para suscribirse a: {', '.join(rechazados)}",
+            'rechazados': rechazados,
+            'timestamp': timezone.now().isoformat()
+        }))
+
+    def _es_duplicado(self, event):
+        """True si el evento ya se reenvió por otro de los grupos suscritos"""
+        clave = (event.get('area_id'), event.get('seq'))
+        if clave[1] is None:
+            return False
+        if clave in self._eventos_vistos:
+            return True
+        self._eventos_vistos.append(clave)
+        return False
     
     # ========================================================================
     # Handlers para diferentes tipos de eventos de turno
     # ========================================================================
     
+    # Los eventos de turno llegan ya codificados (websocket_utils._publicar):
+    # se reenvía el mismo texto a cada socket sin volver a serializar.
+
+    async def _reenviar(self, event):
+        if self._es_duplicado(event):
+            return
+        await self.send(text_data=event['texto'])
+    
     async def turno_creado(self, event):
         """Notifica cuando se crea un nuevo turno"""
-        await self.send(text_data=json.dumps({
-            'type': 'turno_creado',
-            'turno': event['turno'],
-            'timestamp': event['timestamp']
-        }))
+        await self._reenviar(event)
     
     async def turno_llamado(self, event):
         """Notifica cuando se llama a un turno"""
-        await self.send(text_data=json.dumps({
-            'type': 'turno_llamado',
-            'turno': event['turno'],
-            'mesa': event.get('mesa'),
-            'timestamp': event['timestamp']
-        }))
+        await self._reenviar(event)
     
     async def turno_atendiendo(self, event):
         """Notifica cuando un turno pasa a atención"""
-        await self.send(text_data=json.dumps({
-            'type': 'turno_atendiendo',
-            'turno': event['turno'],
-            'mesa': event.get('mesa'),
-            'timestamp': event['timestamp']
-        }))
+        await self._reenviar(event)
     
     async def turno_finalizado(self, event):
         """Notifica cuando se finaliza un turno"""
-        await self.send(text_data=json.dumps({
-            'type': 'turno_finalizado',
-            'turno': event['turno'],
-            'motivo': event.get('motivo'),
-            'timestamp': event['timestamp']
-        }))
+        await self._reenviar(event)
     
     async def turno_no_presento(self, event):
         """Notifica cuando marcan un turno como no presentado"""
-        await self.send(text_data=json.dumps({
-            'type': 'turno_no_presento',
-            'turno': event['turno'],
-            'timestamp': event['timestamp']
-        }))
+        await self._reenviar(event)
     
     async def turno_actualizado(self, event):
         """Notifica actualizaciones generales de turno"""
-        await self.send(text_data=json.dumps({
-            'type': 'turno_actualizado',
-            'turno': event['turno'],
-            'cambios': event.get('cambios', {}),
-            'timestamp': event['timestamp']
-        }))
+        await self._reenviar(event)
+    
+    async def turnos_vencidos(self, event):
+        """Notifica el vencimiento masivo de turnos de días anteriores"""
+        await self._reenviar(event)
     
     async def stats_actualizadas(self, event):
         """Notifica cambios en las estadísticas generales"""
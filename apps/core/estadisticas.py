@@ -0,0 +1,123 @@
+# apps/core/estadisticas.py
+"""
+Estadísticas del dashboard del director.
+
+Todas salen de una única consulta agrupada por estado (COUNT condicional sobre
+la fecha) y se guardan en la caché de Django como un contador por clave, de
+modo que todos los navegadores comparten el mismo snapshot. Cada transición de
+turno confirmada ajusta los contadores con incr/decr en lugar de recalcular;
+el snapshot vence cada DASHBOARD_STATS_TTL segundos y se recalcula entero, lo
+que corrige cualquier desvío (carreras, actualizaciones masivas).
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import Turno
+
+CAMPOS = (
+    "pendientes", "pendientes_vencidos", "en_atencion", "llamando",
+    "finalizados", "no_presento", "no_presento_total",
+)
+
+
+def _key(fecha: date, campo: str) -> str:
+    return f"dashboard:stats:{fecha.isoformat()}:{campo}"
+
+
+def _campos_de(estado_id: int | None, fecha_turno: date | None, hoy: date) -> list[str]:
+    """Contadores del dashboard en los que cuenta un turno con ese estado y fecha."""
+    if estado_id is None:
+        return []
+    if estado_id == Turno.PENDIENTE:
+        if fecha_turno == hoy:
+            return ["pendientes"]
+        return ["pendientes_vencidos"] if fecha_turno and fecha_turno < hoy else []
+    if estado_id == Turno.EN_ATENCION:
+        return ["en_atencion"]
+    if estado_id == Turno.LLAMANDO:
+        return ["llamando"]
+    if estado_id == Turno.FINALIZADO:
+        return ["finalizados"] if fecha_turno == hoy else []
+    if estado_id == Turno.NO_PRESENTO:
+        return ["no_presento", "no_presento_total"] if fecha_turno == hoy else ["no_presento_total"]
+    return []
+
+
+def _calcular(hoy: date) -> dict:
+    """Una sola consulta: GROUP BY estado con conteos condicionales por fecha."""
+    filas = (
+        Turno.objects.order_by()
+        .values("estado_id")
+        .annotate(
+            total=Count("id"),
+            de_hoy=Count("id", filter=Q(fecha_turno=hoy)),
+            anteriores=Count("id", filter=Q(fecha_turno__lt=hoy)),
+        )
+    )
+    vacio = {"total": 0, "de_hoy": 0, "anteriores": 0}
+    por_estado = {f["estado_id"]: f for f in filas}
+    pendiente = por_estado.get(Turno.PENDIENTE, vacio)
+    no_presento = por_estado.get(Turno.NO_PRESENTO, vacio)
+
+    return {
+        "pendientes":          pendiente["de_hoy"],
+        "pendientes_vencidos": pendiente["anteriores"],
+        "en_atencion":         por_estado.get(Turno.EN_ATENCION, vacio)["total"],
+        "llamando":            por_estado.get(Turno.LLAMANDO, vacio)["total"],
+        "finalizados":         por_estado.get(Turno.FINALIZADO, vacio)["de_hoy"],
+        "no_presento":         no_presento["de_hoy"],
+        "no_presento_total":   no_presento["total"],
+    }
+
+
+def obtener_stats_dashboard() -> dict:
+    """Snapshot compartido; sólo consulta la BD si venció o fue invalidado."""
+    hoy = timezone.localdate()
+    keys = {campo: _key(hoy, campo) for campo in CAMPOS}
+    cacheados = cache.get_many(keys.values())
+
+    if len(cacheados) == len(keys):
+        stats = {campo: max(cacheados[key], 0) for campo, key in keys.items()}
+    else:
+        stats = _calcular(hoy)
+        cache.set_many(
+            {keys[campo]: valor for campo, valor in stats.items()},
+            timeout=getattr(settings, "DASHBOARD_STATS_TTL", 300),
+        )
+
+    stats["total_hoy"] = (
+        stats["pendientes"] + stats["en_atencion"] + stats["llamando"]
+        + stats["finalizados"] + stats["no_presento"]
+    )
+    return stats
+
+
+def registrar_transicion(estado_origen: int | None, estado_destino: int, fecha_turno: date) -> None:
+    """
+    Ajusta los contadores del snapshot tras un cambio de estado confirmado
+    (estado_origen=None para un turno nuevo). Si el snapshot no está en
+    caché no hace nada: la próxima lectura lo recalcula.
+    """
+    hoy = timezone.localdate()
+    for campo in _campos_de(estado_origen, fecha_turno, hoy):
+        _ajustar(hoy, campo, -1)
+    for campo in _campos_de(estado_destino, fecha_turno, hoy):
+        _ajustar(hoy, campo, +1)
+
+
+def _ajustar(hoy: date, campo: str, delta: int) -> None:
+    try:
+        cache.incr(_key(hoy, campo), delta)
+    except ValueError:
+        # Clave vencida: invalidar el resto para no mezclar valores
+        invalidar_stats_dashboard()
+
+
+def invalidar_stats_dashboard() -> None:
+    """Descarta el snapshot (p.ej. tras actualizaciones masivas de turnos)."""
+    hoy = timezone.localdate()
+    cache.delete_many([_key(hoy, campo) for campo in CAMPOS])
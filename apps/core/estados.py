@@ -0,0 +1,113 @@
+# apps/core/estados.py
+"""
+Catálogos de estado (EstadoTurno / EstadoTicket) y máquina de estados del Turno.
+
+Los ids de estado son constantes (Turno.PENDIENTE, Ticket.EN_PROCESO, ...): los
+servicios escriben `estado_id` directamente sin leer la fila del catálogo.
+Los nombres se cargan una sola vez por proceso (primer uso) y quedan en un
+mapeo inmutable; se usan para mensajes y respuestas en lugar de `turno.estado.nombre`.
+"""
+import logging
+import threading
+from enum import IntEnum
+from types import MappingProxyType
+from typing import Mapping
+
+from .models import EstadoTicket, EstadoTurno, Ticket, Turno
+
+logger = logging.getLogger(__name__)
+
+
+class EstadoTurnoId(IntEnum):
+    PENDIENTE   = Turno.PENDIENTE
+    LLAMANDO    = Turno.LLAMANDO
+    EN_ATENCION = Turno.EN_ATENCION
+    FINALIZADO  = Turno.FINALIZADO
+    NO_PRESENTO = Turno.NO_PRESENTO
+    DERIVADO    = Turno.DERIVADO
+
+
+class EstadoTicketId(IntEnum):
+    PENDIENTE  = Ticket.PENDIENTE
+    EN_PROCESO = Ticket.EN_PROCESO
+    COMPLETADO = Ticket.COMPLETADO
+    CANCELADO  = Ticket.CANCELADO
+
+
+# ── Máquina de estados del Turno ──
+# Derivar devuelve el turno a PENDIENTE para que lo llame el operador destino.
+TRANSICIONES_TURNO: Mapping[int, frozenset] = MappingProxyType({
+    EstadoTurnoId.PENDIENTE:   frozenset({EstadoTurnoId.LLAMANDO, EstadoTurnoId.NO_PRESENTO}),
+    EstadoTurnoId.LLAMANDO:    frozenset({EstadoTurnoId.EN_ATENCION, EstadoTurnoId.NO_PRESENTO,
+                                          EstadoTurnoId.PENDIENTE}),
+    EstadoTurnoId.EN_ATENCION: frozenset({EstadoTurnoId.FINALIZADO, EstadoTurnoId.PENDIENTE}),
+    EstadoTurnoId.FINALIZADO:  frozenset(),
+    EstadoTurnoId.NO_PRESENTO: frozenset(),
+    EstadoTurnoId.DERIVADO:    frozenset(),
+})
+
+# Estados en los que el turno sigue en la cola o en curso
+ESTADOS_ACTIVOS = frozenset({
+    EstadoTurnoId.PENDIENTE, EstadoTurnoId.LLAMANDO, EstadoTurnoId.EN_ATENCION,
+})
+
+
+def puede_transicionar(origen: int, destino: int) -> bool:
+    """True si el turno puede pasar de `origen` a `destino`."""
+    return destino in TRANSICIONES_TURNO.get(origen, frozenset())
+
+
+# ── Catálogo de nombres ──
+_catalogo_turno: Mapping[int, str] | None = None
+_catalogo_ticket: Mapping[int, str] | None = None
+_lock = threading.Lock()
+
+
+def _cargar() -> tuple[Mapping[int, str], Mapping[int, str]]:
+    global _catalogo_turno, _catalogo_ticket
+    with _lock:
+        if _catalogo_turno is None or _catalogo_ticket is None:
+            try:
+                turno = dict(EstadoTurno.objects.values_list("id", "nombre"))
+                ticket = dict(EstadoTicket.objects.values_list("id", "nombre"))
+            except Exception as e:
+                # Sin BD disponible se usan los nombres de las constantes
+                # (sin guardarlos: el próximo uso reintenta la carga)
+                logger.warning(f"No se pudo cargar el catálogo de estados: {e}")
+                return (
+                    MappingProxyType({est.value: est.name for est in EstadoTurnoId}),
+                    MappingProxyType({est.value: est.name for est in EstadoTicketId}),
+                )
+            _catalogo_turno = MappingProxyType(
+                {est.value: est.name for est in EstadoTurnoId} | turno
+            )
+            _catalogo_ticket = MappingProxyType(
+                {est.value: est.name for est in EstadoTicketId} | ticket
+            )
+        return _catalogo_turno, _catalogo_ticket
+
+
+def recargar_catalogo() -> None:
+    """Descarta los nombres cargados (p.ej. tras editar un estado en el admin)."""
+    global _catalogo_turno, _catalogo_ticket
+    with _lock:
+        _catalogo_turno = None
+        _catalogo_ticket = None
+
+
+def nombres_estado_turno() -> Mapping[int, str]:
+    catalogo = _catalogo_turno
+    return catalogo if catalogo is not None else _cargar()[0]
+
+
+def nombres_estado_ticket() -> Mapping[int, str]:
+    catalogo = _catalogo_ticket
+    return catalogo if catalogo is not None else _cargar()[1]
+
+
+def nombre_estado_turno(estado_id: int) -> str:
+    return nombres_estado_turno().get(estado_id, str(estado_id))
+
+
+def nombre_estado_ticket(estado_id: int) -> str:
+    return nombres_estado_ticket().get(estado_id, str(estado_id))
@@ -0,0 +1,199 @@
+# apps/core/estimacion.py
+"""
+Estimación del tiempo de espera a partir de la duración de las atenciones.
+
+Por área y por trámite se guarda en la caché de Django (compartida entre
+procesos) un resumen de la duración de atención (inicio → fin):
+
+  - `ewma`: promedio móvil exponencial (ESTIMACION_ALFA), reacciona a los
+    cambios de ritmo del día.
+  - `hist`: histograma en tramos de ESTIMACION_TRAMO_SEG para los
+    percentiles; al llegar a ESTIMACION_VENTANA muestras se divide a la
+    mitad, así pesan más las atenciones recientes.
+
+Cada finalizar_atencion confirmado suma una muestra (no se recalcula nada);
+si la clave no está (caché reiniciada) se siembra una vez con las últimas
+atenciones de la BD. La actualización es leer y escribir sin bloqueo: dos
+procesos simultáneos pueden perder una muestra, aceptable para una estimación.
+
+Mesas activas: las que llamaron o finalizaron un turno en los últimos
+ESTIMACION_VENTANA_MESAS_SEG. La espera estimada de un turno con `adelante`
+turnos delante es adelante × duración / mesas activas: O(1) por consulta.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Turno
+
+CANT_TRAMOS = 120
+
+# Duraciones fuera de rango (atención que quedó abierta) no se cuentan
+DURACION_MAXIMA_SEG = 4 * 3600
+
+
+def _config(nombre: str, default):
+    return getattr(settings, nombre, default)
+
+
+def _key(ambito: str, ambito_id: int) -> str:
+    return f"estimacion:{ambito}:{ambito_id}"
+
+
+def _key_mesas(area_id: int) -> str:
+    return f"estimacion:mesas:{area_id}"
+
+
+# =====================================================================
+#  RESUMEN DE DURACIONES
+# =====================================================================
+def _vacio() -> dict:
+    return {"ewma": None, "n": 0, "hist": [0] * CANT_TRAMOS}
+
+
+def _sumar(resumen: dict, segundos: float) -> None:
+    alfa = _config("ESTIMACION_ALFA", 0.2)
+    resumen["ewma"] = segundos if resumen["ewma"] is None else alfa * segundos + (1 - alfa) * resumen["ewma"]
+    tramo = min(int(segundos // _config("ESTIMACION_TRAMO_SEG", 30)), CANT_TRAMOS - 1)
+    resumen["hist"][tramo] += 1
+    resumen["n"] += 1
+    if resumen["n"] >= _config("ESTIMACION_VENTANA", 500):
+        resumen["hist"] = [c // 2 for c in resumen["hist"]]
+        resumen["n"] = sum(resumen["hist"])
+
+
+def percentil(resumen: dict, p: float) -> float | None:
+    """Percentil `p` (0-100) en segundos: límite superior del tramo que lo contiene."""
+    total = sum(resumen["hist"])
+    if not total:
+        return None
+    objetivo = total * p / 100
+    acumulado = 0
+    for tramo, cantidad in enumerate(resumen["hist"]):
+        acumulado += cantidad
+        if acumulado >= objetivo:
+            return (tramo + 1) * _config("ESTIMACION_TRAMO_SEG", 30)
+    return CANT_TRAMOS * _config("ESTIMACION_TRAMO_SEG", 30)
+
+
+def _duracion(inicio, fin) -> float | None:
+    if not inicio or not fin:
+        return None
+    segundos = (fin - inicio).total_seconds()
+    return segundos if 0 < segundos <= DURACION_MAXIMA_SEG else None
+
+
+def _sembrar(ambito: str, ambito_id: int) -> dict:
+    """Resumen inicial con las últimas atenciones finalizadas (una consulta)."""
+    filtro = {"area_id": ambito_id} if ambito == "area" else {"tramite_id": ambito_id}
+    filas = (
+        Turno.objects.filter(
+            estado_id=Turno.FINALIZADO,
+            fecha_hora_inicio_atencion__isnull=False,
+            fecha_hora_fin_atencion__isnull=False,
+            **filtro,
+        )
+        .order_by("-fecha_hora_fin_atencion")
+        .values_list("fecha_hora_inicio_atencion", "fecha_hora_fin_atencion")
+        [:_config("ESTIMACION_MUESTRA_INICIAL", 200)]
+    )
+    resumen = _vacio()
+    for inicio, fin in reversed(list(filas)):
+        segundos = _duracion(inicio, fin)
+        if segundos is not None:
+            _sumar(resumen, segundos)
+    return resumen
+
+
+def resumen_duraciones(ambito: str, ambito_id: int) -> dict:
+    """Resumen de duraciones del área (`ambito='area'`) o del trámite (`'tramite'`)."""
+    resumen = cache.get(_key(ambito, ambito_id))
+    if resumen is None:
+        resumen = _sembrar(ambito, ambito_id)
+        cache.set(_key(ambito, ambito_id), resumen, timeout=None)
+    return resumen
+
+
+# =====================================================================
+#  REGISTRO (on_commit de las transiciones)
+# =====================================================================
+def registrar_actividad_mesa(area_id: int, mesa_id: int | None) -> None:
+    """Marca la mesa como activa (llamó o finalizó un turno)."""
+    if not mesa_id:
+        return
+    ventana = _config("ESTIMACION_VENTANA_MESAS_SEG", 900)
+    ahora = time.time()
+    mesas = cache.get(_key_mesas(area_id)) or {}
+    mesas = {m: visto for m, visto in mesas.items() if ahora - visto < ventana}
+    mesas[mesa_id] = ahora
+    cache.set(_key_mesas(area_id), mesas, timeout=ventana)
+
+
+def registrar_atencion(turno: Turno) -> None:
+    """Suma la duración de un turno finalizado al resumen de su área y su trámite."""
+    registrar_actividad_mesa(turno.area_id, turno.mesa_asignada_id)
+    segundos = _duracion(turno.fecha_hora_inicio_atencion, turno.fecha_hora_fin_atencion)
+    if segundos is None:
+        return
+    for ambito, ambito_id in (("area", turno.area_id), ("tramite", turno.tramite_id)):
+        resumen = cache.get(_key(ambito, ambito_id))
+        if resumen is None:
+            # La siembra ya incluye este turno (está confirmado)
+            resumen = _sembrar(ambito, ambito_id)
+        else:
+            _sumar(resumen, segundos)
+        cache.set(_key(ambito, ambito_id), resumen, timeout=None)
+
+
+# =====================================================================
+#  ESTIMACIÓN
+# =====================================================================
+def mesas_activas(area_id: int) -> int:
+    ventana = _config("ESTIMACION_VENTANA_MESAS_SEG", 900)
+    ahora = time.time()
+    mesas = cache.get(_key_mesas(area_id)) or {}
+    return sum(1 for visto in mesas.values() if ahora - visto < ventana)
+
+
+def segundos_por_turno(area_id: int) -> dict | None:
+    """
+    Cadencia del área: cada cuántos segundos avanza la cola (duración típica
+    / mesas activas), con el promedio móvil y con el percentil 90.
+    None si todavía no hay atenciones registradas.
+    """
+    resumen = resumen_duraciones("area", area_id)
+    if resumen["ewma"] is None:
+        return None
+    mesas = max(mesas_activas(area_id), 1)
+    p90 = percentil(resumen, 90) or resumen["ewma"]
+    return {
+        "tipico": resumen["ewma"] / mesas,
+        "maximo": max(p90, resumen["ewma"]) / mesas,
+        "mesas": mesas,
+    }
+
+
+def estimar_espera(area_id: int, adelante: int) -> dict | None:
+    """
+    Espera estimada en minutos para un turno con `adelante` turnos delante:
+    {"minutos": típico, "minutos_max": con el percentil 90, "mesas": activas}.
+    None si el área no tiene atenciones registradas.
+    """
+    cadencia = segundos_por_turno(area_id)
+    if cadencia is None:
+        return None
+    return {
+        "minutos": math.ceil(adelante * cadencia["tipico"] / 60),
+        "minutos_max": math.ceil(adelante * cadencia["maximo"] / 60),
+        "mesas": cadencia["mesas"],
+    }
+
+
+def duracion_estimada(tramite_id: int) -> int | None:
+    """Duración típica (minutos, promedio móvil) de la atención de un trámite."""
+    resumen = resumen_duraciones("tramite", tramite_id)
+    if resumen["ewma"] is None:
+        return None
+    return math.ceil(resumen["ewma"] / 60)
@@ -0,0 +1,90 @@
+# apps/core/identidad.py
+"""
+Identidad del usuario logueado: Usuario de la tabla propia, roles, mesa
+asignada y área, resueltos una vez y cacheados por username.
+
+Reemplaza las consultas que cada vista repetía (Usuario por username, EXISTS
+sobre UsuarioRol, Mesa del operador). Se recarga al iniciar sesión y cuando el
+admin modifica Usuario / UsuarioRol / Rol / Mesa (invalidar_identidades).
+
+Los objetos Usuario y Mesa de la identidad se comparten entre requests:
+tratarlos como solo lectura.
+"""
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in
+from django.dispatch import receiver
+
+from .cache_local import CacheVersionada
+from .models import Mesa, Usuario, UsuarioRol
+
+ROLES_DIRECTOR = frozenset({"Director", "SuperAdmin"})
+ROL_OPERADOR = "Operador"
+
+_identidades = CacheVersionada("identidad", ttl=getattr(settings, "IDENTIDAD_CACHE_TTL", 60))
+
+
+@dataclass(frozen=True)
+class Identidad:
+    usuario: Usuario | None = None
+    roles: frozenset = field(default_factory=frozenset)
+    mesa: Mesa | None = None
+
+    @property
+    def usuario_id(self) -> int | None:
+        return self.usuario.pk if self.usuario else None
+
+    @property
+    def area_id(self) -> int | None:
+        return self.mesa.area_id if self.mesa else None
+
+    @property
+    def es_operador(self) -> bool:
+        return ROL_OPERADOR in self.roles
+
+    @property
+    def es_director(self) -> bool:
+        return bool(self.roles & ROLES_DIRECTOR)
+
+
+def _cargar(username: str) -> Identidad:
+    usuario = Usuario.objects.filter(username=username).first()
+    if usuario is None:
+        return Identidad()
+    roles = frozenset(
+        UsuarioRol.objects.filter(usuario=usuario).values_list("rol__nombre_rol", flat=True)
+    )
+    mesa = (
+        Mesa.objects.filter(operador_asignado=usuario, activa=True)
+        .select_related("area")
+        .first()
+    )
+    return Identidad(usuario=usuario, roles=roles, mesa=mesa)
+
+
+def obtener_identidad(user) -> Identidad:
+    """Identidad del usuario Django Auth (vacía si no está en la tabla Usuario)."""
+    if not user.is_authenticated:
+        return Identidad()
+    # Memo en el objeto user: varias llamadas en el mismo request no tocan la caché
+    identidad = getattr(user, "_identidad_turnero", None)
+    if identidad is None:
+        identidad = _identidades.obtener(user.username, lambda: _cargar(user.username))
+        user._identidad_turnero = identidad
+    return identidad
+
+
+def invalidar_identidad(username: str) -> None:
+    _identidades.invalidar(username)
+
+
+def invalidar_identidades() -> None:
+    """Descarta todas las identidades cacheadas (en todos los procesos)."""
+    _identidades.invalidar_todo()
+
+
+@receiver(user_logged_in, dispatch_uid="identidad_al_login")
+def _recargar_al_login(sender, request, user, **kwargs):
+    invalidar_identidad(user.username)
+    user.__dict__.pop("_identidad_turnero", None)
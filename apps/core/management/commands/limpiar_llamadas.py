@@ -1,22 +1,43 @@
 """
 Management command para limpiar eventos antiguos de LlamadaTurno.
-Uso: python manage.py limpiar_llamadas [--dias DIAS]
+Uso: python manage.py limpiar_llamadas [--dias DIAS] [--tanda N] [--pausa SEG] [--max-tandas N]
+
+Pensado para el Programador de tareas (p.ej. todas las noches): borra en
+tandas acotadas para no bloquear la tabla mientras se atiende.
 """
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from datetime import timedelta
+
+from apps.core.mantenimiento import limite_retencion_llamadas, purgar_llamadas
 from apps.core.models import LlamadaTurno
 
 
 class Command(BaseCommand):
-    help = 'Limpia eventos antiguos de LlamadaTurno (por defecto mayores a 7 días)'
+    help = 'Limpia eventos antiguos de LlamadaTurno (por defecto LLAMADAS_RETENCION_DIAS)'
 
     def add_arguments(self, parser):
         parser.add_argument(
             '--dias',
             type=int,
-            default=7,
-            help='Número de días de antigüedad para eliminar (default: 7)'
+            default=None,
+            help='Número de días de antigüedad para eliminar (default: LLAMADAS_RETENCION_DIAS)'
+        )
+        parser.add_argument(
+            '--tanda',
+            type=int,
+            default=5000,
+            help='Filas borradas por sentencia (default: 5000)'
+        )
+        parser.add_argument(
+            '--pausa',
+            type=float,
+            default=0.0,
+            help='Segundos de espera entre tandas (default: 0)'
+        )
+        parser.add_argument(
+            '--max-tandas',
+            type=int,
+            default=None,
+            help='Cortar después de N tandas; la próxima corrida continúa'
         )
         parser.add_argument(
             '--dry-run',
@@ -25,31 +46,45 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        dias = options['dias']
-        dry_run = options['dry_run']
-        
-        limite = timezone.now() - timedelta(days=dias)
-        eventos_antiguos = LlamadaTurno.objects.filter(fecha_hora__lt=limite)
-        
-        count = eventos_antiguos.count()
-        
-        if dry_run:
+        limite = limite_retencion_llamadas(options['dias'])
+
+        if options['dry_run']:
+            count = LlamadaTurno.objects.filter(fecha_hora__lt=limite).count()
             self.stdout.write(
                 self.style.WARNING(
                     f"[DRY RUN] Se eliminarían {count} eventos de llamada "
                     f"anteriores a {limite.strftime('%Y-%m-%d %H:%M:%S')}"
                 )
             )
-        else:
-            if count == 0:
-                self.stdout.write(
-                    self.style.SUCCESS("No hay eventos antiguos para limpiar")
-                )
-            else:
-                eventos_antiguos.delete()
+            return
+
+        def progreso(resultado):
+            if options['verbosity'] > 1:
                 self.stdout.write(
-                    self.style.SUCCESS(
-                        f"✓ Eliminados {count} eventos de llamada "
-                        f"anteriores a {limite.strftime('%Y-%m-%d %H:%M:%S')}"
-                    )
+                    f"  tanda {resultado.tandas}: {resultado.eliminados} eliminados "
+                    f"({resultado.filas_por_segundo:.0f} filas/s)"
                 )
+
+        resultado = purgar_llamadas(
+            dias=options['dias'],
+            tamanio_tanda=options['tanda'],
+            pausa=options['pausa'],
+            max_tandas=options['max_tandas'],
+            progreso=progreso,
+        )
+
+        if resultado.eliminados == 0:
+            self.stdout.write(self.style.SUCCESS("No hay eventos antiguos para limpiar"))
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Eliminados {resultado.eliminados} eventos de llamada "
+                f"anteriores a {limite.strftime('%Y-%m-%d %H:%M:%S')} "
+                f"en {resultado.tandas} tanda(s), {resultado.segundos:.1f}s "
+                f"({resultado.filas_por_segundo:.0f} filas/s)"
+            )
+        )
+        if not resultado.completa:
+            self.stdout.write(
+                self.style.WARNING("Quedan eventos por borrar (--max-tandas): la próxima corrida continúa")
+            )
@@ -0,0 +1,73 @@
+"""
+Management command para precargar personas desde Aportes.
+Uso: python manage.py precargar_personas ARCHIVO [--tanda N]
+     python manage.py precargar_personas --dni 12345678 --dni 23456789
+
+ARCHIVO: texto o CSV con un DNI por línea (se toma la primera columna;
+se ignoran líneas vacías, encabezados y separadores de miles).
+"""
+import re
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core import services
+
+
+class Command(BaseCommand):
+    help = 'Resuelve DNIs contra Aportes y los guarda en Persona (visitas esperadas)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'archivo',
+            nargs='?',
+            help='Archivo con un DNI por línea ("-" para leer de stdin)'
+        )
+        parser.add_argument(
+            '--dni',
+            action='append',
+            default=[],
+            help='DNI a precargar (puede repetirse)'
+        )
+        parser.add_argument(
+            '--tanda',
+            type=int,
+            default=200,
+            help='DNIs consultados por cursor (default: 200)'
+        )
+
+    def handle(self, *args, **options):
+        lineas = list(options['dni'])
+        if options['archivo'] == '-':
+            lineas += sys.stdin.read().splitlines()
+        elif options['archivo']:
+            try:
+                with open(options['archivo'], encoding='utf-8-sig') as f:
+                    lineas += f.read().splitlines()
+            except OSError as e:
+                raise CommandError(f"No se pudo leer {options['archivo']}: {e}")
+
+        dnis = []
+        for linea in lineas:
+            primera = re.split(r'[;,\t]', linea.strip(), maxsplit=1)[0].replace('.', '')
+            if primera.isdigit() and 1_000_000 <= int(primera) <= 99_999_999:
+                dnis.append(int(primera))
+
+        if not dnis:
+            raise CommandError('No se indicaron DNIs válidos')
+
+        self.stdout.write(f"Precargando {len(set(dnis))} DNIs...")
+        resultado = services.precargar_personas(dnis, tamanio_tanda=options['tanda'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {resultado['guardados']} personas guardadas "
+            f"({resultado['no_encontrados']} no encontradas en Aportes)"
+        ))
+        if resultado['sin_respuesta']:
+            self.stdout.write(self.style.WARNING(
+                f"⚠ {resultado['sin_respuesta']} DNIs sin respuesta de Aportes (reintentar más tarde "
+                f"con --dni o un archivo con la lista{'' if options['verbosity'] > 1 else '; -v 2 la muestra'})"
+            ))
+            if options['verbosity'] > 1:
+                for dni in resultado['no_consultados']:
+                    self.stdout.write(str(dni))
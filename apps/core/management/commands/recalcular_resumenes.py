@@ -0,0 +1,72 @@
+"""
+Management command para recalcular los resúmenes por hora (ResumenTurnoHora).
+Uso: python manage.py recalcular_resumenes [--dias N | --desde AAAA-MM-DD [--hasta AAAA-MM-DD]] [--area ID]
+
+Carga inicial (--desde con la fecha del primer turno) y corrección diaria:
+pensado para el Programador de tareas (todas las noches, después de
+vencer_turnos, con --dias 1) para rehacer el día anterior desde Turno. Cada
+día se recalcula en su propia transacción. Los turnos derivados quedan
+atribuidos al último operador (ver apps.core.resumenes).
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from apps.core.resumenes import recalcular_dia
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los indicadores por hora (ResumenTurnoHora) a partir de Turno'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=1,
+            help='Recalcula los últimos N días sin contar hoy (default: 1, el día anterior)'
+        )
+        parser.add_argument(
+            '--desde',
+            type=date.fromisoformat,
+            default=None,
+            help='Primer día a recalcular (AAAA-MM-DD); reemplaza a --dias'
+        )
+        parser.add_argument(
+            '--hasta',
+            type=date.fromisoformat,
+            default=None,
+            help='Último día a recalcular (AAAA-MM-DD, default: hoy si se usa --desde)'
+        )
+        parser.add_argument(
+            '--area',
+            type=int,
+            default=None,
+            help='Sólo esta área (default: todas)'
+        )
+
+    def handle(self, *args, **options):
+        hoy = timezone.localdate()
+        if options['desde'] is not None:
+            desde = options['desde']
+            hasta = options['hasta'] or hoy
+        else:
+            desde = hoy - timedelta(days=options['dias'])
+            hasta = hoy - timedelta(days=1)
+        if desde > hasta:
+            raise CommandError(f"Rango vacío: {desde} > {hasta}")
+
+        filas = 0
+        dia = desde
+        while dia <= hasta:
+            escritas = recalcular_dia(dia, area_id=options['area'])
+            filas += escritas
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {dia}: {escritas} filas")
+            dia += timedelta(days=1)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Recalculados {(hasta - desde).days + 1} día(s) del {desde} al {hasta}: {filas} filas"
+            )
+        )
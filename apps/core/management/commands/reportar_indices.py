@@ -0,0 +1,137 @@
+"""
+Management command para revisar los índices de la base Turnero (SQL Server).
+Uso: python manage.py reportar_indices [--top N] [--tabla TABLA]
+
+Informa:
+  - Índices declarados en Meta.indexes que no existen en la base
+    (falta aplicar algún script de scripts/).
+  - Índices sugeridos por el optimizador (sys.dm_db_missing_index_*).
+  - Índices no clustered sin lecturas desde el último reinicio del
+    servidor (sys.dm_db_index_usage_stats) que sólo suman escrituras.
+
+Las DMVs se reinician con el servicio de SQL Server: conviene correrlo
+después de al menos un día completo de atención.
+"""
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+SQL_INDICES_EXISTENTES = """
+    SELECT t.name, i.name
+    FROM sys.indexes i
+    JOIN sys.tables t ON t.object_id = i.object_id
+    WHERE i.name IS NOT NULL
+"""
+
+SQL_INDICES_FALTANTES = """
+    SELECT TOP (%s)
+        OBJECT_NAME(d.object_id, d.database_id) AS tabla,
+        d.equality_columns,
+        d.inequality_columns,
+        d.included_columns,
+        s.user_seeks + s.user_scans AS usos,
+        s.avg_total_user_cost * s.avg_user_impact * (s.user_seeks + s.user_scans) AS mejora
+    FROM sys.dm_db_missing_index_details d
+    JOIN sys.dm_db_missing_index_groups g ON g.index_handle = d.index_handle
+    JOIN sys.dm_db_missing_index_group_stats s ON s.group_handle = g.index_group_handle
+    WHERE d.database_id = DB_ID()
+      AND (%s IS NULL OR OBJECT_NAME(d.object_id, d.database_id) = %s)
+    ORDER BY mejora DESC
+"""
+
+SQL_INDICES_SIN_USO = """
+    SELECT TOP (%s)
+        t.name AS tabla,
+        i.name AS indice,
+        ISNULL(u.user_updates, 0) AS escrituras
+    FROM sys.indexes i
+    JOIN sys.tables t ON t.object_id = i.object_id
+    LEFT JOIN sys.dm_db_index_usage_stats u
+        ON u.object_id = i.object_id AND u.index_id = i.index_id AND u.database_id = DB_ID()
+    WHERE i.type_desc = 'NONCLUSTERED'
+      AND i.is_primary_key = 0
+      AND i.is_unique_constraint = 0
+      AND ISNULL(u.user_seeks, 0) + ISNULL(u.user_scans, 0) + ISNULL(u.user_lookups, 0) = 0
+      AND (%s IS NULL OR t.name = %s)
+    ORDER BY escrituras DESC
+"""
+
+
+class Command(BaseCommand):
+    help = 'Reporta índices faltantes y sin uso en SQL Server (DMVs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Máximo de filas por sección (default: 20)'
+        )
+        parser.add_argument(
+            '--tabla',
+            help='Filtrar por tabla (ej: Turno)'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'microsoft':
+            raise CommandError(
+                f"reportar_indices requiere SQL Server (backend actual: {connection.vendor})"
+            )
+        top = options['top']
+        tabla = options['tabla']
+
+        with connection.cursor() as cursor:
+            self._declarados_faltantes(cursor, tabla)
+            self._sugeridos(cursor, top, tabla)
+            self._sin_uso(cursor, top, tabla)
+
+    def _declarados_faltantes(self, cursor, tabla):
+        self.stdout.write(self.style.MIGRATE_HEADING("Índices declarados en los modelos"))
+        cursor.execute(SQL_INDICES_EXISTENTES)
+        existentes = {(t.lower(), i.lower()) for t, i in cursor.fetchall()}
+
+        faltantes = 0
+        for model in apps.get_app_config('core').get_models():
+            db_table = model._meta.db_table
+            if tabla and db_table.lower() != tabla.lower():
+                continue
+            for index in model._meta.indexes:
+                if (db_table.lower(), index.name.lower()) not in existentes:
+                    faltantes += 1
+                    columnas = ", ".join(
+                        f"{model._meta.get_field(campo).column}{' DESC' if orden else ''}"
+                        for campo, orden in index.fields_orders
+                    )
+                    self.stdout.write(self.style.WARNING(f"  ✗ {db_table}.{index.name} ({columnas})"))
+
+        if faltantes:
+            self.stdout.write("  → Aplicar los scripts de índices de scripts/ (ver README)")
+        else:
+            self.stdout.write(self.style.SUCCESS("  ✓ Todos los índices declarados existen"))
+
+    def _sugeridos(self, cursor, top, tabla):
+        self.stdout.write(self.style.MIGRATE_HEADING("\nÍndices sugeridos por el optimizador"))
+        # El filtro por tabla va antes del TOP: si no, las N peores de otras tablas lo tapan
+        cursor.execute(SQL_INDICES_FALTANTES, [top, tabla, tabla])
+        filas = cursor.fetchall()
+        if not filas:
+            self.stdout.write(self.style.SUCCESS("  ✓ Sin sugerencias"))
+            return
+        for nombre, igualdad, desigualdad, incluidas, usos, mejora in filas:
+            self.stdout.write(
+                f"  {nombre}: clave=({', '.join(filter(None, [igualdad, desigualdad]))})"
+                f"{f' INCLUDE ({incluidas})' if incluidas else ''}"
+                f" — {usos} usos, mejora estimada {mejora:,.0f}"
+            )
+
+    def _sin_uso(self, cursor, top, tabla):
+        self.stdout.write(self.style.MIGRATE_HEADING("\nÍndices sin lecturas"))
+        cursor.execute(SQL_INDICES_SIN_USO, [top, tabla, tabla])
+        filas = cursor.fetchall()
+        if not filas:
+            self.stdout.write(self.style.SUCCESS("  ✓ Todos los índices tienen lecturas"))
+            return
+        for nombre_tabla, indice, escrituras in filas:
+            self.stdout.write(
+                self.style.WARNING(f"  {nombre_tabla}.{indice}: 0 lecturas, {escrituras} escrituras")
+            )
@@ -0,0 +1,64 @@
+"""
+Management command para vencer los turnos de días anteriores.
+Uso: python manage.py vencer_turnos [--area ID] [--dry-run]
+
+Pensado para el Programador de tareas (todos los días, pasada la
+medianoche): pasa a NO_PRESENTO los turnos PENDIENTE/LLAMANDO de días
+anteriores en las áreas con vencimiento_turnos activo y emite un único
+evento turnos_vencidos por área. La emisión de turnos ya no lo hace en
+cada request (sólo como respaldo, una vez por día y área).
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.core.mantenimiento import vencer_turnos_todas_las_areas
+from apps.core.models import ConfiguracionArea, Turno
+
+
+class Command(BaseCommand):
+    help = 'Vence (NO_PRESENTO) los turnos pendientes de días anteriores'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--area',
+            type=int,
+            default=None,
+            help='Sólo esta área (default: todas las que tienen vencimiento_turnos)'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Muestra cuántos turnos se vencerían sin modificarlos'
+        )
+
+    def handle(self, *args, **options):
+        hoy = timezone.localdate()
+
+        if options['dry_run']:
+            areas = ConfiguracionArea.objects.filter(vencimiento_turnos=True)
+            if options['area'] is not None:
+                areas = areas.filter(area_id=options['area'])
+            count = Turno.objects.filter(
+                area_id__in=areas.values('area_id'),
+                fecha_turno__lt=hoy,
+                estado_id__in=[Turno.PENDIENTE, Turno.LLAMANDO],
+            ).count()
+            self.stdout.write(
+                self.style.WARNING(f"[DRY RUN] Se vencerían {count} turnos anteriores a {hoy}")
+            )
+            return
+
+        vencidos = vencer_turnos_todas_las_areas(hoy, area_id=options['area'])
+        total = sum(vencidos.values())
+        if options['verbosity'] > 1:
+            for area_id, cantidad in vencidos.items():
+                self.stdout.write(f"  área {area_id}: {cantidad} vencidos")
+
+        if total == 0:
+            self.stdout.write(self.style.SUCCESS("No hay turnos de días anteriores para vencer"))
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✓ Vencidos {total} turnos anteriores a {hoy} en {len(vencidos)} área(s)"
+            )
+        )
@@ -0,0 +1,200 @@
+# apps/core/mantenimiento.py
+"""
+Tareas de mantenimiento para correr fuera de los requests (comandos de
+manage.py programados en el Programador de tareas).
+
+Purga de LlamadaTurno: borra en tandas acotadas con un DELETE directo
+(sin el SELECT previo que hace QuerySet.delete() para cascadas y señales;
+LlamadaTurno no tiene dependientes). Cada tanda es su propia transacción,
+así los bloqueos duran lo que tarda una tanda y no todo el rango.
+
+  - SQL Server: DELETE TOP (n) ... WHERE FechaHoraLlamada < limite
+  - Otros backends: DELETE ... WHERE Id IN (SELECT Id ... LIMIT n)
+
+Vencimiento de turnos de días anteriores: un único UPDATE por área al pasar
+de día (comando vencer_turnos a la madrugada y, como respaldo, una vez por
+día y área desde la primera emisión), con un solo evento turnos_vencidos en
+lugar de un evento por turno. Los vencidos se suman a ResumenTurnoHora
+agrupados por fila (apps.core.resumenes.registrar_vencidos).
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .estadisticas import invalidar_stats_dashboard
+from .models import ConfiguracionArea, LlamadaTurno, Turno
+from .resumenes import CAMPOS_TURNO, registrar_vencidos
+from .websocket_utils import emitir_turnos_vencidos
+
+logger = logging.getLogger(__name__)
+
+VENCIMIENTO_CACHE_KEY = "turnos:vencimiento:{area_id}:{fecha}"
+VENCIMIENTO_CACHE_TTL = 2 * 24 * 3600
+
+# Áreas ya vencidas (o en curso) en este proceso: {area_id: fecha}
+_vencimientos_hechos: dict[int, date] = {}
+
+
+# =====================================================================
+#  PURGA DE LLAMADAS
+# =====================================================================
+
+@dataclass
+class ResultadoPurga:
+    eliminados: int = 0
+    tandas: int = 0
+    segundos: float = 0.0
+    completa: bool = True
+
+    @property
+    def filas_por_segundo(self) -> float:
+        return self.eliminados / self.segundos if self.segundos else 0.0
+
+
+def _sql_purga_llamadas() -> str:
+    q = connection.ops.quote_name
+    tabla = q(LlamadaTurno._meta.db_table)
+    fecha = q("FechaHoraLlamada")
+    pk = q("IdLlamadaTurno")
+    if connection.vendor == "microsoft":
+        return f"DELETE TOP (%s) FROM {tabla} WHERE {fecha} < %s"
+    return (
+        f"DELETE FROM {tabla} WHERE {pk} IN "
+        f"(SELECT {pk} FROM {tabla} WHERE {fecha} < %s LIMIT %s)"
+    )
+
+
+def _borrar_tanda(limite: datetime, tamanio_tanda: int) -> int:
+    params = [tamanio_tanda, limite] if connection.vendor == "microsoft" else [limite, tamanio_tanda]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(_sql_purga_llamadas(), params)
+        return cursor.rowcount
+
+
+def limite_retencion_llamadas(dias: int | None = None) -> datetime:
+    if dias is None:
+        dias = getattr(settings, "LLAMADAS_RETENCION_DIAS", 1)
+    return timezone.now() - timedelta(days=dias)
+
+
+def purgar_llamadas(
+    dias: int | None = None,
+    tamanio_tanda: int = 5000,
+    pausa: float = 0.0,
+    max_tandas: int | None = None,
+    progreso=None,
+) -> ResultadoPurga:
+    """
+    Borra las LlamadaTurno más antiguas que la retención (LLAMADAS_RETENCION_DIAS
+    si `dias` es None) en tandas de `tamanio_tanda` filas.
+
+    Args:
+        pausa: segundos de espera entre tandas (deja pasar a los operadores)
+        max_tandas: corta después de tantas tandas (la próxima corrida sigue)
+        progreso: callable(resultado) invocado después de cada tanda
+    """
+    limite = limite_retencion_llamadas(dias)
+    resultado = ResultadoPurga()
+    inicio = time.monotonic()
+
+    while True:
+        borradas = _borrar_tanda(limite, tamanio_tanda)
+        resultado.eliminados += borradas
+        resultado.tandas += 1
+        resultado.segundos = time.monotonic() - inicio
+        if progreso:
+            progreso(resultado)
+        if borradas < tamanio_tanda:
+            break
+        if max_tandas and resultado.tandas >= max_tandas:
+            resultado.completa = False
+            break
+        if pausa:
+            time.sleep(pausa)
+
+    logger.info(
+        f"Purga LlamadaTurno < {limite:%Y-%m-%d %H:%M}: {resultado.eliminados} filas "
+        f"en {resultado.tandas} tanda(s), {resultado.segundos:.1f}s"
+        f"{'' if resultado.completa else ' (incompleta: max_tandas)'}"
+    )
+    return resultado
+
+
+# =====================================================================
+#  VENCIMIENTO DE TURNOS DE DÍAS ANTERIORES
+# =====================================================================
+def vencer_turnos_anteriores(area_id: int, hoy: date | None = None) -> int:
+    """
+    Marca como NO_PRESENTO los turnos PENDIENTE/LLAMANDO del área con fecha
+    anterior a `hoy` y, si hubo alguno, emite un único turnos_vencidos.
+    Retorna la cantidad de turnos vencidos.
+    """
+    hoy = hoy or timezone.localdate()
+    with transaction.atomic():
+        turnos = Turno.objects.filter(
+            area_id=area_id,
+            fecha_turno__lt=hoy,
+            estado_id__in=[Turno.PENDIENTE, Turno.LLAMANDO],
+        )
+        # Para los resúmenes por hora: los mismos turnos, bloqueados hasta el UPDATE
+        filas = list(turnos.select_for_update().values(*CAMPOS_TURNO))
+        vencidos = turnos.update(estado_id=Turno.NO_PRESENTO)
+        if vencidos:
+            transaction.on_commit(invalidar_stats_dashboard, robust=True)
+            transaction.on_commit(lambda: registrar_vencidos(filas), robust=True)
+            transaction.on_commit(
+                lambda: emitir_turnos_vencidos(area_id, vencidos, hoy), robust=True
+            )
+
+    cache.set(VENCIMIENTO_CACHE_KEY.format(area_id=area_id, fecha=hoy), True, VENCIMIENTO_CACHE_TTL)
+    _vencimientos_hechos[area_id] = hoy
+    if vencidos:
+        logger.info(f"Vencimiento área {area_id}: {vencidos} turnos anteriores a {hoy} → NO_PRESENTO")
+    return vencidos
+
+
+def _vencer_una_vez(area_id: int, hoy: date) -> None:
+    """Vence el área si ningún proceso lo hizo todavía hoy (cache.add como candado)."""
+    _vencimientos_hechos[area_id] = hoy
+    clave = VENCIMIENTO_CACHE_KEY.format(area_id=area_id, fecha=hoy)
+    if not cache.add(clave, True, VENCIMIENTO_CACHE_TTL):
+        return
+    try:
+        vencer_turnos_anteriores(area_id, hoy)
+    except Exception:
+        # Otro request (o el comando) lo reintenta
+        cache.delete(clave)
+        _vencimientos_hechos.pop(area_id, None)
+        raise
+
+
+def asegurar_vencimiento(area_id: int, hoy: date) -> None:
+    """
+    Respaldo del comando vencer_turnos desde la emisión: la primera emisión
+    del día en cada proceso programa el vencimiento para después del COMMIT
+    (fuera de la transacción del turno); el resto sólo consulta un dict.
+    """
+    if _vencimientos_hechos.get(area_id) == hoy:
+        return
+    transaction.on_commit(lambda: _vencer_una_vez(area_id, hoy), robust=True)
+
+
+def vencer_turnos_todas_las_areas(hoy: date | None = None, area_id: int | None = None) -> dict[int, int]:
+    """
+    Vence los turnos de días anteriores en las áreas con vencimiento_turnos
+    activo (o sólo en `area_id`). Retorna {area_id: vencidos}.
+    """
+    hoy = hoy or timezone.localdate()
+    configuraciones = ConfiguracionArea.objects.filter(vencimiento_turnos=True)
+    if area_id is not None:
+        configuraciones = configuraciones.filter(area_id=area_id)
+    return {
+        id_area: vencer_turnos_anteriores(id_area, hoy)
+        for id_area in configuraciones.values_list("area_id", flat=True)
+    }
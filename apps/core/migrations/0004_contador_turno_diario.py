@@ -0,0 +1,29 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_add_motivo_cierre'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorTurnoDiario',
+            fields=[
+                ('id', models.AutoField(db_column='IdContadorTurnoDiario', primary_key=True, serialize=False)),
+                ('fecha', models.DateField(db_column='Fecha')),
+                ('ultimo_numero', models.IntegerField(db_column='UltimoNumero', default=0)),
+                ('area', models.ForeignKey(db_column='FkIdArea', on_delete=django.db.models.deletion.CASCADE, related_name='contadores_turno', to='core.area')),
+            ],
+            options={
+                'db_table': 'ContadorTurnoDiario',
+                'managed': True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='contadorturnodiario',
+            constraint=models.UniqueConstraint(fields=('area', 'fecha'), name='uq_contador_area_fecha'),
+        ),
+    ]
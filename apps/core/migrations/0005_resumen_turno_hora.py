@@ -0,0 +1,50 @@
+# Escrita a mano: makemigrations arrastra diferencias de los modelos
+# managed=False (tablas del esquema existente) que no corresponde aplicar.
+# Sólo crea ResumenTurnoHora.
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_contador_turno_diario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenTurnoHora',
+            fields=[
+                ('id', models.BigAutoField(db_column='IdResumenTurnoHora', primary_key=True, serialize=False)),
+                ('fecha', models.DateField(db_column='Fecha')),
+                ('hora', models.SmallIntegerField(db_column='Hora')),
+                ('emitidos', models.IntegerField(db_column='Emitidos', default=0)),
+                ('iniciados', models.IntegerField(db_column='Iniciados', default=0)),
+                ('espera_seg', models.BigIntegerField(db_column='EsperaSegTotal', default=0)),
+                ('finalizados', models.IntegerField(db_column='Finalizados', default=0)),
+                ('atencion_seg', models.BigIntegerField(db_column='AtencionSegTotal', default=0)),
+                ('no_presento', models.IntegerField(db_column='NoPresento', default=0)),
+                ('area', models.ForeignKey(db_column='FkIdArea', on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='core.area')),
+                ('tramite', models.ForeignKey(db_column='FkIdTramite', on_delete=django.db.models.deletion.CASCADE, related_name='resumenes', to='core.tramite')),
+                ('operador', models.ForeignKey(blank=True, db_column='FkIdOperador', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='resumenes', to='core.usuario')),
+                ('motivo_cierre', models.ForeignKey(blank=True, db_column='FkIdMotivoCierre', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='resumenes', to='core.motivocierre')),
+            ],
+            options={
+                'db_table': 'ResumenTurnoHora',
+                'managed': True,
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='resumenturnohora',
+            constraint=models.UniqueConstraint(fields=('fecha', 'hora', 'area', 'tramite', 'operador', 'motivo_cierre'), name='uq_resumen_turno_hora'),
+        ),
+        migrations.AddIndex(
+            model_name='resumenturnohora',
+            index=models.Index(fields=['area', 'fecha'], name='idx_resumen_area_fecha'),
+        ),
+        migrations.AddIndex(
+            model_name='resumenturnohora',
+            index=models.Index(fields=['operador', 'fecha'], name='idx_resumen_operador_fecha'),
+        ),
+    ]
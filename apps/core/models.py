@@ -1,8 +1,11 @@
 ﻿# apps/core/models.py
 # Modelos mapeados a tablas SQL Server (managed = False)
+from django.conf import settings
 from django.db import models
 from datetime import time
 
+from .cache_local import CacheVersionada
+
 
 # -----------------------------------------------
 # 0. Usuario (tabla propia, NO usa Django Auth)
@@ -190,10 +193,10 @@ class Mesa(models.Model):
         """
         Verifica si la mesa puede atender un trámite específico.
         Si no tiene trámites asignados, puede atender todos.
+        Usa el perfil de ruteo cacheado (apps.core.ruteo).
         """
-        if not self.tramites.exists():
-            return True  # Sin restricción = atiende todos
-        return self.tramites.filter(id=tramite.id).exists()
+        from .ruteo import perfil_ruteo
+        return perfil_ruteo(self.pk).admite(tramite.id)
 
 
 # -----------------------------------------------
@@ -329,6 +332,10 @@ class Ticket(models.Model):
         managed  = False
         db_table = "Ticket"
         ordering = ["-fecha_hora_creacion"]
+        # Ver scripts/create_indices_turno.sql
+        indexes = [
+            models.Index(fields=["persona", "area"], name="IX_Ticket_Persona_Area"),
+        ]
 
     def __str__(self):
         return f"Ticket #{self.pk} - {self.persona} ({self.area})"
@@ -394,6 +401,9 @@ class Turno(models.Model):
         null=True, blank=True,
         db_column="FkIdMotivoCierre", related_name="turnos",
     )
+    # Copia de Ticket.prioridad para ordenar la cola sin el JOIN a Ticket
+    # (la escriben emitir_turno / crear_turno y derivar_turno)
+    prioridad                  = models.IntegerField(default=0, db_column="Prioridad")
     prioridad_consulta         = models.SmallIntegerField(default=0, db_column="PrioridadConsulta")
     observaciones              = models.TextField(null=True, blank=True, db_column="Observaciones")
     fecha_hora_inicio_atencion = models.DateTimeField(null=True, blank=True, db_column="FechaHoraInicioAtencion")
@@ -411,6 +421,18 @@ class Turno(models.Model):
         managed  = False
         db_table = "Turno"
         ordering = ["-fecha_hora_creacion"]
+        # Ver scripts/create_indices_turno.sql y add_prioridad_turno.sql (en
+        # SQL Server además llevan columnas INCLUDE). Se declaran acá para que
+        # las bases de prueba que crean estas tablas como managed tengan los
+        # mismos índices y para que reportar_indices los verifique.
+        indexes = [
+            models.Index(fields=["area", "estado", "fecha_turno"], name="IX_Turno_Area_Estado_Fecha"),
+            models.Index(fields=["area", "fecha_turno", "numero_visible"], name="IX_Turno_Area_Fecha_Numero"),
+            models.Index(fields=["operador", "estado"], name="IX_Turno_Operador_Estado"),
+            models.Index(fields=["ticket", "estado"], name="IX_Turno_Ticket_Estado"),
+            models.Index(fields=["area", "estado", "-prioridad", "fecha_hora_creacion"], name="IX_Turno_Cola_Prioridad"),
+            models.Index(fields=["mesa_asignada", "estado"], name="IX_Turno_Monitor"),
+        ]
 
     def __str__(self):
         nombre = self.ticket.persona.nombre_completo if self.ticket and self.ticket.persona else ""
@@ -424,6 +446,33 @@ class Turno(models.Model):
         return f"{nombre} | {self.tramite.nombre} | {mesa}"
 
 
+# -----------------------------------------------
+# 7.1 ContadorTurnoDiario - Numeración visible por área y día
+# -----------------------------------------------
+class ContadorTurnoDiario(models.Model):
+    """
+    Último numero_visible emitido por área y fecha.
+    Se incrementa con un UPDATE atómico (ver apps.core.numeracion).
+    """
+    id            = models.AutoField(primary_key=True, db_column="IdContadorTurnoDiario")
+    area          = models.ForeignKey(
+        Area, on_delete=models.CASCADE,
+        db_column="FkIdArea", related_name="contadores_turno",
+    )
+    fecha         = models.DateField(db_column="Fecha")
+    ultimo_numero = models.IntegerField(default=0, db_column="UltimoNumero")
+
+    class Meta:
+        managed  = True
+        db_table = "ContadorTurnoDiario"
+        constraints = [
+            models.UniqueConstraint(fields=["area", "fecha"], name="uq_contador_area_fecha"),
+        ]
+
+    def __str__(self):
+        return f"{self.area} | {self.fecha}: {self.ultimo_numero}"
+
+
 # -----------------------------------------------
 # 8. LlamadaTurno - Registro de llamadas y re-llamadas
 # -----------------------------------------------
@@ -471,6 +520,62 @@ class LlamadaTurno(models.Model):
         return f"{self.tipo_llamada} - Turno #{self.turno.pk} - {self.fecha_hora.strftime('%H:%M:%S')}"
 
 
+# -----------------------------------------------
+# 8.1 ResumenTurnoHora - Indicadores agregados por hora (reportes)
+# -----------------------------------------------
+class ResumenTurnoHora(models.Model):
+    """
+    Tabla de hechos para reportes: contadores y sumas de tiempos por hora,
+    área, trámite, operador y motivo de cierre. Se alimenta en cada
+    transición confirmada y se recalcula con `manage.py recalcular_resumenes`
+    (ver apps.core.resumenes). Los totales diarios son la suma de las horas.
+    """
+    id     = models.BigAutoField(primary_key=True, db_column="IdResumenTurnoHora")
+    fecha  = models.DateField(db_column="Fecha")
+    hora   = models.SmallIntegerField(db_column="Hora")
+    area   = models.ForeignKey(
+        Area, on_delete=models.CASCADE,
+        db_column="FkIdArea", related_name="resumenes",
+    )
+    tramite = models.ForeignKey(
+        Tramite, on_delete=models.CASCADE,
+        db_column="FkIdTramite", related_name="resumenes",
+    )
+    operador = models.ForeignKey(
+        Usuario, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        db_column="FkIdOperador", related_name="resumenes",
+    )
+    motivo_cierre = models.ForeignKey(
+        MotivoCierre, on_delete=models.SET_NULL,
+        null=True, blank=True,
+        db_column="FkIdMotivoCierre", related_name="resumenes",
+    )
+    emitidos     = models.IntegerField(default=0, db_column="Emitidos")
+    iniciados    = models.IntegerField(default=0, db_column="Iniciados")
+    espera_seg   = models.BigIntegerField(default=0, db_column="EsperaSegTotal")
+    finalizados  = models.IntegerField(default=0, db_column="Finalizados")
+    atencion_seg = models.BigIntegerField(default=0, db_column="AtencionSegTotal")
+    no_presento  = models.IntegerField(default=0, db_column="NoPresento")
+
+    class Meta:
+        managed  = True
+        db_table = "ResumenTurnoHora"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["fecha", "hora", "area", "tramite", "operador", "motivo_cierre"],
+                name="uq_resumen_turno_hora",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["area", "fecha"], name="idx_resumen_area_fecha"),
+            models.Index(fields=["operador", "fecha"], name="idx_resumen_operador_fecha"),
+        ]
+
+    def __str__(self):
+        return f"{self.area} | {self.fecha} {self.hora:02d}h | {self.tramite}"
+
+
 # -----------------------------------------------
 # 9. TurnoHistorialDerivacion
 # -----------------------------------------------
@@ -502,6 +607,11 @@ class TurnoHistorialDerivacion(models.Model):
 # -----------------------------------------------
 # 10. ConfiguracionArea (campos estructurados)
 # -----------------------------------------------
+_configuraciones = CacheVersionada(
+    "config_area", ttl=getattr(settings, "CONFIG_AREA_CACHE_TTL", 30)
+)
+
+
 class ConfiguracionArea(models.Model):
     id   = models.AutoField(primary_key=True, db_column="IdConfiguracionArea")
     area = models.OneToOneField(
@@ -570,9 +680,23 @@ class ConfiguracionArea(models.Model):
 
     @classmethod
     def get_for_area(cls, area):
-        """Obtiene o crea la configuración con valores por defecto para un área."""
-        config, created = cls.objects.get_or_create(area=area)
-        return config
+        """
+        Obtiene o crea la configuración con valores por defecto para un área.
+        Se sirve desde la caché del proceso (ver cache_local); el objeto
+        devuelto es compartido, no modificarlo.
+        """
+        area_id = getattr(area, "pk", area)
+        return _configuraciones.obtener(
+            area_id, lambda: cls.objects.get_or_create(area_id=area_id)[0]
+        )
+
+    @classmethod
+    def invalidar_cache(cls, area=None):
+        """Descarta la configuración cacheada de un área (o de todas si area es None)."""
+        if area is None:
+            _configuraciones.invalidar_todo()
+        else:
+            _configuraciones.invalidar(getattr(area, "pk", area))
 
 
 # -----------------------------------------------
@@ -0,0 +1,68 @@
+# apps/core/numeracion.py
+"""
+Numeración visible de turnos por área y día.
+
+En lugar de calcular Max(numero_visible)+1 sobre Turno (scan + carrera entre
+totems), cada área/día tiene una fila en ContadorTurnoDiario que se incrementa
+con un único UPDATE que devuelve el valor nuevo:
+
+  - SQL Server: UPDATE ... WITH (UPDLOCK, ROWLOCK) ... OUTPUT inserted.UltimoNumero
+  - SQLite / PostgreSQL: UPDATE ... RETURNING UltimoNumero
+
+El bloqueo de fila dura hasta el commit de la transacción que emite el turno:
+dos emisiones simultáneas en la misma área se serializan sobre esa fila y
+nunca obtienen el mismo número. Si la transacción se revierte, el número
+también vuelve atrás.
+"""
+from datetime import date
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Max
+
+from .models import ContadorTurnoDiario, Turno
+
+
+def _sql_incremento() -> str:
+    q = connection.ops.quote_name
+    tabla = q(ContadorTurnoDiario._meta.db_table)
+    ultimo = q("UltimoNumero")
+    filtro = f"{q('FkIdArea')} = %s AND {q('Fecha')} = %s"
+    if connection.vendor == "microsoft":
+        return (
+            f"UPDATE {tabla} WITH (UPDLOCK, ROWLOCK) SET {ultimo} = {ultimo} + 1 "
+            f"OUTPUT inserted.{ultimo} WHERE {filtro}"
+        )
+    return f"UPDATE {tabla} SET {ultimo} = {ultimo} + 1 WHERE {filtro} RETURNING {ultimo}"
+
+
+def _incrementar(area_id: int, fecha: date) -> int | None:
+    with connection.cursor() as cursor:
+        cursor.execute(_sql_incremento(), [area_id, fecha])
+        fila = cursor.fetchone()
+    return fila[0] if fila else None
+
+
+def siguiente_numero_visible(area_id: int, fecha: date) -> int:
+    """
+    Reserva el próximo numero_visible del área para `fecha`.
+    Debe llamarse dentro de la transacción que crea el turno.
+    """
+    numero = _incrementar(area_id, fecha)
+    if numero is not None:
+        return numero
+
+    # Primer turno del día: crear la fila. Se parte del máximo existente para
+    # no repetir números si el contador se habilita con turnos ya emitidos.
+    ultimo = (
+        Turno.objects.filter(area_id=area_id, fecha_turno=fecha)
+        .aggregate(Max("numero_visible"))["numero_visible__max"] or 0
+    )
+    try:
+        with transaction.atomic():
+            ContadorTurnoDiario.objects.create(
+                area_id=area_id, fecha=fecha, ultimo_numero=ultimo + 1,
+            )
+        return ultimo + 1
+    except IntegrityError:
+        # Otro proceso creó la fila al mismo tiempo: incrementar sobre la suya
+        return _incrementar(area_id, fecha)
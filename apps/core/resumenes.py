@@ -0,0 +1,252 @@
+# apps/core/resumenes.py
+"""
+Indicadores por hora (ResumenTurnoHora) para el dashboard y los reportes,
+sin recorrer Turno.
+
+Cada hecho de un turno suma en la fila (fecha, hora, área, trámite,
+operador, motivo de cierre) de su momento:
+
+  - emitido:      FechaHoraCreacion                         → emitidos
+  - iniciado:     FechaHoraInicioAtencion (espera = inicio − creación)
+                                                            → iniciados, espera_seg
+  - finalizado:   FechaHoraFinAtencion (atención = fin − inicio), con motivo
+                                                            → finalizados, atencion_seg
+  - no_presento:  FechaHoraCreacion (el turno no tiene hora de cierre)
+                                                            → no_presento
+
+Los servicios lo registran después del COMMIT de cada transición (un UPDATE
+con F() y, si la fila no existe, un INSERT). `recalcular_resumenes` rehace
+días completos desde Turno y corrige lo que no llegó a registrarse (caídas
+entre el COMMIT y el registro). Las consultas agrupan siempre con SUM, así
+que filas duplicadas por una carrera en el INSERT no alteran los totales.
+
+Limitación del recálculo: Turno guarda sólo el último operador y el último
+inicio de atención. Un turno derivado suma en línea un iniciado por cada
+operador que lo atendió; recalculado queda un solo iniciado (y la espera)
+con el operador final. Después de recalcular un día, la productividad por
+operador de los turnos derivados queda atribuida al operador que los cerró.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import ResumenTurnoHora, Turno
+
+logger = logging.getLogger(__name__)
+
+EMITIDO = "emitido"
+INICIADO = "iniciado"
+FINALIZADO = "finalizado"
+NO_PRESENTO = "no_presento"
+
+CONTADORES = ("emitidos", "iniciados", "espera_seg", "finalizados", "atencion_seg", "no_presento")
+
+# Campos de Turno que usa el mapeo (para .only() / .values())
+CAMPOS_TURNO = (
+    "id", "area_id", "tramite_id", "operador_id", "motivo_cierre_id", "estado_id",
+    "fecha_hora_creacion", "fecha_hora_inicio_atencion", "fecha_hora_fin_atencion",
+)
+
+
+def _segundos(desde: datetime | None, hasta: datetime | None) -> int:
+    if not desde or not hasta:
+        return 0
+    return max(int((hasta - desde).total_seconds()), 0)
+
+
+def hecho_de(turno, hecho: str) -> tuple[datetime, dict, dict] | None:
+    """
+    (momento, dimensiones, incrementos) de un hecho del turno, o None si el
+    turno no tiene los datos del hecho. `turno` puede ser un Turno o un dict
+    con CAMPOS_TURNO.
+    """
+    valor = turno.get if isinstance(turno, dict) else lambda campo: getattr(turno, campo)
+    dimensiones = {
+        "area_id": valor("area_id"),
+        "tramite_id": valor("tramite_id"),
+        "operador_id": None,
+        "motivo_cierre_id": None,
+    }
+    creacion = valor("fecha_hora_creacion")
+    inicio = valor("fecha_hora_inicio_atencion")
+    fin = valor("fecha_hora_fin_atencion")
+
+    if hecho == EMITIDO:
+        return creacion, dimensiones, {"emitidos": 1}
+    dimensiones["operador_id"] = valor("operador_id")
+    if hecho == INICIADO and inicio:
+        return inicio, dimensiones, {"iniciados": 1, "espera_seg": _segundos(creacion, inicio)}
+    if hecho == FINALIZADO and fin:
+        dimensiones["motivo_cierre_id"] = valor("motivo_cierre_id")
+        return fin, dimensiones, {"finalizados": 1, "atencion_seg": _segundos(inicio, fin)}
+    if hecho == NO_PRESENTO:
+        return creacion, dimensiones, {"no_presento": 1}
+    return None
+
+
+def _clave(momento: datetime, dimensiones: dict) -> dict:
+    local = timezone.localtime(momento)
+    return {"fecha": local.date(), "hora": local.hour, **dimensiones}
+
+
+# =====================================================================
+#  REGISTRO INCREMENTAL (on_commit de las transiciones)
+# =====================================================================
+def _sumar(clave: dict, incrementos: dict) -> None:
+    filas = ResumenTurnoHora.objects.filter(**clave)
+    actualizacion = {campo: F(campo) + valor for campo, valor in incrementos.items()}
+    if filas.update(**actualizacion):
+        return
+    try:
+        with transaction.atomic():
+            ResumenTurnoHora.objects.create(**clave, **incrementos)
+    except IntegrityError:
+        # Otro proceso insertó la fila entre el UPDATE y el INSERT
+        filas.update(**actualizacion)
+
+
+def registrar_hecho(turno: Turno, hecho: str) -> None:
+    """Suma un hecho del turno (EMITIDO, INICIADO, FINALIZADO, NO_PRESENTO) a su fila."""
+    datos = hecho_de(turno, hecho)
+    if datos is None:
+        return
+    momento, dimensiones, incrementos = datos
+    _sumar(_clave(momento, dimensiones), incrementos)
+
+
+def registrar_vencidos(turnos: list[dict]) -> None:
+    """No presentados por vencimiento masivo (dicts con CAMPOS_TURNO), agrupados por fila."""
+    acumulado = defaultdict(int)
+    for turno in turnos:
+        momento, dimensiones, _ = hecho_de(turno, NO_PRESENTO)
+        acumulado[tuple(sorted(_clave(momento, dimensiones).items()))] += 1
+    for clave, cantidad in acumulado.items():
+        _sumar(dict(clave), {"no_presento": cantidad})
+
+
+# =====================================================================
+#  RECÁLCULO DESDE TURNO (comando recalcular_resumenes)
+# =====================================================================
+def _rango_del_dia(fecha: date) -> tuple[datetime, datetime]:
+    inicio = timezone.make_aware(datetime.combine(fecha, time.min))
+    return inicio, inicio + timedelta(days=1)
+
+
+def recalcular_dia(fecha: date, area_id: int | None = None) -> int:
+    """
+    Rehace las filas de un día (de un área o de todas) a partir de Turno, en
+    una transacción. Devuelve la cantidad de filas escritas.
+    """
+    desde, hasta = _rango_del_dia(fecha)
+    turnos = Turno.objects.filter(
+        Q(fecha_hora_creacion__gte=desde, fecha_hora_creacion__lt=hasta)
+        | Q(fecha_hora_inicio_atencion__gte=desde, fecha_hora_inicio_atencion__lt=hasta)
+        | Q(fecha_hora_fin_atencion__gte=desde, fecha_hora_fin_atencion__lt=hasta)
+    )
+    resumenes = ResumenTurnoHora.objects.filter(fecha=fecha)
+    if area_id is not None:
+        turnos = turnos.filter(area_id=area_id)
+        resumenes = resumenes.filter(area_id=area_id)
+
+    filas = defaultdict(lambda: dict.fromkeys(CONTADORES, 0))
+    for turno in turnos.order_by().values(*CAMPOS_TURNO).iterator(chunk_size=2000):
+        hechos = [EMITIDO, INICIADO]
+        if turno["estado_id"] == Turno.FINALIZADO:
+            hechos.append(FINALIZADO)
+        elif turno["estado_id"] == Turno.NO_PRESENTO:
+            hechos.append(NO_PRESENTO)
+        for hecho in hechos:
+            datos = hecho_de(turno, hecho)
+            if datos is None:
+                continue
+            momento, dimensiones, incrementos = datos
+            clave = _clave(momento, dimensiones)
+            if clave["fecha"] != fecha:
+                continue
+            fila = filas[tuple(sorted(clave.items()))]
+            for campo, valor in incrementos.items():
+                fila[campo] += valor
+
+    with transaction.atomic():
+        resumenes.delete()
+        ResumenTurnoHora.objects.bulk_create(
+            [ResumenTurnoHora(**dict(clave), **contadores) for clave, contadores in filas.items()],
+            batch_size=500,
+        )
+    logger.info(f"Resúmenes {fecha}{f' área {area_id}' if area_id is not None else ''}: {len(filas)} filas recalculadas")
+    return len(filas)
+
+
+# =====================================================================
+#  CONSULTAS (dashboard y reportes)
+# =====================================================================
+AGRUPACIONES = {
+    "dia": ("fecha",),
+    "hora": ("hora",),
+    "area": ("area_id", "area__nombre"),
+    "tramite": ("tramite_id", "tramite__nombre"),
+    "operador": ("operador_id", "operador__display_name"),
+    "motivo": ("motivo_cierre_id", "motivo_cierre__nombre"),
+}
+
+
+def _indicadores(fila: dict) -> dict:
+    """Promedios y tasas a partir de los totales de un grupo."""
+    cerrados = fila["finalizados"] + fila["no_presento"]
+    return {
+        "espera_promedio_min": round(fila["espera_seg"] / fila["iniciados"] / 60, 1) if fila["iniciados"] else None,
+        "atencion_promedio_min": round(fila["atencion_seg"] / fila["finalizados"] / 60, 1) if fila["finalizados"] else None,
+        "tasa_no_presento": round(fila["no_presento"] / cerrados, 3) if cerrados else None,
+    }
+
+
+def obtener_indicadores(
+    desde: date,
+    hasta: date,
+    agrupar: str = "dia",
+    area_id: int | None = None,
+    operador_id: int | None = None,
+) -> list[dict]:
+    """
+    Indicadores entre `desde` y `hasta` (inclusive) agrupados por `agrupar`
+    (ver AGRUPACIONES): totales de emitidos, iniciados, finalizados (throughput)
+    y no presentados, espera y atención promedio en minutos y tasa de no
+    presentados. Una sola consulta agrupada sobre ResumenTurnoHora.
+    """
+    if agrupar not in AGRUPACIONES:
+        raise ValueError(f"Agrupación desconocida: {agrupar}")
+    qs = ResumenTurnoHora.objects.filter(fecha__gte=desde, fecha__lte=hasta)
+    if area_id is not None:
+        qs = qs.filter(area_id=area_id)
+    if operador_id is not None:
+        qs = qs.filter(operador_id=operador_id)
+
+    campos = AGRUPACIONES[agrupar]
+    filas = (
+        qs.order_by()
+        .values(*campos)
+        .annotate(**{campo: Sum(campo) for campo in CONTADORES})
+        .order_by(campos[0])
+    )
+    return [{**fila, **_indicadores(fila)} for fila in filas]
+
+
+def obtener_totales(
+    desde: date,
+    hasta: date,
+    area_id: int | None = None,
+    operador_id: int | None = None,
+) -> dict:
+    """Totales e indicadores del período completo (una fila)."""
+    qs = ResumenTurnoHora.objects.filter(fecha__gte=desde, fecha__lte=hasta)
+    if area_id is not None:
+        qs = qs.filter(area_id=area_id)
+    if operador_id is not None:
+        qs = qs.filter(operador_id=operador_id)
+    totales = qs.aggregate(**{campo: Sum(campo) for campo in CONTADORES})
+    totales = {campo: valor or 0 for campo, valor in totales.items()}
+    return {**totales, **_indicadores(totales)}
@@ -0,0 +1,102 @@
+# apps/core/ruteo.py
+"""
+Ruteo por habilidades: qué trámites toma cada mesa/operador y con qué peso.
+
+  - MesaTramite: trámites habilitados en la mesa (sin filas = todos).
+  - TramiteOperador: trámites del operador. Las filas habilitadas restringen
+    la selección y su prioridad_atencion (mayor = antes) ordena la cola del
+    operador; las deshabilitadas excluyen el trámite.
+
+El perfil de cada par mesa/operador se arma una vez y se cachea
+(RUTEO_CACHE_TTL). La selección del próximo turno lo aplica como un filtro
+FkIdTramite IN (...) y, sólo si los pesos difieren, un CASE en el ORDER BY
+(ver apps.core.asignacion).
+"""
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .cache_local import CacheVersionada
+from .models import MesaTramite, TramiteOperador
+
+_perfiles = CacheVersionada("ruteo", ttl=getattr(settings, "RUTEO_CACHE_TTL", 60))
+
+
+@dataclass(frozen=True)
+class PerfilRuteo:
+    # None = sin restricción (salvo `excluidos`)
+    tramites: frozenset | None = None
+    excluidos: frozenset = field(default_factory=frozenset)
+    # ((tramite_id, peso), ...) sólo si hay pesos distintos
+    pesos: tuple = ()
+
+    @property
+    def sin_tramites(self) -> bool:
+        """La combinación mesa/operador no admite ningún trámite."""
+        return self.tramites is not None and not self.tramites
+
+    def admite(self, tramite_id: int) -> bool:
+        if tramite_id in self.excluidos:
+            return False
+        return self.tramites is None or tramite_id in self.tramites
+
+    def filtro(self) -> Q:
+        """Filtro sobre Turno con los trámites admitidos."""
+        if self.tramites is not None:
+            return Q(tramite_id__in=self.tramites)
+        if self.excluidos:
+            return ~Q(tramite_id__in=self.excluidos)
+        return Q()
+
+    def peso(self):
+        """Expresión de orden por peso (None si todos pesan igual)."""
+        if not self.pesos:
+            return None
+        return Case(
+            *[When(tramite_id=tramite_id, then=Value(peso)) for tramite_id, peso in self.pesos],
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+
+
+def _cargar(mesa_id: int | None, operador_id: int | None) -> PerfilRuteo:
+    tramites = None
+    if mesa_id:
+        de_mesa = set(MesaTramite.objects.filter(mesa_id=mesa_id).values_list("tramite_id", flat=True))
+        tramites = de_mesa or None
+
+    habilitados, excluidos = {}, set()
+    if operador_id:
+        for tramite_id, habilitada, peso in TramiteOperador.objects.filter(
+            operador_id=operador_id
+        ).values_list("tramite_id", "habilitada", "prioridad_atencion"):
+            if habilitada:
+                habilitados[tramite_id] = peso
+            else:
+                excluidos.add(tramite_id)
+
+    if habilitados:
+        tramites = set(habilitados) if tramites is None else tramites & set(habilitados)
+    if tramites is not None:
+        tramites = frozenset(tramites - excluidos)
+        excluidos = set()
+
+    pesos = ()
+    if len(set(habilitados.values())) > 1:
+        pesos = tuple(sorted(
+            (t, p) for t, p in habilitados.items() if tramites is None or t in tramites
+        ))
+    return PerfilRuteo(tramites=tramites, excluidos=frozenset(excluidos), pesos=pesos)
+
+
+def perfil_ruteo(mesa_id: int | None, operador_id: int | None = None) -> PerfilRuteo:
+    """Perfil cacheado de la mesa (y del operador, si se indica)."""
+    return _perfiles.obtener(
+        f"{mesa_id}:{operador_id}", lambda: _cargar(mesa_id, operador_id)
+    )
+
+
+def invalidar_perfiles_ruteo() -> None:
+    """Descarta los perfiles cacheados (en todos los procesos)."""
+    _perfiles.invalidar_todo()
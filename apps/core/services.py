@@ -1,16 +1,34 @@
-﻿from datetime import date, datetime, time, timedelta
-from django.db import transaction
-from django.db.models import Max, Count
+﻿from datetime import date, datetime, time
+from django.db import connection, transaction
+from django.db.models import Q
 from django.utils import timezone
 import logging
 
 from .models import (
-    Area, Tramite, Mesa, Persona, Ticket, Turno,
-    EstadoTicket, EstadoTurno, ConfiguracionArea,
+    Area, Tramite, Mesa, Persona, Ticket, Turno, ConfiguracionArea,
     TurnoHistorialDerivacion, Usuario, LlamadaTurno,
     MotivoCierre,
 )
-from .services_aportes import buscar_persona_por_dni as buscar_en_aportes
+from .asignacion import reclamar_proximo_turno
+from .cola import buscar_turno, cola_de_area
+from .estadisticas import registrar_transicion
+from .estimacion import estimar_espera, registrar_actividad_mesa, registrar_atencion, segundos_por_turno
+from .mantenimiento import asegurar_vencimiento
+from .estados import puede_transicionar, nombre_estado_turno
+from .numeracion import siguiente_numero_visible
+from .resumenes import EMITIDO, FINALIZADO, INICIADO, NO_PRESENTO, registrar_hecho
+from .ruteo import perfil_ruteo
+from .services_aportes import (
+    AportesNoDisponible,
+    abuscar_persona_por_dni as abuscar_en_aportes,
+    buscar_persona_por_dni as buscar_en_aportes,
+    buscar_personas_por_dni as buscar_personas_en_aportes,
+    normalizar_dni,
+)
+from .websocket_utils import (
+    emitir_turno_creado, emitir_turno_llamado, emitir_turno_atendiendo,
+    emitir_turno_finalizado, emitir_turno_no_presento, emitir_turno_actualizado,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +43,9 @@ def buscar_persona_por_dni(dni: int) -> dict | None:
     Returns:
         dict con keys: 'nombre', 'apellido', 'fecha_nacimiento' (opcional), 'sexo' (opcional)
         o None si no encuentra
+
+    Raises:
+        AportesNoDisponible: Aportes no responde y el DNI no está en Persona
     """
     # Convertir DNI a string de 8 dígitos
     dni_str = str(dni).zfill(8) if isinstance(dni, int) else str(dni)
@@ -32,8 +53,11 @@ def buscar_persona_por_dni(dni: int) -> dict | None:
     
     if not resultado:
         return None
-    
-    # Convertir formato de Aportes a formato esperado
+    return _formatear_persona_aportes(resultado)
+
+
+def _formatear_persona_aportes(resultado: dict) -> dict:
+    """Convierte el formato de Aportes (apeynom, fecha_nac, sexo) al formato esperado."""
     apeynom = resultado['apeynom'].strip()
     partes = apeynom.split(',', 1)
     
@@ -60,6 +84,82 @@ def buscar_persona_por_dni(dni: int) -> dict | None:
     }
 
 
+async def abuscar_persona_por_dni(dni: int) -> dict | None:
+    """Variante async de buscar_persona_por_dni para vistas ASGI (no bloquea el loop)."""
+    dni_str = str(dni).zfill(8) if isinstance(dni, int) else str(dni)
+    resultado = await abuscar_en_aportes(dni_str)
+    if not resultado:
+        return None
+    return _formatear_persona_aportes(resultado)
+
+
+# =====================================================================
+#  PRECARGA DE PERSONAS
+# =====================================================================
+def precargar_personas(dnis, tamanio_tanda: int = 200) -> dict:
+    """
+    Resuelve una lista de DNIs contra Aportes y guarda el resultado en Persona
+    (alta o actualización). Las personas precargadas se resuelven después sin
+    consultar Aportes.
+
+    Returns:
+        dict con 'solicitados', 'encontrados', 'no_encontrados',
+        'sin_respuesta' (Aportes dejó de responder), 'guardados' y
+        'no_consultados' (los DNIs sin respuesta, para reintentarlos).
+    """
+    dnis = list(dict.fromkeys(int(d) for d in dnis))
+    resultados = buscar_personas_en_aportes(dnis, tamanio_tanda)
+
+    personas = []
+    for dni_str, resultado in resultados.items():
+        if not resultado:
+            continue
+        datos = _formatear_persona_aportes(resultado)
+        fecha_nac = datos['fecha_nacimiento_date']
+        if isinstance(fecha_nac, datetime):
+            fecha_nac = fecha_nac.date()
+        personas.append(Persona(
+            dni=int(dni_str),
+            nombre=datos['nombre'][:120],
+            apellido=datos['apellido'][:120],
+            fecha_nacimiento=fecha_nac,
+        ))
+
+    _upsert_personas(personas)
+
+    encontrados = len(personas)
+    return {
+        'solicitados': len(dnis),
+        'encontrados': encontrados,
+        'no_encontrados': len(resultados) - encontrados,
+        'sin_respuesta': len(dnis) - len(resultados),
+        'guardados': encontrados,
+        'no_consultados': [dni for dni in dnis if normalizar_dni(dni) not in resultados],
+    }
+
+
+def _upsert_personas(personas: list[Persona], batch_size: int = 500) -> None:
+    """INSERT ... ON CONFLICT (dni) UPDATE en lotes; sin soporte del backend, alta + bulk_update."""
+    campos = ['nombre', 'apellido', 'fecha_nacimiento']
+    if connection.features.supports_update_conflicts_with_target:
+        Persona.objects.bulk_create(
+            personas, batch_size=batch_size,
+            update_conflicts=True, unique_fields=['dni'], update_fields=campos,
+        )
+        return
+
+    with transaction.atomic():
+        existentes = dict(
+            Persona.objects.filter(dni__in=[p.dni for p in personas]).values_list('dni', 'id')
+        )
+        nuevas = [p for p in personas if p.dni not in existentes]
+        actualizar = [p for p in personas if p.dni in existentes]
+        for p in actualizar:
+            p.id = existentes[p.dni]
+        Persona.objects.bulk_create(nuevas, batch_size=batch_size)
+        Persona.objects.bulk_update(actualizar, campos, batch_size=batch_size)
+
+
 # =====================================================================
 #  CÁLCULO DE PRIORIDAD AUTOMÁTICA
 # =====================================================================
@@ -143,15 +243,21 @@ def emitir_turno(
                 f"Intente nuevamente dentro del horario establecido."
             )
 
-    # ── Vencer turnos del día anterior ──
+    # ── Vencer turnos del día anterior (una vez por día, fuera de esta transacción) ──
     if config.vencimiento_turnos:
-        _vencer_turnos_anteriores(area, hoy)
+        asegurar_vencimiento(area.pk, hoy)
 
     # ── Validar DNI ──
     persona = None
     persona_data = None
     if dni:
-        persona_data = buscar_persona_por_dni(dni)
+        try:
+            persona_data = buscar_persona_por_dni(dni)
+        except AportesNoDisponible:
+            # Sin padrón no se frena la fila: se emite con el DNI sin validar
+            # (Persona sin apellido: las búsquedas locales la ignoran)
+            logger.warning(f"Aportes no disponible: turno emitido sin validar DNI {dni}")
+            persona_data = {'nombre': '', 'apellido': '', 'fecha_nacimiento_date': None}
         if not persona_data:
             raise ValueError("DNI no encontrado en padrón")
         
@@ -159,18 +265,28 @@ def emitir_turno(
         persona_data['es_embarazada'] = es_embarazada
         persona_data['es_discapacitado'] = es_discapacitado
         
-        persona, _ = Persona.objects.get_or_create(
+        persona, creada = Persona.objects.get_or_create(
             dni=dni,
             defaults=dict(nombre=persona_data["nombre"], apellido=persona_data["apellido"]),
         )
+        if not creada and not persona.apellido and persona_data["apellido"]:
+            # Fila guardada sin validar mientras Aportes no respondía: completarla
+            persona.nombre = persona_data["nombre"]
+            persona.apellido = persona_data["apellido"]
+            persona.fecha_nacimiento = persona_data.get("fecha_nacimiento_date")
+            persona.save(update_fields=["nombre", "apellido", "fecha_nacimiento"])
 
         # ── Ya tiene un turno pendiente o llamando? ──
         if not config.multiples_turnos_dni:
-            existente = Turno.objects.filter(
+            existentes = Turno.objects.filter(
                 ticket__persona=persona,
                 area=area,
                 estado_id__in=[Turno.PENDIENTE, Turno.LLAMANDO],
-            ).first()
+            )
+            if config.vencimiento_turnos:
+                # Los de días anteriores se vencen después del COMMIT (asegurar_vencimiento)
+                existentes = existentes.filter(fecha_turno=hoy)
+            existente = existentes.first()
             if existente:
                 return existente
 
@@ -195,36 +311,34 @@ def emitir_turno(
     prioridad_final = max(prioridad, prioridad_calculada)
 
     # ── Numeración visible del día ──
-    ultimo = (
-        Turno.objects.filter(area=area, fecha_turno=hoy)
-        .aggregate(Max("numero_visible"))["numero_visible__max"] or 0
-    )
-    numero_visible = ultimo + 1
+    numero_visible = siguiente_numero_visible(area.pk, hoy)
 
     # ── Crear Ticket (contenedor) ──
-    estado_ticket_pend = EstadoTicket.objects.get(pk=Ticket.PENDIENTE)
     ticket = Ticket.objects.create(
         persona=persona,
         area=area,
         prioridad=prioridad_final,
         fecha_creacion=hoy,
         fecha_hora_creacion=ahora,
-        estado=estado_ticket_pend,
+        estado_id=Ticket.PENDIENTE,
     )
 
     # ── Crear Turno ──
-    estado_turno_pend = EstadoTurno.objects.get(pk=Turno.PENDIENTE)
     turno = Turno.objects.create(
         ticket=ticket,
         tramite=tramite,
         orden=1,
         area=area,
         numero_visible=numero_visible,
-        estado=estado_turno_pend,
+        estado_id=Turno.PENDIENTE,
+        prioridad=prioridad_final,
         fecha_turno=hoy,
         fecha_hora_creacion=ahora,
     )
 
+    _notificar_al_confirmar(emitir_turno_creado, turno)
+    _notificar_al_confirmar(registrar_transicion, None, Turno.PENDIENTE, hoy)
+    _notificar_al_confirmar(registrar_hecho, turno, EMITIDO)
     return turno
 
 
@@ -243,19 +357,49 @@ def llamar_turno(turno: Turno, operador: Usuario, mesa: Mesa) -> Turno:
     # ── Validar horario de atención ──
     _validar_horario_atencion(config)
     
-    if turno.estado_id != Turno.PENDIENTE:
-        raise ValueError(f"El turno no está en estado pendiente (estado actual: {turno.estado.nombre})")
+    if not puede_transicionar(turno.estado_id, Turno.LLAMANDO):
+        raise ValueError(f"El turno no está en estado pendiente (estado actual: {nombre_estado_turno(turno.estado_id)})")
     
-    estado_llamando = EstadoTurno.objects.get(pk=Turno.LLAMANDO)
-    turno.estado = estado_llamando
+    origen = turno.estado_id
+    turno.estado_id = Turno.LLAMANDO
     turno.operador = operador
     turno.mesa_asignada = mesa
     turno.save()
+    _registrar_llamada(turno, origen, operador, mesa)
+    return turno
+
+
+@transaction.atomic
+def llamar_proximo_turno(area: Area, operador: Usuario, mesa: Mesa) -> Turno | None:
+    """
+    Llama al próximo turno pendiente del área (botón "Próximo").
+    Sólo considera los trámites que admiten la mesa y el operador, ordenados
+    por su peso (ver apps.core.ruteo). La selección y el paso a LLAMANDO son
+    una sola operación con bloqueo de fila (ver apps.core.asignacion): dos
+    operadores simultáneos nunca obtienen el mismo turno.
+    Retorna None si no hay turnos pendientes que pueda atender.
+    """
+    config = ConfiguracionArea.get_for_area(area)
+    _validar_horario_atencion(config)
+
+    perfil = perfil_ruteo(mesa.pk, operador.pk)
+    turno_id = reclamar_proximo_turno(area.pk, operador.pk, mesa.pk, perfil)
+    if turno_id is None:
+        return None
+
+    turno = Turno.objects.select_related('ticket__persona', 'tramite', 'area').get(pk=turno_id)
+    turno.operador = operador
+    turno.mesa_asignada = mesa
+    _registrar_llamada(turno, Turno.PENDIENTE, operador, mesa)
+    return turno
+
+
+def _registrar_llamada(turno: Turno, origen: int, operador: Usuario, mesa: Mesa) -> None:
+    """Efectos de un turno que pasó a LLAMANDO: ticket, evento de llamada y notificación."""
+    _registrar_transicion(turno, origen)
     
     # Actualizar ticket a EN_PROCESO
-    estado_ticket_proceso = EstadoTicket.objects.get(pk=Ticket.EN_PROCESO)
-    turno.ticket.estado = estado_ticket_proceso
-    turno.ticket.save()
+    _actualizar_estado_ticket(turno, Ticket.EN_PROCESO)
     
     # Registrar evento de llamada
     LlamadaTurno.objects.create(
@@ -264,15 +408,10 @@ def llamar_turno(turno: Turno, operador: Usuario, mesa: Mesa) -> Turno:
         operador=operador,
         tipo_llamada=LlamadaTurno.LLAMADA
     )
-    
-    # Auto-limpieza: eliminar eventos antiguos (mayores a 24 horas)
-    limite_limpieza = timezone.now() - timedelta(hours=24)
-    eliminados = LlamadaTurno.objects.filter(fecha_hora__lt=limite_limpieza).delete()[0]
-    if eliminados > 0:
-        logger.debug(f"Auto-limpieza: {eliminados} eventos de llamada antiguos eliminados")
+    _notificar_al_confirmar(registrar_actividad_mesa, turno.area_id, mesa.id)
+    _notificar_al_confirmar(emitir_turno_llamado, turno, mesa=mesa)
     
     logger.info(f"Turno #{turno.id} llamado por {operador} en {mesa}")
-    return turno
 
 
 @transaction.atomic
@@ -283,7 +422,7 @@ def rellamar_turno(turno: Turno, operador: Usuario) -> LlamadaTurno:
     El monitor detecta este evento y muestra la alerta nuevamente.
     """
     if turno.estado_id != Turno.LLAMANDO:
-        raise ValueError(f"El turno debe estar en estado LLAMANDO (actual: {turno.estado.nombre})")
+        raise ValueError(f"El turno debe estar en estado LLAMANDO (actual: {nombre_estado_turno(turno.estado_id)})")
     
     # Registrar evento de re-llamada
     llamada = LlamadaTurno.objects.create(
@@ -292,12 +431,7 @@ def rellamar_turno(turno: Turno, operador: Usuario) -> LlamadaTurno:
         operador=operador,
         tipo_llamada=LlamadaTurno.RELLAMADA
     )
-    
-    # Auto-limpieza: eliminar eventos antiguos (mayores a 24 horas)
-    limite_limpieza = timezone.now() - timedelta(hours=24)
-    eliminados = LlamadaTurno.objects.filter(fecha_hora__lt=limite_limpieza).delete()[0]
-    if eliminados > 0:
-        logger.debug(f"Auto-limpieza: {eliminados} eventos de llamada antiguos eliminados")
+    _notificar_al_confirmar(emitir_turno_llamado, turno, mesa=turno.mesa_asignada)
     
     logger.info(f"Turno #{turno.id} re-llamado por {operador}")
     return llamada
@@ -309,13 +443,16 @@ def iniciar_atencion(turno: Turno) -> Turno:
     Pasa turno de LLAMANDO → EN_ATENCION.
     Registra la hora de inicio de atención.
     """
-    if turno.estado_id != Turno.LLAMANDO:
-        raise ValueError(f"El turno debe estar en estado LLAMANDO (actual: {turno.estado.nombre})")
+    if not puede_transicionar(turno.estado_id, Turno.EN_ATENCION):
+        raise ValueError(f"El turno debe estar en estado LLAMANDO (actual: {nombre_estado_turno(turno.estado_id)})")
     
-    estado_atencion = EstadoTurno.objects.get(pk=Turno.EN_ATENCION)
-    turno.estado = estado_atencion
+    origen = turno.estado_id
+    turno.estado_id = Turno.EN_ATENCION
     turno.fecha_hora_inicio_atencion = timezone.now()
     turno.save()
+    _registrar_transicion(turno, origen)
+    _notificar_al_confirmar(registrar_hecho, turno, INICIADO)
+    _notificar_al_confirmar(emitir_turno_atendiendo, turno, mesa=turno.mesa_asignada)
     
     logger.info(f"Turno #{turno.id} - atención iniciada")
     return turno
@@ -335,8 +472,8 @@ def finalizar_atencion(
     """
     config = ConfiguracionArea.get_for_area(turno.area)
     
-    if turno.estado_id != Turno.EN_ATENCION:
-        raise ValueError(f"El turno debe estar EN_ATENCION (actual: {turno.estado.nombre})")
+    if not puede_transicionar(turno.estado_id, Turno.FINALIZADO):
+        raise ValueError(f"El turno debe estar EN_ATENCION (actual: {nombre_estado_turno(turno.estado_id)})")
     
     # ── Validar motivo si es requerido ──
     if config.requiere_motivo_fin and not motivo_cierre_id:
@@ -351,29 +488,22 @@ def finalizar_atencion(
         except MotivoCierre.DoesNotExist:
             raise ValueError(f"Motivo de cierre ID {motivo_cierre_id} no existe o no está activo")
     
-    estado_finalizado = EstadoTurno.objects.get(pk=Turno.FINALIZADO)
-    turno.estado = estado_finalizado
+    origen = turno.estado_id
+    turno.estado_id = Turno.FINALIZADO
     turno.prioridad_consulta = prioridad_consulta
     turno.observaciones = observaciones
     turno.fecha_hora_fin_atencion = timezone.now()
     turno.save()
+    _registrar_transicion(turno, origen)
     
     # Cerrar ticket
-    estado_ticket_completado = EstadoTicket.objects.get(pk=Ticket.COMPLETADO)
-    turno.ticket.estado = estado_ticket_completado
-    turno.ticket.save()
+    _actualizar_estado_ticket(turno, Ticket.COMPLETADO)
     
     motivo_nombre = motivo_obj.nombre if motivo_obj else 'N/A'
-    logger.info(
-        f"Turno #{turno.id} finalizado. "
-        f"Motivo: {motivo_nombre}, Prioridad: {prioridad_consulta}, "
-        f"Obs: {observaciones[:50] if observaciones else 'N/A'}"
-    )
-    return turno
-    turno.ticket.estado = estado_ticket_completado
-    turno.ticket.save()
-    
-    motivo_nombre = motivo_obj.nombre if motivo_cierre_id else 'N/A'
+    # Antes del evento: turno_finalizado lleva la cadencia ya actualizada
+    _notificar_al_confirmar(registrar_atencion, turno)
+    _notificar_al_confirmar(registrar_hecho, turno, FINALIZADO)
+    _notificar_al_confirmar(emitir_turno_finalizado, turno, motivo=motivo_obj.nombre if motivo_obj else None)
     logger.info(
         f"Turno #{turno.id} finalizado. "
         f"Motivo: {motivo_nombre}, Prioridad: {prioridad_consulta}, "
@@ -385,12 +515,15 @@ def finalizar_atencion(
 @transaction.atomic
 def marcar_no_presento(turno: Turno) -> Turno:
     """Marca turno como NO_PRESENTO (la persona no acudió al llamado)."""
-    if turno.estado_id not in [Turno.LLAMANDO, Turno.PENDIENTE]:
-        raise ValueError(f"No se puede marcar como ausente (estado: {turno.estado.nombre})")
+    if not puede_transicionar(turno.estado_id, Turno.NO_PRESENTO):
+        raise ValueError(f"No se puede marcar como ausente (estado: {nombre_estado_turno(turno.estado_id)})")
     
-    estado_no_presento = EstadoTurno.objects.get(pk=Turno.NO_PRESENTO)
-    turno.estado = estado_no_presento
+    origen = turno.estado_id
+    turno.estado_id = Turno.NO_PRESENTO
     turno.save()
+    _registrar_transicion(turno, origen)
+    _notificar_al_confirmar(registrar_hecho, turno, NO_PRESENTO)
+    _notificar_al_confirmar(emitir_turno_no_presento, turno)
     
     logger.info(f"Turno #{turno.id} - no se presentó")
     return turno
@@ -413,7 +546,7 @@ def derivar_turno(
         raise ValueError("Las derivaciones no están habilitadas para esta área")
     
     if turno.estado_id not in [Turno.LLAMANDO, Turno.EN_ATENCION]:
-        raise ValueError(f"No se puede derivar en estado {turno.estado.nombre}")
+        raise ValueError(f"No se puede derivar en estado {nombre_estado_turno(turno.estado_id)}")
     
     # Registrar historial de derivación
     TurnoHistorialDerivacion.objects.create(
@@ -425,32 +558,133 @@ def derivar_turno(
     )
     
     # Cambiar estado a DERIVADO y luego volver a PENDIENTE para el nuevo operador
-    estado_pendiente = EstadoTurno.objects.get(pk=Turno.PENDIENTE)
-    turno.estado = estado_pendiente
+    origen = turno.estado_id
+    turno.estado_id = Turno.PENDIENTE
     turno.operador = None  # Se reasigna al ser llamado por el destino
     turno.mesa_asignada = None
+    turno.prioridad = turno.ticket.prioridad  # Vuelve a la cola con la prioridad vigente del ticket
     turno.save()
+    _registrar_transicion(turno, origen)
+    _notificar_al_confirmar(
+        emitir_turno_actualizado, turno,
+        cambios={'derivado': True, 'operador_destino_id': operador_destino.id},
+    )
     
     logger.info(f"Turno #{turno.id} derivado de {operador_origen} a {operador_destino}")
     return turno
 
 
-def obtener_proximo_turno(area: Area) -> Turno | None:
+def obtener_proximo_turno(area: Area, mesa: Mesa | None = None, operador: Usuario | None = None) -> Turno | None:
     """
     Obtiene el siguiente turno a atender, respetando prioridad y orden de llegada.
     Turnos con mayor prioridad se atienden primero.
     A igual prioridad, se atiende por orden de creación (FIFO).
     Incluye turnos pendientes de días anteriores que no fueron vencidos.
+    Con mesa/operador aplica su perfil de ruteo (trámites admitidos y pesos).
+    Sólo consulta: para llamarlo usar llamar_proximo_turno.
+    La selección sale de la cola en memoria del área (apps.core.cola); si la
+    BD dice que el primero ya no está pendiente, se rehidrata y se reintenta.
     """
-    return (
-        Turno.objects.filter(
-            area=area,
-            estado_id=Turno.PENDIENTE,
+    perfil = perfil_ruteo(mesa.pk if mesa else None, operador.pk if operador else None)
+    cola = cola_de_area(area.pk)
+    for _ in range(2):
+        proximo = cola.proximo(perfil)
+        if proximo is None:
+            return None
+        turno = (
+            Turno.objects.select_related('ticket__persona', 'tramite')
+            .filter(pk=proximo.id, estado_id=Turno.PENDIENTE)
+            .first()
         )
-        .select_related('ticket__persona', 'tramite')
-        .order_by('-ticket__prioridad', 'fecha_hora_creacion')
-        .first()
-    )
+        if turno is not None:
+            return turno
+        logger.info(f"[Cola] Área {area.pk}: turno #{proximo.id} ya no está pendiente, rehidratando")
+        cola.descartar()
+    return None
+
+
+# =====================================================================
+#  POSICIÓN EN LA COLA
+# =====================================================================
+def _posicion_en_bd(turno: Turno) -> int:
+    """
+    Posición calculada en la BD: pendientes del área que van antes según
+    ORDEN_COLA (consulta de rango sobre IX_Turno_Cola_Prioridad).
+    """
+    return Turno.objects.filter(
+        Q(prioridad__gt=turno.prioridad)
+        | Q(prioridad=turno.prioridad, fecha_hora_creacion__lt=turno.fecha_hora_creacion)
+        | Q(prioridad=turno.prioridad, fecha_hora_creacion=turno.fecha_hora_creacion, pk__lt=turno.pk),
+        area_id=turno.area_id,
+        estado_id=Turno.PENDIENTE,
+    ).count() + 1
+
+
+def posicion_en_cola(turno_id: int) -> dict | None:
+    """
+    Posición de un turno (1 = próximo) en la cola de su área, con el mismo
+    orden que obtener_proximo_turno (prioridad y llegada, sin ruteo por mesa).
+    `posicion` es None si el turno ya no está pendiente. Devuelve None si el
+    turno no existe. Incluye la espera estimada (apps.core.estimacion) en
+    minutos, None mientras el área no tenga atenciones registradas.
+
+    Sale de la cola en memoria (bisect, O(log n)); sólo consulta la BD para
+    turnos que no están activos en las colas cargadas y, como respaldo, si
+    el evento del turno todavía no llegó a la cola.
+    """
+    encontrado = buscar_turno(turno_id)
+    if encontrado:
+        cola, entrada = encontrado
+        numero_visible, estado_id = entrada.numero_visible, entrada.estado_id
+        area_id, posicion = cola.area_id, cola.posicion(turno_id)
+    else:
+        turno = Turno.objects.filter(pk=turno_id).only(
+            'id', 'area_id', 'numero_visible', 'estado_id', 'prioridad', 'fecha_hora_creacion',
+        ).first()
+        if turno is None:
+            return None
+        numero_visible, estado_id, posicion = turno.numero_visible, turno.estado_id, None
+        area_id = turno.area_id
+        if estado_id == Turno.PENDIENTE:
+            posicion = cola_de_area(turno.area_id).posicion(turno_id) or _posicion_en_bd(turno)
+
+    adelante = posicion - 1 if posicion else 0
+    estimacion = estimar_espera(area_id, adelante) if posicion else None
+    return {
+        'turno_id': turno_id,
+        'numero_visible': numero_visible,
+        'estado_id': estado_id,
+        'estado': nombre_estado_turno(estado_id),
+        'posicion': posicion,
+        'adelante': adelante,
+        'espera_estimada_min': estimacion['minutos'] if estimacion else None,
+        'espera_estimada_max_min': estimacion['minutos_max'] if estimacion else None,
+    }
+
+
+# =====================================================================
+#  MONITOR PÚBLICO
+# =====================================================================
+def obtener_snapshot_monitor(area: Area) -> dict:
+    """
+    Estado completo del monitor de un área: turnos activos del día
+    (PENDIENTE, LLAMANDO, EN_ATENCION) serializados igual que los eventos
+    WebSocket del grupo del área (sin DNI: el monitor no requiere sesión).
+
+    Sale de la cola en memoria del área junto con la secuencia del último
+    evento aplicado: cualquier evento posterior trae una secuencia mayor y el
+    monitor lo aplica encima del snapshot sin perder cambios.
+    `estimacion` es la cadencia de la cola (segundos por turno, ver
+    apps.core.estimacion) con la que el monitor muestra la espera estimada.
+    """
+    seq, turnos = cola_de_area(area.id).snapshot()
+    return {
+        'area_id': area.id,
+        'seq': seq,
+        'fecha': timezone.localdate().isoformat(),
+        'turnos': turnos,
+        'estimacion': segundos_por_turno(area.id),
+    }
 
 
 # =====================================================================
@@ -493,18 +727,29 @@ def obtener_config_area(area: Area) -> dict:
 # =====================================================================
 #  UTILIDADES INTERNAS
 # =====================================================================
-def _vencer_turnos_anteriores(area: Area, hoy: date) -> int:
+def _notificar_al_confirmar(emisor, *args, **kwargs) -> None:
     """
-    Marca como NO_PRESENTO los turnos pendientes de días anteriores.
-    Retorna la cantidad de turnos vencidos.
+    Programa la emisión de un evento WebSocket para después del COMMIT.
+    Si la transacción se revierte no se emite nada; si falla el channel layer
+    se registra en el log sin afectar la operación ya confirmada.
     """
-    estado_no_presento = EstadoTurno.objects.get(pk=Turno.NO_PRESENTO)
-    vencidos = Turno.objects.filter(
-        area=area,
-        fecha_turno__lt=hoy,
-        estado_id__in=[Turno.PENDIENTE, Turno.LLAMANDO],
-    ).update(estado=estado_no_presento)
-    return vencidos
+    transaction.on_commit(lambda: emisor(*args, **kwargs), robust=True)
+
+
+def _registrar_transicion(turno: Turno, origen: int) -> None:
+    """Ajusta las estadísticas del dashboard cuando se confirme el cambio de estado."""
+    _notificar_al_confirmar(registrar_transicion, origen, turno.estado_id, turno.fecha_turno)
+
+
+def _actualizar_estado_ticket(turno: Turno, estado_id: int) -> None:
+    """
+    Cambia el estado del ticket del turno con un UPDATE directo (sin leer el
+    ticket ni la fila del catálogo). Si el ticket ya estaba cargado se mantiene
+    en sincronía.
+    """
+    Ticket.objects.filter(pk=turno.ticket_id).update(estado_id=estado_id)
+    if Turno.ticket.is_cached(turno):
+        turno.ticket.estado_id = estado_id
 
 
 def _validar_horario_atencion(config: ConfiguracionArea) -> None:
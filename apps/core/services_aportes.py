@@ -2,55 +2,296 @@
 """
 Servicios para consultar la base de datos Aportes (SQL Server sql01)
 Utiliza Trusted Connection por ahora, en el futuro usará credenciales del .env
+
+Las búsquedas por DNI pasan por una caché LRU con TTL (ver CacheLRU): la
+búsqueda del totem y la de emitir_turno para el mismo DNI ejecutan el SP una
+sola vez. Los DNIs no encontrados se cachean con un TTL corto.
+
+Protección ante un Aportes lento o caído (ClienteAportes):
+  - Timeout por consulta y por conexión (OPTIONS del alias 'aportes' en settings).
+  - Circuit breaker: tras APORTES_CIRCUITO_FALLOS errores seguidos deja de
+    consultar durante APORTES_CIRCUITO_REINTENTO segundos y después prueba
+    una sola consulta antes de volver a cerrarse.
+  - Mientras Aportes no responde se usa la tabla local Persona (sólo las
+    filas validadas: las guardadas sin padrón no tienen apellido).
+  - Variante async (abuscar_persona_por_dni) para vistas ASGI: corre la
+    búsqueda con database_sync_to_async, que cierra las conexiones vencidas
+    del thread antes y después de usarlas.
+
+Precarga: buscar_lote() resuelve muchos DNIs reutilizando un mismo cursor por
+tanda; services.precargar_personas() guarda el resultado en Persona. Las
+personas precargadas (con fecha de nacimiento) se resuelven localmente sin
+consultar el SP.
 """
-from django.db import connections
+import logging
+import threading
+import time
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import connections, Error as DatabaseError
 from typing import Optional, Dict, Any
 
+from .cache_local import CacheLRU
+from .models import Persona
+
+logger = logging.getLogger(__name__)
+
+_personas = CacheLRU(
+    "aportes_persona",
+    maximo=getattr(settings, "APORTES_CACHE_MAX", 5000),
+    ttl=getattr(settings, "APORTES_CACHE_TTL", 600),
+    ttl_negativo=getattr(settings, "APORTES_CACHE_TTL_NEGATIVO", 60),
+    # Alias propio (sólo con REDIS_URL): las personas no desalojan las claves
+    # de coordinación de la caché `default`
+    alias="personas" if "personas" in settings.CACHES else None,
+)
+
+
+class AportesNoDisponible(Exception):
+    """Aportes no respondió y el DNI no está en la tabla local Persona."""
+
+
+# =====================================================================
+#  CIRCUIT BREAKER
+# =====================================================================
+class CircuitBreaker:
+    """
+    Estados:
+        cerrado     → se consulta normalmente
+        abierto     → no se consulta hasta que pasen `reintento` segundos
+        semiabierto → una sola consulta de prueba; si falla vuelve a abrirse
+    El estado es por proceso.
+    """
+    CERRADO = "cerrado"
+    ABIERTO = "abierto"
+    SEMIABIERTO = "semiabierto"
+
+    def __init__(self, nombre: str, umbral: int = 5, reintento: float = 30):
+        self.nombre = nombre
+        self.umbral = umbral
+        self.reintento = reintento
+        self.estado = self.CERRADO
+        self._fallos = 0
+        self._abierto_desde = 0.0
+        self._lock = threading.Lock()
+
+    def permitir(self) -> bool:
+        """True si se puede intentar la consulta."""
+        with self._lock:
+            if self.estado == self.CERRADO:
+                return True
+            if self.estado == self.ABIERTO and time.monotonic() - self._abierto_desde >= self.reintento:
+                self.estado = self.SEMIABIERTO
+                return True
+            return False
+
+    def registrar_exito(self) -> None:
+        with self._lock:
+            if self.estado != self.CERRADO:
+                logger.info(f"Circuito {self.nombre} cerrado: el servicio volvió a responder")
+            self.estado = self.CERRADO
+            self._fallos = 0
+
+    def registrar_fallo(self) -> None:
+        with self._lock:
+            self._fallos += 1
+            if self.estado == self.SEMIABIERTO or self._fallos >= self.umbral:
+                if self.estado != self.ABIERTO:
+                    logger.warning(
+                        f"Circuito {self.nombre} abierto tras {self._fallos} fallo(s); "
+                        f"reintento en {self.reintento}s"
+                    )
+                self.estado = self.ABIERTO
+                self._abierto_desde = time.monotonic()
+
+
+# =====================================================================
+#  CLIENTE APORTES
+# =====================================================================
+class ClienteAportes:
+
+    ALIAS = "aportes"
+
+    def __init__(self):
+        self.circuito = CircuitBreaker(
+            "aportes",
+            umbral=getattr(settings, "APORTES_CIRCUITO_FALLOS", 5),
+            reintento=getattr(settings, "APORTES_CIRCUITO_REINTENTO", 30),
+        )
+
+    def buscar(self, dni) -> Optional[Dict[str, Any]]:
+        """
+        Busca por DNI: caché → Persona precargada → SP en Aportes → Persona.
+
+        Raises:
+            AportesNoDisponible: si Aportes falla y el DNI no está en Persona
+        """
+        dni_limpio = normalizar_dni(dni)
+        try:
+            resultado = _personas.obtener(
+                dni_limpio,
+                lambda: self._buscar_local(dni_limpio, solo_precargadas=True) or self._consultar(dni_limpio),
+            )
+        except AportesNoDisponible:
+            # Sin cachear: en cuanto Aportes vuelva se usa el padrón
+            resultado = self._buscar_local(dni_limpio)
+            if resultado is None:
+                raise
+        # Copia: el valor cacheado se comparte entre requests
+        return dict(resultado) if resultado else None
+
+    async def abuscar(self, dni) -> Optional[Dict[str, Any]]:
+        """Variante para vistas ASGI: no bloquea el loop (ver buscar)."""
+        return await database_sync_to_async(self.buscar)(dni)
+
+    def buscar_lote(self, dnis, tamanio_tanda: int = 200) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Resuelve muchos DNIs contra Aportes (sin pasar por la caché LRU).
+        Cada tanda usa un único cursor sobre la conexión del alias.
+
+        Returns:
+            {dni_limpio: resultado o None}. Los DNIs que no llegaron a
+            consultarse porque Aportes dejó de responder no aparecen (son los
+            siguientes al último resuelto: la precarga no saltea DNIs).
+        """
+        pendientes = list(dict.fromkeys(normalizar_dni(d) for d in dnis))
+        resultados = {}
+        i = 0
+        while i < len(pendientes):
+            try:
+                with connections[self.ALIAS].cursor() as cursor:
+                    for dni_limpio in pendientes[i:i + tamanio_tanda]:
+                        resultados[dni_limpio] = self._consultar(dni_limpio, cursor)
+                        i += 1
+            except AportesNoDisponible:
+                # El DNI que falló se reintenta con un cursor nuevo; cada fallo
+                # suma al circuito, que corta el reintento al abrirse
+                pass
+            except DatabaseError as e:
+                # No se pudo abrir la conexión
+                self.circuito.registrar_fallo()
+                logger.warning(f"Error conectando a Aportes: {e}")
+            if i < len(pendientes) and self.circuito.estado != CircuitBreaker.CERRADO:
+                # Abierto, o semiabierto con la consulta de prueba en otro thread
+                logger.warning(
+                    f"Precarga interrumpida: Aportes no disponible "
+                    f"({len(resultados)}/{len(pendientes)} DNIs resueltos)"
+                )
+                break
+        return resultados
+
+    def _consultar(self, dni_limpio: str, cursor=None) -> Optional[Dict[str, Any]]:
+        if not self.circuito.permitir():
+            raise AportesNoDisponible("Circuito de Aportes abierto")
+        try:
+            resultado = _ejecutar_sp_persona(dni_limpio, cursor)
+        except DatabaseError as e:
+            self.circuito.registrar_fallo()
+            # Descartar la conexión: el próximo intento abre una nueva
+            connections[self.ALIAS].close()
+            logger.warning(f"Error consultando Aportes (DNI {dni_limpio}): {e}")
+            raise AportesNoDisponible(str(e)) from e
+        self.circuito.registrar_exito()
+        return resultado
+
+    def _buscar_local(self, dni_limpio: str, solo_precargadas: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Busca en la tabla Persona. Con `solo_precargadas` sólo cuenta las filas
+        que vinieron completas del padrón (tienen fecha de nacimiento).
+        Las filas sin apellido (turno emitido con Aportes caído, DNI sin
+        validar) no cuentan: se completan cuando Aportes vuelve a responder.
+        """
+        qs = Persona.objects.filter(dni=int(dni_limpio)).exclude(apellido='')
+        if solo_precargadas:
+            qs = qs.filter(fecha_nacimiento__isnull=False)
+        persona = qs.values("apellido", "nombre", "fecha_nacimiento").first()
+        if not persona:
+            return None
+        if not solo_precargadas:
+            logger.info(f"Aportes no disponible: DNI {dni_limpio} resuelto desde Persona")
+        return {
+            'apeynom': f"{persona['apellido']}, {persona['nombre']}",
+            'fecha_nac': persona['fecha_nacimiento'],
+            'sexo': None,
+        }
+
+
+cliente = ClienteAportes()
+
+
+def normalizar_dni(dni) -> str:
+    """DNI de 8 dígitos sin puntos ni comas (formato del SP)."""
+    dni_limpio = str(dni).strip().replace('.', '').replace(',', '').zfill(8)
+    return dni_limpio[:8]
+
 
 def buscar_persona_por_dni(dni: str) -> Optional[Dict[str, Any]]:
     """
-    Busca una persona en la base de datos Aportes por DNI.
+    Busca una persona en la base de datos Aportes por DNI (con caché).
     Llama al SP: Will_Busca_Persona_Turnero
-    
+
     Args:
         dni: DNI de la persona (8 dígitos)
-    
+
     Returns:
         Dict con: {
             'apeynom': str,
             'fecha_nac': date,
             'sexo': str
         } o None si no encuentra
+
+    Raises:
+        AportesNoDisponible: Aportes no responde y el DNI no está en Persona
     """
-    # Normalizar DNI (8 dígitos sin puntos)
-    dni_limpio = dni.strip().replace('.', '').replace(',', '').zfill(8)
-    
-    if len(dni_limpio) > 8:
-        dni_limpio = dni_limpio[:8]
-    
-    with connections['aportes'].cursor() as cursor:
-        # Ejecutar SP
-        cursor.execute(
-            "EXEC Will_Busca_Persona_Turnero @dni = %s",
-            [dni_limpio]
-        )
-        
-        row = cursor.fetchone()
-        
-        if row:
-            return {
-                'apeynom': row[0],
-                'fecha_nac': row[1],
-                'sexo': row[2],
-            }
-        
-        return None
+    return cliente.buscar(dni)
+
+
+async def abuscar_persona_por_dni(dni: str) -> Optional[Dict[str, Any]]:
+    """Variante async de buscar_persona_por_dni para vistas ASGI."""
+    return await cliente.abuscar(dni)
+
+
+def buscar_personas_por_dni(dnis, tamanio_tanda: int = 200) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Resolución en lote (ver ClienteAportes.buscar_lote)."""
+    return cliente.buscar_lote(dnis, tamanio_tanda)
+
+
+def _ejecutar_sp_persona(dni_limpio: str, cursor=None) -> Optional[Dict[str, Any]]:
+    inicio = time.monotonic()
+    if cursor is None:
+        with connections['aportes'].cursor() as cursor:
+            return _ejecutar_sp_persona(dni_limpio, cursor)
+
+    # Ejecutar SP
+    cursor.execute(
+        "EXEC Will_Busca_Persona_Turnero @dni = %s",
+        [dni_limpio]
+    )
+    row = cursor.fetchone()
+
+    logger.debug(f"SP Will_Busca_Persona_Turnero({dni_limpio}): {(time.monotonic() - inicio) * 1000:.0f} ms")
+    if row:
+        return {
+            'apeynom': row[0],
+            'fecha_nac': row[1],
+            'sexo': row[2],
+        }
+    return None
+
+
+def estadisticas_cache_personas() -> dict:
+    """
+    Hits/misses de la caché de búsquedas en Aportes y estado del circuito
+    (de este proceso). Se expone en /dashboard/api/stats/ bajo `aportes`.
+    """
+    return dict(_personas.estadisticas(), circuito=cliente.circuito.estado)
 
 
 def verificar_conexion_aportes() -> bool:
     """
     Verifica si la conexión a la base de datos Aportes está disponible.
-    
+
     Returns:
         True si la conexión es exitosa, False en caso contrario
     """
@@ -59,5 +300,5 @@ def verificar_conexion_aportes() -> bool:
             cursor.execute("SELECT 1")
             return True
     except Exception as e:
-        print(f"Error conectando a Aportes: {e}")
+        logger.error(f"Error conectando a Aportes: {e}")
         return False
@@ -0,0 +1,116 @@
+"""
+Base común de los tests de apps.core.
+
+Las migraciones de core no describen las tablas managed=False (esquema
+existente de SQL Server): TurnosTestCase las crea en la base de prueba antes
+de cargar los datos. Correr con turnero.settings_test (SQLite, caché local).
+"""
+from datetime import time, timedelta
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.core import cola, mantenimiento
+from apps.core.estados import recargar_catalogo
+from apps.core.models import (
+    Area, ConfiguracionArea, EstadoTicket, EstadoTurno, Mesa, MotivoCierre,
+    Persona, Ticket, Tramite, Turno, Usuario,
+)
+from apps.core.ruteo import invalidar_perfiles_ruteo
+
+
+def crear_tablas_no_gestionadas() -> None:
+    """Crea las tablas managed=False que todavía no existen en la base de prueba."""
+    existentes = set(connection.introspection.table_names())
+    with connection.schema_editor() as editor:
+        for modelo in apps.get_app_config("core").get_models():
+            if not modelo._meta.managed and modelo._meta.db_table not in existentes:
+                editor.create_model(modelo)
+
+
+def limpiar_estado_del_proceso() -> None:
+    """Cachés y colas en memoria del proceso (sobreviven al rollback de cada test)."""
+    cache.clear()
+    cola._colas.clear()
+    mantenimiento._vencimientos_hechos.clear()
+    ConfiguracionArea.invalidar_cache()
+    invalidar_perfiles_ruteo()
+    recargar_catalogo()
+
+
+def persona_aportes(dni) -> dict:
+    """Respuesta de services.buscar_persona_por_dni para un DNI del padrón."""
+    return {"nombre": "Ana", "apellido": f"Prueba {dni}", "fecha_nacimiento_date": None}
+
+
+class DatosTurnos:
+    """Catálogos, un área con dos trámites y dos mesas, y otra área con un trámite."""
+
+    @classmethod
+    def crear_datos(cls):
+        for estado_id, nombre in (
+            (Turno.PENDIENTE, "PENDIENTE"), (Turno.LLAMANDO, "LLAMANDO"),
+            (Turno.EN_ATENCION, "EN_ATENCION"), (Turno.FINALIZADO, "FINALIZADO"),
+            (Turno.NO_PRESENTO, "NO_PRESENTO"), (Turno.DERIVADO, "DERIVADO"),
+        ):
+            EstadoTurno.objects.create(id=estado_id, nombre=nombre, descripcion=nombre)
+        for estado_id, nombre in (
+            (Ticket.PENDIENTE, "PENDIENTE"), (Ticket.EN_PROCESO, "EN_PROCESO"),
+            (Ticket.COMPLETADO, "COMPLETADO"), (Ticket.CANCELADO, "CANCELADO"),
+        ):
+            EstadoTicket.objects.create(id=estado_id, nombre=nombre, descripcion=nombre)
+
+        cls.area = Area.objects.create(nombre="Área 1", slug="area-1")
+        cls.otra_area = Area.objects.create(nombre="Área 2", slug="area-2")
+        cls.tramite = Tramite.objects.create(area=cls.area, nombre="Jubilación")
+        cls.otro_tramite = Tramite.objects.create(area=cls.area, nombre="Pensión")
+        cls.tramite_otra_area = Tramite.objects.create(area=cls.otra_area, nombre="Certificado")
+        cls.operador = Usuario.objects.create(username="op1", display_name="Operador Uno")
+        cls.otro_operador = Usuario.objects.create(username="op2", display_name="Operador Dos")
+        cls.mesa = Mesa.objects.create(area=cls.area, nombre="M1", operador_asignado=cls.operador)
+        cls.otra_mesa = Mesa.objects.create(area=cls.area, nombre="M2", operador_asignado=cls.otro_operador)
+        cls.motivo = MotivoCierre.objects.create(nombre="Resuelto")
+        for area in (cls.area, cls.otra_area):
+            # Emisión y atención todo el día: los tests no dependen de la hora
+            ConfiguracionArea.objects.create(
+                area=area,
+                emision_hora_inicio=time(0, 0), emision_hora_fin=time(23, 59, 59),
+                atencion_hora_inicio=time(0, 0), atencion_hora_fin=time(23, 59, 59),
+                requiere_motivo_fin=False,
+            )
+
+    def crear_turno(self, hace_min=0, prioridad=0, tramite=None, area=None,
+                    estado_id=Turno.PENDIENTE, numero_visible=0):
+        """Turno (con su Ticket y Persona) creado `hace_min` minutos atrás."""
+        area = area or self.area
+        creacion = timezone.now() - timedelta(minutes=hace_min)
+        dni = 20000000 + Persona.objects.count()
+        persona = Persona.objects.create(dni=dni, nombre="Ana", apellido=f"Prueba {dni}")
+        ticket = Ticket.objects.create(
+            persona=persona, area=area, prioridad=prioridad,
+            fecha_creacion=timezone.localdate(creacion), fecha_hora_creacion=creacion,
+            estado_id=Ticket.PENDIENTE,
+        )
+        return Turno.objects.create(
+            ticket=ticket, tramite=tramite or self.tramite, area=area,
+            numero_visible=numero_visible, estado_id=estado_id, prioridad=prioridad,
+            fecha_turno=timezone.localdate(creacion), fecha_hora_creacion=creacion,
+        )
+
+
+class TurnosTestCase(DatosTurnos, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Antes de abrir la transacción del TestCase (SQLite no crea tablas adentro)
+        crear_tablas_no_gestionadas()
+        super().setUpClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.crear_datos()
+
+    def setUp(self):
+        limpiar_estado_del_proceso()
@@ -0,0 +1,109 @@
+import threading
+
+from django.db import connection, transaction
+from django.test import TransactionTestCase, skipUnlessDBFeature
+
+from apps.core import services
+from apps.core.asignacion import reclamar_proximo_turno
+from apps.core.models import (
+    Area, ConfiguracionArea, EstadoTicket, EstadoTurno, LlamadaTurno, Mesa, MotivoCierre,
+    Persona, Ticket, Tramite, Turno, Usuario,
+)
+
+from .base import DatosTurnos, TurnosTestCase, crear_tablas_no_gestionadas, limpiar_estado_del_proceso
+
+
+class AsignacionTests(TurnosTestCase):
+    def reclamar(self, perfil=None, operador=None, mesa=None):
+        operador, mesa = operador or self.operador, mesa or self.mesa
+        with transaction.atomic():
+            return reclamar_proximo_turno(self.area.pk, operador.pk, mesa.pk, perfil)
+
+    def test_reclamos_sucesivos_siguen_la_cola_sin_repetir(self):
+        viejo = self.crear_turno(hace_min=30)
+        prioritario = self.crear_turno(hace_min=5, prioridad=1)
+        nuevo = self.crear_turno(hace_min=10)
+
+        reclamados = [
+            self.reclamar(),
+            self.reclamar(operador=self.otro_operador, mesa=self.otra_mesa),
+            self.reclamar(),
+            self.reclamar(),
+        ]
+
+        self.assertEqual(reclamados, [prioritario.pk, viejo.pk, nuevo.pk, None])
+        viejo.refresh_from_db()
+        self.assertEqual(viejo.estado_id, Turno.LLAMANDO)
+        self.assertEqual((viejo.operador_id, viejo.mesa_asignada_id), (self.otro_operador.pk, self.otra_mesa.pk))
+
+    def test_ignora_otras_areas_y_turnos_no_pendientes(self):
+        self.crear_turno(area=self.otra_area, tramite=self.tramite_otra_area)
+        self.crear_turno(estado_id=Turno.EN_ATENCION)
+        self.assertIsNone(self.reclamar())
+
+    def test_llamar_proximo_turno_registra_una_llamada_por_operador(self):
+        primero = self.crear_turno(hace_min=2)
+        segundo = self.crear_turno(hace_min=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            llamado = services.llamar_proximo_turno(self.area, self.operador, self.mesa)
+        with self.captureOnCommitCallbacks(execute=True):
+            otro = services.llamar_proximo_turno(self.area, self.otro_operador, self.otra_mesa)
+
+        self.assertEqual((llamado.pk, otro.pk), (primero.pk, segundo.pk))
+        self.assertEqual(
+            sorted(LlamadaTurno.objects.values_list("turno_id", "operador_id")),
+            [(primero.pk, self.operador.pk), (segundo.pk, self.otro_operador.pk)],
+        )
+        self.assertIsNone(services.llamar_proximo_turno(self.area, self.operador, self.mesa))
+
+
+@skipUnlessDBFeature("has_select_for_update_skip_locked")
+class ReclamoConcurrenteTests(DatosTurnos, TransactionTestCase):
+    """
+    Operadores simultáneos: cada uno retiene su turno bloqueado hasta que
+    todos reclamaron. Si un reclamo esperara el bloqueo de otro (en lugar de
+    saltearlo) la barrera vence y el test falla.
+    """
+    OPERADORES = 3
+
+    @classmethod
+    def setUpClass(cls):
+        crear_tablas_no_gestionadas()
+        super().setUpClass()
+
+    def setUp(self):
+        self.crear_datos()
+        limpiar_estado_del_proceso()
+
+    def tearDown(self):
+        # TransactionTestCase sólo vacía las tablas managed
+        for modelo in (LlamadaTurno, Turno, Ticket, Persona, ConfiguracionArea, MotivoCierre, Mesa,
+                       Tramite, Usuario, Area, EstadoTurno, EstadoTicket):
+            modelo.objects.all().delete()
+
+    def test_operadores_simultaneos_obtienen_turnos_distintos(self):
+        pendientes = [self.crear_turno(hace_min=10 - i).pk for i in range(self.OPERADORES + 2)]
+        barrera = threading.Barrier(self.OPERADORES, timeout=10)
+        reclamados, errores = [], []
+
+        def operador():
+            try:
+                with transaction.atomic():
+                    turno_id = reclamar_proximo_turno(self.area.pk, self.operador.pk, self.mesa.pk)
+                    barrera.wait()
+                reclamados.append(turno_id)
+            except Exception as exc:
+                errores.append(exc)
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=operador) for _ in range(self.OPERADORES)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(errores, [])
+        self.assertEqual(sorted(reclamados), pendientes[:self.OPERADORES])
+        self.assertEqual(Turno.objects.filter(estado_id=Turno.LLAMANDO).count(), self.OPERADORES)
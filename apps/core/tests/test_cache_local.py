@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from apps.core import cache_local
+from apps.core.cache_local import CacheLRU
+
+CACHES_CON_PERSONAS = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+    "personas": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "personas"},
+}
+
+
+class Reloj:
+    """Reemplazo de time.monotonic que avanza sólo con `avanzar`."""
+
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+    def avanzar(self, segundos):
+        self.ahora += segundos
+
+
+class CacheLRUTests(SimpleTestCase):
+    def setUp(self):
+        self.reloj = Reloj()
+        parche = mock.patch.object(cache_local.time, "monotonic", self.reloj)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.cargas = []
+
+    def cargar(self, valor):
+        def cargar():
+            self.cargas.append(valor)
+            return valor
+        return cargar
+
+    def test_carga_una_sola_vez_dentro_del_ttl(self):
+        lru = CacheLRU("prueba", ttl=60)
+        self.assertEqual(lru.obtener("a", self.cargar("A")), "A")
+        self.reloj.avanzar(59)
+        self.assertEqual(lru.obtener("a", self.cargar("otro")), "A")
+        self.reloj.avanzar(2)
+        self.assertEqual(lru.obtener("a", self.cargar("B")), "B")
+        self.assertEqual(self.cargas, ["A", "B"])
+
+    def test_desaloja_la_menos_usada(self):
+        lru = CacheLRU("prueba", maximo=2)
+        lru.obtener("a", self.cargar("A"))
+        lru.obtener("b", self.cargar("B"))
+        lru.obtener("a", self.cargar("A"))      # "b" pasa a ser la menos usada
+        lru.obtener("c", self.cargar("C"))
+
+        lru.obtener("a", self.cargar("A"))
+        lru.obtener("b", self.cargar("B"))
+        self.assertEqual(self.cargas, ["A", "B", "C", "B"])
+        self.assertEqual(lru.estadisticas()["desalojos"], 2)
+
+    def test_no_encontrados_con_ttl_negativo(self):
+        lru = CacheLRU("prueba", ttl=600, ttl_negativo=30)
+        self.assertIsNone(lru.obtener("a", self.cargar(None)))
+        self.assertIsNone(lru.obtener("a", self.cargar("A")))
+        self.assertEqual(lru.estadisticas()["hits_negativos"], 1)
+
+        self.reloj.avanzar(31)
+        self.assertEqual(lru.obtener("a", self.cargar("A")), "A")
+        self.assertEqual(self.cargas, [None, "A"])
+
+    def test_las_excepciones_no_se_cachean(self):
+        lru = CacheLRU("prueba")
+
+        def fallar():
+            raise RuntimeError("caído")
+
+        with self.assertRaises(RuntimeError):
+            lru.obtener("a", fallar)
+        self.assertEqual(lru.obtener("a", self.cargar("A")), "A")
+
+    @override_settings(CACHES=CACHES_CON_PERSONAS)
+    def test_con_alias_otro_worker_no_vuelve_a_cargar(self):
+        worker_1 = CacheLRU("prueba", alias="personas")
+        worker_2 = CacheLRU("prueba", alias="personas")
+
+        worker_1.obtener("a", self.cargar("A"))
+        worker_1.obtener("nadie", self.cargar(None))
+
+        self.assertEqual(worker_2.obtener("a", self.cargar("otro")), "A")
+        self.assertIsNone(worker_2.obtener("nadie", self.cargar("otro")))
+        self.assertEqual(self.cargas, ["A", None])
+        self.assertEqual(worker_2.estadisticas()["hits_compartida"], 2)
+        # Nunca en la caché `default` (secuencias y candados)
+        self.assertIsNone(caches["default"].get(worker_1._key("a")))
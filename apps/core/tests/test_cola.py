@@ -0,0 +1,90 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import override_settings
+
+from apps.core import cola, services
+from apps.core.cola import EVENTO_CACHE_KEY, ColaArea, cola_de_area
+from apps.core.models import Turno
+
+from .base import TurnosTestCase
+from .test_cache_local import Reloj
+
+# Varios procesos: el registro de eventos vive en el alias `cola`
+CACHES_CON_REGISTRO = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+    "cola": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "cola"},
+}
+
+
+@override_settings(CACHES=CACHES_CON_REGISTRO, COLA_RECONCILIACION_SEG=300)
+class ColaAreaTests(TurnosTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["cola"].clear()
+        self.reloj = Reloj()
+        parche = mock.patch.object(cola.time, "monotonic", self.reloj)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.turnos = [self.crear_turno(hace_min=30 - i) for i in range(3)]
+
+    def ids(self, cola_area):
+        return [entrada.id for entrada in cola_area.pendientes()]
+
+    def llamar(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return services.llamar_proximo_turno(self.area, self.operador, self.mesa)
+
+    def test_los_eventos_del_proceso_la_mantienen_sin_consultas(self):
+        local = cola_de_area(self.area.pk)
+        self.assertEqual(self.ids(local), [t.pk for t in self.turnos])
+
+        llamado = self.llamar()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.ids(local), [t.pk for t in self.turnos[1:]])
+            self.assertEqual(local.turno_de_operador(self.operador.pk).id, llamado.pk)
+
+    def test_otro_proceso_se_pone_al_dia_con_el_registro(self):
+        cola_de_area(self.area.pk).pendientes()
+        otro_proceso = ColaArea(self.area.pk)
+        otro_proceso.pendientes()
+
+        self.llamar()
+        self.llamar()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.ids(otro_proceso), [self.turnos[2].pk])
+        self.assertEqual(otro_proceso.seq, 2)
+
+    def test_si_falta_un_evento_rehidrata(self):
+        otro_proceso = ColaArea(self.area.pk)
+        otro_proceso.pendientes()
+
+        self.llamar()
+        self.llamar()
+        caches["cola"].delete(EVENTO_CACHE_KEY.format(area_id=self.area.pk, seq=1))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.ids(otro_proceso), [self.turnos[2].pk])
+
+    def test_la_reconciliacion_corrige_cambios_por_fuera_de_los_servicios(self):
+        local = cola_de_area(self.area.pk)
+        local.pendientes()
+        # p.ej. una edición desde el admin: no publica evento
+        Turno.objects.filter(pk=self.turnos[0].pk).update(estado_id=Turno.FINALIZADO)
+
+        self.assertEqual(self.ids(local), [t.pk for t in self.turnos])
+        self.reloj.avanzar(300)
+        with self.assertLogs(cola.logger, "WARNING") as logs:
+            self.assertEqual(self.ids(local), [t.pk for t in self.turnos[1:]])
+        self.assertIn("desvío corregido", logs.output[0])
+
+    def test_descartar_rehidrata_en_la_proxima_lectura(self):
+        local = cola_de_area(self.area.pk)
+        local.pendientes()
+        Turno.objects.filter(pk=self.turnos[0].pk).update(estado_id=Turno.FINALIZADO)
+
+        local.descartar()
+
+        self.assertEqual(self.ids(local), [t.pk for t in self.turnos[1:]])
@@ -0,0 +1,59 @@
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.test import RequestFactory
+
+from apps.core.cache_local import CacheVersionada
+from apps.core.models import Area, ConfiguracionArea
+
+from .base import TurnosTestCase
+
+
+class ConfiguracionAreaCacheTests(TurnosTestCase):
+    def test_segunda_lectura_sin_consultas(self):
+        ConfiguracionArea.get_for_area(self.area)
+        with self.assertNumQueries(0):
+            config = ConfiguracionArea.get_for_area(self.area.pk)
+        self.assertEqual(config.area_id, self.area.pk)
+
+    def test_invalidar_recarga_el_area(self):
+        ConfiguracionArea.get_for_area(self.area)
+        ConfiguracionArea.objects.filter(area=self.area).update(max_turnos_por_dia=9)
+
+        self.assertEqual(ConfiguracionArea.get_for_area(self.area).max_turnos_por_dia, 3)
+        ConfiguracionArea.invalidar_cache(self.area)
+        self.assertEqual(ConfiguracionArea.get_for_area(self.area).max_turnos_por_dia, 9)
+
+    def test_guardar_desde_el_admin_invalida(self):
+        ConfiguracionArea.get_for_area(self.area)
+        config = ConfiguracionArea.objects.get(area=self.area)
+        config.max_turnos_por_dia = 7
+        request = RequestFactory().post("/admin/")
+        request.user = User.objects.create_superuser("admin", "admin@example.com", "x")
+
+        admin.site._registry[ConfiguracionArea].save_model(request, config, form=None, change=False)
+
+        self.assertEqual(ConfiguracionArea.get_for_area(self.area).max_turnos_por_dia, 7)
+
+    def test_crea_la_configuracion_por_defecto(self):
+        area = Area.objects.create(nombre="Área nueva", slug="area-nueva")
+        self.assertEqual(ConfiguracionArea.get_for_area(area).area_id, area.pk)
+        self.assertTrue(ConfiguracionArea.objects.filter(area=area).exists())
+
+
+class CacheVersionadaTests(TurnosTestCase):
+    def test_la_invalidacion_llega_a_otro_proceso(self):
+        # Dos instancias con el mismo nombre = dos procesos con la caché compartida
+        local, otro_proceso = CacheVersionada("prueba", ttl=0), CacheVersionada("prueba", ttl=0)
+        cargas = []
+
+        def cargar():
+            cargas.append(1)
+            return len(cargas)
+
+        self.assertEqual(local.obtener("clave", cargar), 1)
+        # Vencido el TTL sin invalidaciones: renueva sin recargar
+        self.assertEqual(local.obtener("clave", cargar), 1)
+        otro_proceso.invalidar("clave")
+        self.assertEqual(local.obtener("clave", cargar), 2)
+        otro_proceso.invalidar_todo()
+        self.assertEqual(local.obtener("clave", cargar), 3)
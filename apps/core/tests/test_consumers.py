@@ -0,0 +1,140 @@
+from datetime import date
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.test import SimpleTestCase
+
+from apps.core import websocket_utils
+from apps.core.websocket_utils import (
+    _publicar_en_grupos, emitir_turnos_vencidos, grupo_area, grupo_mesa, grupo_operador,
+)
+from turnero.routing import websocket_urlpatterns
+
+OPERADOR = SimpleNamespace(is_authenticated=True)
+
+
+class ConsumerTestCase(SimpleTestCase):
+    async def conectar(self, ruta, usuario=None):
+        """Socket conectado a `ruta` y su mensaje connection_established."""
+        socket = WebsocketCommunicator(URLRouter(websocket_urlpatterns), ruta)
+        socket.scope["user"] = usuario or AnonymousUser()
+        conectado, _ = await socket.connect()
+        self.assertTrue(conectado)
+        return socket, await socket.receive_json_from()
+
+
+class SuscripcionPrivadaTests(ConsumerTestCase):
+    async def test_sin_sesion_rechaza_mesa_y_operador(self):
+        socket, bienvenida = await self.conectar("/ws/turnos/?area=1&mesa=2&operador=3")
+
+        self.assertEqual(bienvenida["grupos"], ["turnos_area_1"])
+        error = await socket.receive_json_from()
+        self.assertEqual(error["type"], "error")
+        self.assertEqual(error["rechazados"], ["mesa", "operador"])
+        await socket.disconnect()
+
+    async def test_con_sesion_admite_mesa_y_operador(self):
+        socket, bienvenida = await self.conectar("/ws/turnos/?mesa=2&operador=3", usuario=OPERADOR)
+
+        self.assertEqual(bienvenida["grupos"], ["turnos_mesa_2", "turnos_operador_3"])
+        self.assertTrue(await socket.receive_nothing())
+        await socket.disconnect()
+
+    async def test_subscribe_sin_sesion_tampoco_admite_grupos_privados(self):
+        socket, _ = await self.conectar("/ws/turnos/")
+
+        await socket.send_json_to({"type": "subscribe", "area": 1, "mesa": 2})
+        respuesta = await socket.receive_json_from()
+        self.assertEqual(respuesta["grupos"], ["turnos_area_1"])
+        self.assertEqual((await socket.receive_json_from())["rechazados"], ["mesa"])
+        await socket.disconnect()
+
+
+class GruposPorAreaTests(ConsumerTestCase):
+    async def vencer(self, area_id):
+        """Publica un evento turnos_vencidos (sólo va al grupo del área)."""
+        await sync_to_async(emitir_turnos_vencidos)(area_id, 3, date(2026, 1, 1))
+
+    async def test_cada_monitor_recibe_solo_su_area(self):
+        monitor_1, bienvenida = await self.conectar("/ws/turnos/area/1/")
+        monitor_2, _ = await self.conectar("/ws/turnos/area/2/")
+        self.assertEqual(bienvenida["grupos"], ["turnos_area_1"])
+
+        await self.vencer(1)
+
+        evento = await monitor_1.receive_json_from()
+        self.assertEqual((evento["type"], evento["area_id"]), ("turnos_vencidos", 1))
+        self.assertTrue(await monitor_2.receive_nothing())
+        await monitor_1.disconnect()
+        await monitor_2.disconnect()
+
+    async def test_sin_suscripcion_no_recibe_eventos(self):
+        socket, bienvenida = await self.conectar("/ws/turnos/")
+        self.assertEqual(bienvenida["grupos"], [])
+
+        await self.vencer(1)
+
+        self.assertTrue(await socket.receive_nothing())
+        await socket.disconnect()
+
+    async def test_subscribe_reemplaza_el_area(self):
+        socket, _ = await self.conectar("/ws/turnos/area/1/")
+        await socket.send_json_to({"type": "subscribe", "area": 2})
+        self.assertEqual((await socket.receive_json_from())["grupos"], ["turnos_area_2"])
+
+        await self.vencer(1)
+        await self.vencer(2)
+
+        self.assertEqual((await socket.receive_json_from())["area_id"], 2)
+        self.assertTrue(await socket.receive_nothing())
+        await socket.disconnect()
+
+
+class ReenvioTests(ConsumerTestCase):
+    TURNO = {
+        "id": 10, "numero_visible": 4, "estado_id": 1, "area_id": 1,
+        "persona": {"nombre": "Ana", "apellido": "Pérez", "dni": 30111222, "nombre_completo": "Ana Pérez"},
+    }
+
+    async def publicar_llamado(self):
+        """Publica un turno_llamado (área + mesa 5 + operador 7) y devuelve los textos codificados."""
+        textos = []
+        codificar = websocket_utils.codificar_evento
+
+        def registrar(mensaje):
+            textos.append(codificar(mensaje))
+            return textos[-1]
+
+        with mock.patch.object(websocket_utils, "codificar_evento", side_effect=registrar):
+            await sync_to_async(_publicar_en_grupos)(
+                1, {"type": "turno_llamado", "turno": dict(self.TURNO)}, [grupo_area(1)],
+                grupos_privados=[grupo_mesa(5), grupo_operador(7)],
+            )
+        return textos
+
+    async def test_codifica_una_vez_por_audiencia_y_reenvia_el_texto(self):
+        monitor, _ = await self.conectar("/ws/turnos/area/1/")
+        mesa, _ = await self.conectar("/ws/turnos/?mesa=5", usuario=OPERADOR)
+
+        privado, publico = await self.publicar_llamado()
+
+        self.assertEqual(await mesa.receive_from(), privado)
+        self.assertEqual(await monitor.receive_from(), publico)
+        self.assertNotIn("dni", publico)
+        self.assertIn("30111222", privado)
+        await monitor.disconnect()
+        await mesa.disconnect()
+
+    async def test_descarta_el_mismo_evento_de_otro_grupo(self):
+        operador, _ = await self.conectar("/ws/turnos/?area=1&mesa=5&operador=7", usuario=OPERADOR)
+
+        privado, _ = await self.publicar_llamado()
+
+        # Llega por los tres grupos: se reenvía sólo la primera copia (la completa)
+        self.assertEqual(await operador.receive_from(), privado)
+        self.assertTrue(await operador.receive_nothing())
+        await operador.disconnect()
@@ -0,0 +1,64 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from apps.core import estimacion, services
+from apps.core.models import Turno
+
+from .base import TurnosTestCase
+
+
+class EsperaEstimadaTests(TurnosTestCase):
+    def atendido(self, minutos, mesa=None):
+        """Turno FINALIZADO con una atención de `minutos` que terminó recién."""
+        fin = timezone.now()
+        turno = self.crear_turno(hace_min=60, estado_id=Turno.FINALIZADO)
+        Turno.objects.filter(pk=turno.pk).update(
+            fecha_hora_inicio_atencion=fin - timedelta(minutes=minutos), fecha_hora_fin_atencion=fin,
+            mesa_asignada=mesa or self.mesa,
+        )
+        turno.refresh_from_db()
+        return turno
+
+    def test_espera_estimada_con_la_duracion_de_las_atenciones(self):
+        turnos = [self.crear_turno(hace_min=30 - i) for i in range(3)]
+        self.assertIsNone(services.posicion_en_cola(turnos[2].pk)["espera_estimada_min"])
+
+        # Una atención de 10 minutos y una sola mesa: 2 turnos adelante = 20 minutos
+        cache.clear()
+        self.atendido(10)
+
+        datos = services.posicion_en_cola(turnos[2].pk)
+        self.assertEqual(datos["adelante"], 2)
+        self.assertEqual(datos["espera_estimada_min"], 20)
+        self.assertGreaterEqual(datos["espera_estimada_max_min"], datos["espera_estimada_min"])
+
+    def test_cada_atencion_suma_una_muestra_sin_consultar(self):
+        estimacion.registrar_atencion(self.atendido(10))
+        self.assertEqual(estimacion.resumen_duraciones("area", self.area.pk)["n"], 1)
+
+        otra = self.atendido(20, mesa=self.otra_mesa)
+        with self.assertNumQueries(0):
+            estimacion.registrar_atencion(otra)
+            espera = estimacion.estimar_espera(self.area.pk, adelante=3)
+
+        # EWMA (alfa 0.2) = 12 minutos, repartidos entre dos mesas activas
+        self.assertEqual(estimacion.resumen_duraciones("tramite", self.tramite.pk)["n"], 2)
+        self.assertEqual((espera["mesas"], espera["minutos"]), (2, 18))
+
+    def test_ignora_atenciones_que_quedaron_abiertas(self):
+        estimacion.registrar_atencion(self.atendido(5 * 60))
+        self.assertIsNone(estimacion.estimar_espera(self.area.pk, adelante=1))
+
+
+class PercentilTests(SimpleTestCase):
+    def test_limite_superior_del_tramo(self):
+        resumen = estimacion._vacio()
+        for segundos in [45] * 9 + [600]:
+            estimacion._sumar(resumen, segundos)
+
+        self.assertEqual(estimacion.percentil(resumen, 50), 60)
+        self.assertEqual(estimacion.percentil(resumen, 100), 630)
+        self.assertIsNone(estimacion.percentil(estimacion._vacio(), 90))
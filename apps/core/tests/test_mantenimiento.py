@@ -0,0 +1,90 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core import mantenimiento, services
+from apps.core.mantenimiento import VENCIMIENTO_CACHE_KEY, asegurar_vencimiento, purgar_llamadas
+from apps.core.models import LlamadaTurno, Turno
+
+from .base import TurnosTestCase, persona_aportes
+
+
+class PurgaLlamadasTests(TurnosTestCase):
+    def setUp(self):
+        super().setUp()
+        turno = self.crear_turno()
+        ahora = timezone.now()
+        LlamadaTurno.objects.bulk_create(
+            [LlamadaTurno(turno=turno, fecha_hora=ahora - timedelta(days=2, minutes=i)) for i in range(5)]
+            + [LlamadaTurno(turno=turno, fecha_hora=ahora - timedelta(minutes=i)) for i in range(2)]
+        )
+
+    def test_borra_en_tandas_solo_lo_vencido(self):
+        progreso = []
+        resultado = purgar_llamadas(dias=1, tamanio_tanda=2, progreso=lambda r: progreso.append(r.eliminados))
+
+        self.assertEqual((resultado.eliminados, resultado.tandas, resultado.completa), (5, 3, True))
+        self.assertEqual(progreso, [2, 4, 5])
+        self.assertEqual(LlamadaTurno.objects.count(), 2)
+
+    def test_max_tandas_deja_el_resto_para_la_proxima_corrida(self):
+        resultado = purgar_llamadas(dias=1, tamanio_tanda=2, max_tandas=1)
+
+        self.assertEqual((resultado.eliminados, resultado.completa), (2, False))
+        self.assertEqual(purgar_llamadas(dias=1, tamanio_tanda=2).eliminados, 3)
+
+
+@mock.patch.object(services, "buscar_persona_por_dni", side_effect=persona_aportes)
+class VencimientoTests(TurnosTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hoy = timezone.localdate()
+        self.de_ayer = self.crear_turno(hace_min=24 * 60)
+        self.clave = VENCIMIENTO_CACHE_KEY.format(area_id=self.area.pk, fecha=self.hoy)
+        parche = mock.patch.object(
+            mantenimiento, "vencer_turnos_anteriores", wraps=mantenimiento.vencer_turnos_anteriores,
+        )
+        self.vencer = parche.start()
+        self.addCleanup(parche.stop)
+
+    def emitir(self, dni):
+        with self.captureOnCommitCallbacks(execute=True):
+            return services.emitir_turno(self.area, self.tramite, dni)
+
+    def test_la_primera_emision_del_dia_vence_una_sola_vez(self, _buscar):
+        self.emitir(30000001)
+        self.emitir(30000002)
+
+        self.vencer.assert_called_once_with(self.area.pk, self.hoy)
+        self.de_ayer.refresh_from_db()
+        self.assertEqual(self.de_ayer.estado_id, Turno.NO_PRESENTO)
+        self.assertTrue(cache.get(self.clave))
+
+    def test_no_vence_si_otro_proceso_tiene_el_candado(self, _buscar):
+        cache.add(self.clave, True)
+
+        self.emitir(30000001)
+
+        self.vencer.assert_not_called()
+        self.de_ayer.refresh_from_db()
+        self.assertEqual(self.de_ayer.estado_id, Turno.PENDIENTE)
+        # Ya anotada en el proceso: las siguientes emisiones ni programan el on_commit
+        with self.captureOnCommitCallbacks() as callbacks, transaction.atomic():
+            asegurar_vencimiento(self.area.pk, self.hoy)
+        self.assertEqual(callbacks, [])
+
+    def test_si_falla_libera_el_candado(self, _buscar):
+        self.vencer.side_effect = RuntimeError("deadlock")
+
+        with self.assertRaises(RuntimeError):
+            mantenimiento._vencer_una_vez(self.area.pk, self.hoy)
+
+        self.assertIsNone(cache.get(self.clave))
+        self.assertNotIn(self.area.pk, mantenimiento._vencimientos_hechos)
+        self.vencer.side_effect = None
+        self.emitir(30000001)
+        self.de_ayer.refresh_from_db()
+        self.assertEqual(self.de_ayer.estado_id, Turno.NO_PRESENTO)
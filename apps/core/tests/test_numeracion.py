@@ -0,0 +1,44 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import transaction
+from django.utils import timezone
+
+from apps.core import services
+from apps.core.models import ContadorTurnoDiario
+from apps.core.numeracion import siguiente_numero_visible
+
+from .base import TurnosTestCase, persona_aportes
+
+
+class NumeracionTests(TurnosTestCase):
+    def test_numera_consecutivo_por_area_y_dia(self):
+        hoy = timezone.localdate()
+        manana = hoy + timedelta(days=1)
+
+        self.assertEqual([siguiente_numero_visible(self.area.pk, hoy) for _ in range(3)], [1, 2, 3])
+        self.assertEqual(siguiente_numero_visible(self.otra_area.pk, hoy), 1)
+        self.assertEqual(siguiente_numero_visible(self.area.pk, manana), 1)
+        self.assertEqual(siguiente_numero_visible(self.area.pk, hoy), 4)
+        self.assertEqual(ContadorTurnoDiario.objects.count(), 3)
+
+    def test_continua_desde_los_turnos_ya_emitidos(self):
+        self.crear_turno(numero_visible=7)
+        self.assertEqual(siguiente_numero_visible(self.area.pk, timezone.localdate()), 8)
+
+    def test_el_numero_vuelve_atras_si_la_transaccion_se_revierte(self):
+        hoy = timezone.localdate()
+        siguiente_numero_visible(self.area.pk, hoy)
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.assertEqual(siguiente_numero_visible(self.area.pk, hoy), 2)
+            raise RuntimeError("emisión fallida")
+        self.assertEqual(siguiente_numero_visible(self.area.pk, hoy), 2)
+
+    @mock.patch.object(services, "buscar_persona_por_dni", side_effect=persona_aportes)
+    def test_emitir_turno_numera_cada_area_por_separado(self, _buscar):
+        numeros = [
+            services.emitir_turno(self.area, self.tramite, 30000001).numero_visible,
+            services.emitir_turno(self.otra_area, self.tramite_otra_area, 30000002).numero_visible,
+            services.emitir_turno(self.area, self.otro_tramite, 30000003).numero_visible,
+        ]
+        self.assertEqual(numeros, [1, 1, 2])
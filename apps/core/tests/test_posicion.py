@@ -0,0 +1,55 @@
+from django.urls import reverse
+
+from apps.core import services
+from apps.core.models import Turno
+
+from .base import TurnosTestCase
+
+
+class PosicionEnColaTests(TurnosTestCase):
+    def assertPosiciones(self, esperadas):
+        """{turno: posición} desde la cola en memoria y, para los pendientes, igual a la BD."""
+        for turno, posicion in esperadas.items():
+            datos = services.posicion_en_cola(turno.pk)
+            self.assertEqual(datos["posicion"], posicion, f"turno #{turno.pk}")
+            if posicion is not None:
+                self.assertEqual(datos["adelante"], posicion - 1)
+                turno.refresh_from_db()
+                self.assertEqual(services._posicion_en_bd(turno), posicion, f"turno #{turno.pk} (BD)")
+
+    def test_ordena_por_prioridad_y_llegada(self):
+        viejo = self.crear_turno(hace_min=30)
+        nuevo = self.crear_turno(hace_min=10)
+        prioritario = self.crear_turno(hace_min=5, prioridad=1)
+        self.assertPosiciones({prioritario: 1, viejo: 2, nuevo: 3})
+
+    def test_la_cola_avanza_al_llamar(self):
+        primero = self.crear_turno(hace_min=30)
+        segundo = self.crear_turno(hace_min=20)
+        tercero = self.crear_turno(hace_min=10)
+        self.assertPosiciones({primero: 1, segundo: 2, tercero: 3})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.llamar_proximo_turno(self.area, self.operador, self.mesa)
+
+        self.assertEqual(services.posicion_en_cola(primero.pk)["estado_id"], Turno.LLAMANDO)
+        self.assertPosiciones({primero: None, segundo: 1, tercero: 2})
+
+    def test_turno_inexistente(self):
+        self.assertIsNone(services.posicion_en_cola(999999))
+
+    def test_endpoint_sin_consultas_con_la_cola_cargada(self):
+        self.crear_turno(hace_min=30)
+        turno = self.crear_turno(hace_min=10)
+        url = reverse("api_posicion_turno", args=[turno.pk])
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            respuesta = self.client.get(url)
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(
+            {k: respuesta.json()[k] for k in ("turno_id", "posicion", "adelante", "estado")},
+            {"turno_id": turno.pk, "posicion": 2, "adelante": 1, "estado": "PENDIENTE"},
+        )
+        self.assertEqual(self.client.get(reverse("api_posicion_turno", args=[999999])).status_code, 404)
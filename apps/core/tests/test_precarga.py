@@ -0,0 +1,71 @@
+from datetime import date
+from unittest import mock
+
+from django.db import OperationalError
+
+from apps.core import services_aportes
+from apps.core.models import Persona
+from apps.core.services import precargar_personas
+from apps.core.services_aportes import CircuitBreaker
+
+from .base import TurnosTestCase
+
+
+class PrecargaPersonasTests(TurnosTestCase):
+    databases = {"default", "aportes"}
+
+    def setUp(self):
+        super().setUp()
+        parche = mock.patch.object(services_aportes.cliente, "circuito", CircuitBreaker("prueba", umbral=2))
+        parche.start()
+        self.addCleanup(parche.stop)
+
+    def padron(self, fallan=(), fallan_una_vez=()):
+        """SP simulado: DNIs terminados en 0 no existen; `fallan` nunca responden."""
+        pendientes_de_fallar = set(fallan_una_vez)
+
+        def sp(dni_limpio, cursor=None):
+            dni = int(dni_limpio)
+            if dni in fallan or dni in pendientes_de_fallar:
+                pendientes_de_fallar.discard(dni)
+                raise OperationalError("timeout")
+            if dni % 10 == 0:
+                return None
+            return {"apeynom": f"APELLIDO {dni}, NOMBRE", "fecha_nac": date(1950, 1, 1), "sexo": None}
+
+        return mock.patch.object(services_aportes, "_ejecutar_sp_persona", side_effect=sp)
+
+    def test_guarda_los_encontrados(self):
+        with self.padron():
+            resultado = precargar_personas([30000001, 30000002, 30000010, 30000001])
+
+        self.assertEqual(
+            {k: resultado[k] for k in ("solicitados", "encontrados", "no_encontrados", "sin_respuesta")},
+            {"solicitados": 3, "encontrados": 2, "no_encontrados": 1, "sin_respuesta": 0},
+        )
+        self.assertEqual(resultado["no_consultados"], [])
+        self.assertEqual(
+            sorted(Persona.objects.values_list("dni", "apellido", "fecha_nacimiento")),
+            [(30000001, "APELLIDO 30000001", date(1950, 1, 1)), (30000002, "APELLIDO 30000002", date(1950, 1, 1))],
+        )
+
+    def test_actualiza_las_existentes(self):
+        Persona.objects.create(dni=30000001, nombre="", apellido="")
+        with self.padron():
+            precargar_personas([30000001])
+        self.assertEqual(Persona.objects.get(dni=30000001).apellido, "APELLIDO 30000001")
+
+    def test_reintenta_el_dni_que_fallo_una_vez(self):
+        with self.padron(fallan_una_vez={30000002}), self.assertLogs(services_aportes.logger, "WARNING"):
+            resultado = precargar_personas([30000001, 30000002, 30000003])
+
+        self.assertEqual((resultado["encontrados"], resultado["no_consultados"]), (3, []))
+
+    def test_se_detiene_sin_saltear_dnis_si_aportes_deja_de_responder(self):
+        with self.padron(fallan={30000002}), self.assertLogs(services_aportes.logger, "WARNING"):
+            resultado = precargar_personas([30000001, 30000002, 30000003, 30000004])
+
+        self.assertEqual(resultado["encontrados"], 1)
+        self.assertEqual(resultado["sin_respuesta"], 3)
+        self.assertEqual(resultado["no_consultados"], [30000002, 30000003, 30000004])
+        self.assertEqual(list(Persona.objects.values_list("dni", flat=True)), [30000001])
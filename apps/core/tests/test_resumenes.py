@@ -0,0 +1,69 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+from apps.core import services
+from apps.core.mantenimiento import vencer_turnos_anteriores
+from apps.core.resumenes import obtener_indicadores, obtener_totales, recalcular_dia
+
+from .base import TurnosTestCase, persona_aportes
+
+
+@mock.patch.object(services, "buscar_persona_por_dni", side_effect=persona_aportes)
+class ResumenTests(TurnosTestCase):
+    def confirmar(self, operacion, *args, **kwargs):
+        """Ejecuta un servicio y sus on_commit (registro en ResumenTurnoHora)."""
+        with self.captureOnCommitCallbacks(execute=True):
+            return operacion(*args, **kwargs)
+
+    def test_lo_registrado_en_linea_coincide_con_el_recalculo(self, _buscar):
+        hoy = timezone.localdate()
+        for dni, tramite in ((30000001, self.tramite), (30000002, self.otro_tramite), (30000003, self.tramite)):
+            self.confirmar(services.emitir_turno, self.area, tramite, dni)
+
+        atendido = self.confirmar(services.llamar_proximo_turno, self.area, self.operador, self.mesa)
+        self.confirmar(services.iniciar_atencion, atendido)
+        self.confirmar(services.finalizar_atencion, atendido, motivo_cierre_id=self.motivo.pk)
+        ausente = self.confirmar(services.llamar_proximo_turno, self.area, self.otro_operador, self.otra_mesa)
+        self.confirmar(services.marcar_no_presento, ausente)
+
+        totales = obtener_totales(hoy, hoy, area_id=self.area.pk)
+        por_operador = obtener_indicadores(hoy, hoy, agrupar="operador", area_id=self.area.pk)
+        por_motivo = obtener_indicadores(hoy, hoy, agrupar="motivo", area_id=self.area.pk)
+        self.assertEqual(
+            {campo: totales[campo] for campo in ("emitidos", "iniciados", "finalizados", "no_presento")},
+            {"emitidos": 3, "iniciados": 1, "finalizados": 1, "no_presento": 1},
+        )
+
+        recalcular_dia(hoy)
+
+        self.assertEqual(obtener_totales(hoy, hoy, area_id=self.area.pk), totales)
+        self.assertEqual(obtener_indicadores(hoy, hoy, agrupar="operador", area_id=self.area.pk), por_operador)
+        self.assertEqual(obtener_indicadores(hoy, hoy, agrupar="motivo", area_id=self.area.pk), por_motivo)
+
+    def test_los_vencidos_coinciden_con_el_recalculo(self, _buscar):
+        hoy = timezone.localdate()
+        ayer = hoy - timedelta(days=1)
+        for _ in range(2):
+            self.crear_turno(hace_min=24 * 60)
+
+        self.confirmar(vencer_turnos_anteriores, self.area.pk, hoy)
+
+        totales = obtener_totales(ayer, ayer, area_id=self.area.pk)
+        self.assertEqual(totales["no_presento"], 2)
+        recalcular_dia(ayer)
+        self.assertEqual(obtener_totales(ayer, ayer, area_id=self.area.pk)["no_presento"], 2)
+
+    def test_recalcular_dos_veces_no_duplica(self, _buscar):
+        hoy = timezone.localdate()
+        self.confirmar(services.emitir_turno, self.area, self.tramite, 30000001)
+
+        filas = recalcular_dia(hoy)
+        self.assertEqual(recalcular_dia(hoy), filas)
+        self.assertEqual(obtener_totales(hoy, hoy)["emitidos"], 1)
+
+    def test_agrupacion_desconocida(self, _buscar):
+        hoy = timezone.localdate()
+        with self.assertRaises(ValueError):
+            obtener_indicadores(hoy, hoy, agrupar="mesa")
@@ -0,0 +1,69 @@
+from django.db import transaction
+
+from apps.core import services
+from apps.core.asignacion import reclamar_proximo_turno
+from apps.core.models import MesaTramite, TramiteOperador
+from apps.core.ruteo import PerfilRuteo, invalidar_perfiles_ruteo, perfil_ruteo
+
+from .base import TurnosTestCase
+
+
+class PerfilRuteoTests(TurnosTestCase):
+    def test_sin_filas_admite_todo(self):
+        perfil = perfil_ruteo(self.mesa.pk, self.operador.pk)
+        self.assertEqual(perfil, PerfilRuteo())
+        self.assertTrue(perfil.admite(self.tramite.pk))
+
+    def test_la_mesa_restringe_y_el_operador_excluye(self):
+        MesaTramite.objects.create(mesa=self.mesa, tramite=self.tramite)
+        MesaTramite.objects.create(mesa=self.mesa, tramite=self.otro_tramite)
+        TramiteOperador.objects.create(operador=self.operador, tramite=self.otro_tramite, habilitada=False)
+
+        perfil = perfil_ruteo(self.mesa.pk, self.operador.pk)
+
+        self.assertEqual(perfil.tramites, frozenset({self.tramite.pk}))
+        self.assertFalse(perfil.admite(self.otro_tramite.pk))
+        self.assertEqual(perfil_ruteo(self.mesa.pk).tramites, frozenset({self.tramite.pk, self.otro_tramite.pk}))
+
+    def test_pesos_solo_si_difieren(self):
+        TramiteOperador.objects.create(operador=self.operador, tramite=self.tramite, prioridad_atencion=1)
+        TramiteOperador.objects.create(operador=self.operador, tramite=self.otro_tramite, prioridad_atencion=1)
+        self.assertEqual(perfil_ruteo(self.mesa.pk, self.operador.pk).pesos, ())
+
+        TramiteOperador.objects.filter(tramite=self.otro_tramite).update(prioridad_atencion=5)
+        # Cacheado hasta invalidar (el admin invalida al guardar)
+        self.assertEqual(perfil_ruteo(self.mesa.pk, self.operador.pk).pesos, ())
+        invalidar_perfiles_ruteo()
+        self.assertEqual(
+            perfil_ruteo(self.mesa.pk, self.operador.pk).pesos,
+            ((self.tramite.pk, 1), (self.otro_tramite.pk, 5)),
+        )
+
+
+class ReclamoConPerfilTests(TurnosTestCase):
+    def reclamar(self, perfil=None):
+        with transaction.atomic():
+            return reclamar_proximo_turno(self.area.pk, self.operador.pk, self.mesa.pk, perfil)
+
+    def test_respeta_los_tramites_y_pesos_del_perfil(self):
+        jubilacion = self.crear_turno(hace_min=20)
+        pension = self.crear_turno(hace_min=10, tramite=self.otro_tramite)
+
+        self.assertIsNone(self.reclamar(PerfilRuteo(tramites=frozenset())))
+        self.assertEqual(self.reclamar(PerfilRuteo(pesos=((self.otro_tramite.pk, 10),))), pension.pk)
+        self.assertIsNone(self.reclamar(PerfilRuteo(tramites=frozenset({self.otro_tramite.pk}))))
+        self.assertEqual(self.reclamar(), jubilacion.pk)
+
+    def test_llamar_proximo_turno_usa_el_perfil_del_operador(self):
+        TramiteOperador.objects.create(operador=self.operador, tramite=self.tramite, prioridad_atencion=1)
+        TramiteOperador.objects.create(operador=self.operador, tramite=self.otro_tramite, prioridad_atencion=5)
+        jubilacion = self.crear_turno(hace_min=20)
+        pension = self.crear_turno(hace_min=10, tramite=self.otro_tramite)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            llamado = services.llamar_proximo_turno(self.area, self.operador, self.mesa)
+        with self.captureOnCommitCallbacks(execute=True):
+            # Sin perfil: el más viejo
+            otro = services.llamar_proximo_turno(self.area, self.otro_operador, self.otra_mesa)
+
+        self.assertEqual((llamado.pk, otro.pk), (pension.pk, jubilacion.pk))
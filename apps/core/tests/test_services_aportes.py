@@ -0,0 +1,126 @@
+from datetime import date
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import OperationalError
+from django.test import SimpleTestCase
+
+from apps.core import services, services_aportes
+from apps.core.cache_local import CacheLRU
+from apps.core.models import Persona
+from apps.core.services_aportes import AportesNoDisponible, CircuitBreaker, ClienteAportes
+
+from .base import TurnosTestCase
+from .test_cache_local import Reloj
+
+PADRON = {"apeynom": "PEREZ, ANA", "fecha_nac": date(1950, 5, 1), "sexo": "F"}
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.reloj = Reloj()
+        parche = mock.patch.object(services_aportes.time, "monotonic", self.reloj)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.circuito = CircuitBreaker("prueba", umbral=2, reintento=30)
+
+    def abrir(self):
+        with self.assertLogs(services_aportes.logger, "WARNING"):
+            self.circuito.registrar_fallo()
+            self.circuito.registrar_fallo()
+
+    def test_se_abre_tras_el_umbral_de_fallos_seguidos(self):
+        self.circuito.registrar_fallo()
+        self.circuito.registrar_exito()
+        self.circuito.registrar_fallo()
+        self.assertTrue(self.circuito.permitir())
+
+        with self.assertLogs(services_aportes.logger, "WARNING"):
+            self.circuito.registrar_fallo()
+        self.assertEqual(self.circuito.estado, CircuitBreaker.ABIERTO)
+        self.assertFalse(self.circuito.permitir())
+
+    def test_semiabierto_deja_pasar_una_sola_prueba(self):
+        self.abrir()
+        self.reloj.avanzar(30)
+
+        self.assertTrue(self.circuito.permitir())
+        self.assertEqual(self.circuito.estado, CircuitBreaker.SEMIABIERTO)
+        self.assertFalse(self.circuito.permitir())
+
+    def test_la_prueba_fallida_reabre_y_la_exitosa_cierra(self):
+        self.abrir()
+        self.reloj.avanzar(30)
+        self.circuito.permitir()
+        with self.assertLogs(services_aportes.logger, "WARNING"):
+            self.circuito.registrar_fallo()
+        self.assertEqual(self.circuito.estado, CircuitBreaker.ABIERTO)
+        self.assertFalse(self.circuito.permitir())
+
+        self.reloj.avanzar(30)
+        self.assertTrue(self.circuito.permitir())
+        self.circuito.registrar_exito()
+        self.assertEqual(self.circuito.estado, CircuitBreaker.CERRADO)
+        self.assertTrue(self.circuito.permitir())
+
+
+class ClienteAportesTests(TurnosTestCase):
+    def setUp(self):
+        super().setUp()
+        parche = mock.patch.object(services_aportes, "_personas", CacheLRU("prueba"))
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.cliente = ClienteAportes()
+        self.cliente.circuito = CircuitBreaker("prueba", umbral=2, reintento=30)
+
+    def sp(self, **kwargs):
+        return mock.patch.object(services_aportes, "_ejecutar_sp_persona", **kwargs)
+
+    def test_usa_persona_local_mientras_aportes_falla(self):
+        Persona.objects.create(dni=30111222, nombre="Ana", apellido="Pérez")
+
+        with self.sp(side_effect=OperationalError("timeout")), self.assertLogs(services_aportes.logger, "WARNING"):
+            resultado = self.cliente.buscar("30.111.222")
+        self.assertEqual(resultado["apeynom"], "Pérez, Ana")
+
+        # El respaldo no se cachea: con Aportes de vuelta se usa el padrón
+        with self.sp(return_value=PADRON):
+            self.assertEqual(self.cliente.buscar(30111222)["apeynom"], "PEREZ, ANA")
+
+    def test_sin_aportes_ni_persona_validada(self):
+        # Guardada sin validar (sin apellido): no cuenta como respaldo
+        Persona.objects.create(dni=30111222, nombre="", apellido="")
+
+        with self.sp(side_effect=OperationalError("timeout")), self.assertLogs(services_aportes.logger, "WARNING"):
+            with self.assertRaises(AportesNoDisponible):
+                self.cliente.buscar(30111222)
+
+    def test_con_el_circuito_abierto_no_consulta_el_sp(self):
+        Persona.objects.create(dni=30111222, nombre="Ana", apellido="Pérez")
+
+        with self.sp(side_effect=OperationalError("timeout")) as sp, self.assertLogs(services_aportes.logger, "WARNING"):
+            for _ in range(4):
+                self.assertEqual(self.cliente.buscar(30111222)["apeynom"], "Pérez, Ana")
+        self.assertEqual(sp.call_count, 2)
+        self.assertEqual(self.cliente.circuito.estado, CircuitBreaker.ABIERTO)
+
+    def test_precargadas_no_consultan_el_sp(self):
+        Persona.objects.create(dni=30111222, nombre="Ana", apellido="Pérez", fecha_nacimiento=date(1950, 5, 1))
+
+        with self.sp() as sp:
+            self.assertEqual(self.cliente.buscar(30111222)["fecha_nac"], date(1950, 5, 1))
+        sp.assert_not_called()
+
+
+class BusquedaAsyncTests(SimpleTestCase):
+    @mock.patch.object(services_aportes, "_personas", CacheLRU("prueba"))
+    @mock.patch.object(ClienteAportes, "_buscar_local", return_value=None)
+    @mock.patch.object(services_aportes, "_ejecutar_sp_persona", return_value=PADRON)
+    def test_abuscar_cierra_las_conexiones_vencidas(self, _sp, _local):
+        with mock.patch("channels.db.close_old_connections") as cerrar:
+            persona = async_to_sync(services.abuscar_persona_por_dni)(30111222)
+
+        self.assertEqual((persona["apellido"], persona["nombre"]), ("PEREZ", "ANA"))
+        self.assertEqual(persona["fecha_nacimiento_date"], date(1950, 5, 1))
+        # Antes y después de la búsqueda (ver channels.db.DatabaseSyncToAsync)
+        self.assertEqual(cerrar.call_count, 2)
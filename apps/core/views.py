@@ -2,19 +2,12 @@ from django.contrib.auth import logout
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import redirect
 
-from .models import Usuario, UsuarioRol
+from .identidad import obtener_identidad
 
 
 def _get_usuario_roles(user) -> list[str]:
     """Devuelve lista de nombres de rol del usuario Django Auth en la tabla UsuarioRol."""
-    try:
-        usuario = Usuario.objects.get(username=user.username)
-        return list(
-            UsuarioRol.objects.filter(usuario=usuario)
-            .values_list("rol__nombre_rol", flat=True)
-        )
-    except Usuario.DoesNotExist:
-        return []
+    return list(obtener_identidad(user).roles)
 
 
 @login_required
@@ -1,143 +1,271 @@
 """
 Utilidades para emitir eventos WebSocket cuando hay cambios en los turnos
-Debe llamarse desde las vistas cuando se crean, actualizan o finalizan turnos
+Las llama apps.core.services (vía transaction.on_commit) en cada transición de estado
 """
 
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from django.core.cache import cache
 from django.utils import timezone
 import json
+import logging
 
+from .estados import nombre_estado_turno
+from .estimacion import segundos_por_turno
+from .models import Ticket, Turno
 
-def emitir_turno_creado(turno):
+try:
+    import orjson  # opcional: codificación más rápida de los eventos
+except ImportError:
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+# Relaciones que lee serializar_turno
+RELACIONES_EVENTO = ('ticket__persona', 'tramite', 'area', 'mesa_asignada')
+
+
+# Número de secuencia por área: cada evento emitido lo incrementa y el monitor
+# lo usa para detectar eventos perdidos y pedir un snapshot de resincronización.
+SEQ_CACHE_KEY = 'turnos:seq:{area_id}'
+
+
+def siguiente_secuencia(area_id):
     """
-    Emite un evento cuando se crea un nuevo turno
+    Incrementa y devuelve el número de secuencia de eventos del área
+    """
+    key = SEQ_CACHE_KEY.format(area_id=area_id)
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # La clave fue desalojada entre add() e incr(): reiniciar la secuencia.
+        # El salto de numeración fuerza a los clientes a resincronizar.
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def secuencia_actual(area_id):
+    """
+    Devuelve el último número de secuencia emitido para el área (0 si no hubo eventos)
+    """
+    return cache.get(SEQ_CACHE_KEY.format(area_id=area_id), 0)
+
+
+# Grupos de Channels: cada evento se publica sólo a los grupos interesados,
+# así el costo de fan-out depende de los oyentes del área y no del edificio.
+def grupo_area(area_id):
+    return f'turnos_area_{area_id}'
+
+
+def grupo_mesa(mesa_id):
+    return f'turnos_mesa_{mesa_id}'
+
+
+def grupo_operador(operador_id):
+    return f'turnos_operador_{operador_id}'
+
+
+def grupos_destino(turno, mesa=None):
     """
+    Grupos privados (requieren sesión, ver consumers) que deben recibir un
+    evento del turno: la mesa y el operador involucrados. El grupo del área
+    es público y recibe la versión sin datos personales del evento.
+    """
+    grupos = []
+    mesa_id = mesa.id if mesa else turno.mesa_asignada_id
+    if mesa_id:
+        grupos.append(grupo_mesa(mesa_id))
+    if turno.operador_id:
+        grupos.append(grupo_operador(turno.operador_id))
+    return grupos
+
+
+def codificar_evento(mensaje):
+    """Codifica el mensaje a texto JSON (orjson si está instalado)"""
+    if orjson is not None:
+        return orjson.dumps(mensaje).decode()
+    return json.dumps(mensaje)
+
+
+def cargar_turno_para_evento(turno):
+    """
+    Devuelve el turno con todas las relaciones que usa serializar_turno.
+    Si ya vienen cargadas (select_related) no consulta; si no, las trae en una
+    sola consulta en lugar de una por relación.
+    """
+    cargadas = (
+        Turno.ticket.is_cached(turno)
+        and Ticket.persona.is_cached(turno.ticket)
+        and Turno.tramite.is_cached(turno)
+        and Turno.area.is_cached(turno)
+        and (turno.mesa_asignada_id is None or Turno.mesa_asignada.is_cached(turno))
+    )
+    if cargadas:
+        return turno
+    return Turno.objects.select_related(*RELACIONES_EVENTO).get(pk=turno.pk)
+
+
+def _publicar(turno, evento, mesa=None):
+    """
+    Completa el evento con área y secuencia y envía el texto ya codificado:
+    la versión pública al grupo del área y la completa a la mesa y al operador
+    """
+    logger.debug(f'[WebSocket] Emitiendo {evento["type"]}: Turno {turno.numero_visible}')
+    _publicar_en_grupos(
+        turno.area_id, evento, [grupo_area(turno.area_id)],
+        turno=turno, grupos_privados=grupos_destino(turno, mesa),
+    )
+
+
+def _publicar_en_grupos(area_id, evento, grupos, turno=None, grupos_privados=()):
+    """
+    Numera el evento, lo aplica a la cola en memoria y lo codifica una vez por
+    audiencia: `grupos` (públicos, p.ej. el monitor del área) reciben el turno
+    sin datos personales; `grupos_privados` reciben el evento completo.
+    """
+    # Import local: cola importa este módulo
+    from .cola import aplicar_evento
+
+    # La secuencia y la cola en memoria del proceso se actualizan aunque no
+    # haya channel layer: la cola se apoya en la secuencia para detectar cambios
+    evento.update({
+        'area_id': area_id,
+        'seq': siguiente_secuencia(area_id),
+        'timestamp': timezone.now().isoformat(),
+    })
+    aplicar_evento(evento, turno)
+
     channel_layer = get_channel_layer()
     if not channel_layer:
+        logger.error('[WebSocket] No hay channel_layer configurado')
         return
-    
-    async_to_sync(channel_layer.group_send)(
-        'turnos_updates',
-        {
-            'type': 'turno_creado',
-            'turno': serializar_turno(turno),
-            'timestamp': timezone.now().isoformat()
-        }
-    )
+
+    # Sobre del channel layer: 'type' para el despacho del consumer, área/seq
+    # para descartar duplicados y 'texto' con el mensaje listo para el socket
+    sobre = {
+        'type': evento['type'],
+        'area_id': evento['area_id'],
+        'seq': evento['seq'],
+    }
+    publico = {**evento, 'turno': version_publica(evento['turno'])} if 'turno' in evento else evento
+    # Primero los privados: un socket suscrito también al área se queda con
+    # la versión completa (el consumer descarta el duplicado por seq)
+    for destinos, mensaje in ((grupos_privados, evento), (grupos, publico)):
+        if not destinos:
+            continue
+        sobre_destino = {**sobre, 'texto': codificar_evento(mensaje)}
+        for grupo in destinos:
+            async_to_sync(channel_layer.group_send)(grupo, sobre_destino)
+
+
+def emitir_turno_creado(turno):
+    """
+    Emite un evento cuando se crea un nuevo turno
+    """
+    turno = cargar_turno_para_evento(turno)
+    _publicar(turno, {
+        'type': 'turno_creado',
+        'turno': serializar_turno(turno),
+    })
 
 
 def emitir_turno_llamado(turno, mesa=None):
     """
     Emite un evento cuando se llama a un turno
     """
-    channel_layer = get_channel_layer()
-    if not channel_layer:
-        print('[WebSocket] ERROR: No hay channel_layer configurado')
-        return
-    
-    turno_data = serializar_turno(turno)
-    print(f'[WebSocket] 📞 Emitiendo turno_llamado: Turno {turno.numero_visible} - Mesa {mesa.nombre if mesa else "sin mesa"}')
-    
-    async_to_sync(channel_layer.group_send)(
-        'turnos_updates',
-        {
-            'type': 'turno_llamado',
-            'turno': turno_data,
-            'mesa': {'id': mesa.id, 'nombre': mesa.nombre} if mesa else None,
-            'timestamp': timezone.now().isoformat()
-        }
-    )
-    print(f'[WebSocket] ✓ Evento turno_llamado emitido correctamente')
+    turno = cargar_turno_para_evento(turno)
+    _publicar(turno, {
+        'type': 'turno_llamado',
+        'turno': serializar_turno(turno),
+        'mesa': {'id': mesa.id, 'nombre': mesa.nombre} if mesa else None,
+    }, mesa=mesa)
 
 
 def emitir_turno_atendiendo(turno, mesa=None):
     """
     Emite un evento cuando un turno pasa a atención
     """
-    channel_layer = get_channel_layer()
-    if not channel_layer:
-        print('[WebSocket] ERROR: No hay channel_layer configurado')
-        return
-    
-    print(f'[WebSocket] ✅ Emitiendo turno_atendiendo: Turno {turno.numero_visible}')
-    
-    async_to_sync(channel_layer.group_send)(
-        'turnos_updates',
-        {
-            'type': 'turno_atendiendo',
-            'turno': serializar_turno(turno),
-            'mesa': {'id': mesa.id, 'nombre': mesa.nombre} if mesa else None,
-            'timestamp': timezone.now().isoformat()
-        }
-    )
+    turno = cargar_turno_para_evento(turno)
+    _publicar(turno, {
+        'type': 'turno_atendiendo',
+        'turno': serializar_turno(turno),
+        'mesa': {'id': mesa.id, 'nombre': mesa.nombre} if mesa else None,
+    }, mesa=mesa)
 
 
 def emitir_turno_finalizado(turno, motivo=None):
     """
     Emite un evento cuando se finaliza un turno
     """
-    channel_layer = get_channel_layer()
-    if not channel_layer:
-        print('[WebSocket] ERROR: No hay channel_layer configurado')
-        return
-    
-    print(f'[WebSocket] 🏁 Emitiendo turno_finalizado: Turno {turno.numero_visible}')
-    
-    async_to_sync(channel_layer.group_send)(
-        'turnos_updates',
-        {
-            'type': 'turno_finalizado',
-            'turno': serializar_turno(turno),
-            'motivo': motivo,
-            'timestamp': timezone.now().isoformat()
-        }
-    )
+    turno = cargar_turno_para_evento(turno)
+    _publicar(turno, {
+        'type': 'turno_finalizado',
+        'turno': serializar_turno(turno),
+        'motivo': motivo,
+        # Cadencia de la cola actualizada con esta atención (espera estimada del monitor)
+        'estimacion': segundos_por_turno(turno.area_id),
+    })
 
 
 def emitir_turno_no_presento(turno):
     """
     Emite un evento cuando se marca un turno como no presentado
     """
-    channel_layer = get_channel_layer()
-    if not channel_layer:
-        print('[WebSocket] ERROR: No hay channel_layer configurado')
-        return
-    
-    print(f'[WebSocket] ❌ Emitiendo turno_no_presento: Turno {turno.numero_visible}')
-    
-    async_to_sync(channel_layer.group_send)(
-        'turnos_updates',
-        {
-            'type': 'turno_no_presento',
-            'turno': serializar_turno(turno),
-            'timestamp': timezone.now().isoformat()
-        }
-    )
+    turno = cargar_turno_para_evento(turno)
+    _publicar(turno, {
+        'type': 'turno_no_presento',
+        'turno': serializar_turno(turno),
+    })
 
 
 def emitir_turno_actualizado(turno, cambios=None):
     """
     Emite un evento cuando se actualiza un turno
     """
-    channel_layer = get_channel_layer()
-    if not channel_layer:
-        return
-    
-    async_to_sync(channel_layer.group_send)(
-        'turnos_updates',
-        {
-            'type': 'turno_actualizado',
-            'turno': serializar_turno(turno),
-            'cambios': cambios or {},
-            'timestamp': timezone.now().isoformat()
-        }
-    )
+    turno = cargar_turno_para_evento(turno)
+    _publicar(turno, {
+        'type': 'turno_actualizado',
+        'turno': serializar_turno(turno),
+        'cambios': cambios or {},
+    })
+
+
+def emitir_turnos_vencidos(area_id, cantidad, hasta):
+    """
+    Un solo evento para el vencimiento masivo de turnos de días anteriores
+    (pasaron a NO_PRESENTO los pendientes/llamando con fecha < `hasta`)
+    """
+    logger.debug(f'[WebSocket] Emitiendo turnos_vencidos: área {area_id}, {cantidad} turnos')
+    _publicar_en_grupos(area_id, {
+        'type': 'turnos_vencidos',
+        'cantidad': cantidad,
+        'hasta': hasta.isoformat(),
+    }, [grupo_area(area_id)])
+
+
+def version_publica(datos):
+    """
+    Turno serializado para pantallas sin sesión (monitor, snapshot, grupo del
+    área): la persona sólo con `nombre_completo`, sin DNI
+    """
+    persona = datos.get('persona')
+    if not persona:
+        return datos
+    nombre = (persona.get('nombre_completo') or '').strip()
+    # Persona sin validar (sin nombre): el monitor muestra el número
+    return {**datos, 'persona': {'nombre_completo': nombre} if nombre else None}
+
+
+def serializar_turno_publico(turno):
+    """Como serializar_turno pero sin datos personales (ver version_publica)"""
+    return version_publica(serializar_turno(turno))
 
 
 def serializar_turno(turno):
     """
-    Convierte un objeto Turno a un diccionario para enviar por WebSocket
+    Convierte un objeto Turno a un diccionario para enviar por WebSocket a
+    grupos privados (mesa, operador). Incluye el DNI de la persona.
     """
     try:
         # Preparar objeto persona
@@ -154,18 +282,20 @@ def serializar_turno(turno):
             'id': turno.id,
             'numero_visible': turno.numero_visible,
             'estado_id': turno.estado_id,
-            'estado': turno.estado.nombre if turno.estado else None,
+            'estado': nombre_estado_turno(turno.estado_id),
             'persona': persona_data,
             'tramite': turno.tramite.nombre if turno.tramite else None,
             'tramite_id': turno.tramite_id,
             'area': turno.area.nombre if turno.area else None,
             'area_id': turno.area_id,
             'mesa_asignada': turno.mesa_asignada.nombre if turno.mesa_asignada else None,
-            'prioridad': turno.ticket.prioridad if turno.ticket else 0,
+            'prioridad': turno.prioridad,
+            'fecha_turno': turno.fecha_turno.isoformat() if turno.fecha_turno else None,
             'fecha_hora_creacion': turno.fecha_hora_creacion.isoformat() if turno.fecha_hora_creacion else None,
+            'fecha_hora_inicio_atencion': turno.fecha_hora_inicio_atencion.isoformat() if turno.fecha_hora_inicio_atencion else None,
         }
     except Exception as e:
-        print(f"Error al serializar turno {turno.id}: {e}")
+        logger.error(f"Error al serializar turno {turno.id}: {e}")
         return {
             'id': turno.id,
             'numero_visible': getattr(turno, 'numero_visible', '?'),
@@ -1,14 +1,15 @@
 ﻿from django.db import transaction
-from django.db.models import Max
 from django.utils import timezone
 from apps.core.models import (
     Turno,
     Ticket,
     Tramite,
     Persona,
-    EstadoTicket,
-    EstadoTurno,
 )
+from apps.core.estadisticas import registrar_transicion
+from apps.core.numeracion import siguiente_numero_visible
+from apps.core.resumenes import EMITIDO, registrar_hecho
+from apps.core.websocket_utils import emitir_turno_creado
 
 
 # ----------------------------------------------------------------------
@@ -40,33 +41,31 @@ def crear_turno(dni: str | None, tramite: Tramite):
             return turno_existente, False
 
         # Numeracion
-        ultimo = (
-            Turno.objects.filter(area=tramite.area, fecha_turno=hoy)
-            .aggregate(Max("numero_visible"))["numero_visible__max"] or 0
-        )
-        numero_visible = ultimo + 1
+        numero_visible = siguiente_numero_visible(tramite.area_id, hoy)
 
         # Ticket
-        estado_ticket_pend = EstadoTicket.objects.get(pk=Ticket.PENDIENTE)
         ticket = Ticket.objects.create(
             persona=persona,
             area=tramite.area,
             prioridad=0,
             fecha_creacion=hoy,
             fecha_hora_creacion=ahora,
-            estado=estado_ticket_pend,
+            estado_id=Ticket.PENDIENTE,
         )
 
         # Turno
-        estado_turno_pend = EstadoTurno.objects.get(pk=Turno.PENDIENTE)
         turno = Turno.objects.create(
             ticket=ticket,
             tramite=tramite,
             orden=1,
             area=tramite.area,
             numero_visible=numero_visible,
-            estado=estado_turno_pend,
+            estado_id=Turno.PENDIENTE,
+            prioridad=ticket.prioridad,
             fecha_turno=hoy,
             fecha_hora_creacion=ahora,
         )
+        transaction.on_commit(lambda: emitir_turno_creado(turno), robust=True)
+        transaction.on_commit(lambda: registrar_transicion(None, Turno.PENDIENTE, hoy), robust=True)
+        transaction.on_commit(lambda: registrar_hecho(turno, EMITIDO), robust=True)
         return turno, True
@@ -1,3 +1,36 @@
-from django.test import TestCase
+from django.urls import reverse
 
-# Create your tests here.
+from apps.core import services
+from apps.core.models import Turno
+from apps.core.tests.base import TurnosTestCase
+
+
+class MonitorSnapshotTests(TurnosTestCase):
+    def snapshot(self, **params):
+        return self.client.get(reverse("turnos:monitor_snapshot"), {"area": self.area.pk, **params})
+
+    def test_turnos_activos_del_area_sin_dni(self):
+        turno = self.crear_turno(hace_min=5)
+        self.crear_turno(area=self.otra_area, tramite=self.tramite_otra_area)
+        self.crear_turno(estado_id=Turno.FINALIZADO)
+
+        datos = self.snapshot().json()
+
+        self.assertEqual([t["id"] for t in datos["turnos"]], [turno.pk])
+        self.assertEqual(datos["turnos"][0]["persona"], {"nombre_completo": turno.ticket.persona.nombre_completo})
+
+    def test_con_la_secuencia_vigente_no_lee_los_turnos(self):
+        self.crear_turno()
+        seq = self.snapshot().json()["seq"]
+
+        with self.assertNumQueries(1):  # el Área
+            self.assertTrue(self.snapshot(seq=seq).json()["sin_cambios"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            services.llamar_proximo_turno(self.area, self.operador, self.mesa)
+        datos = self.snapshot(seq=seq).json()
+        self.assertNotIn("sin_cambios", datos)
+        self.assertEqual(datos["seq"], seq + 1)
+
+    def test_area_inexistente(self):
+        self.assertEqual(self.client.get(reverse("turnos:monitor_snapshot"), {"area": 999}).status_code, 404)
@@ -1,10 +1,8 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.http import JsonResponse
 from django.utils import timezone
-from datetime import timedelta
-from django.db.models import Max
-from apps.core.models import Tramite, Turno, Area, ConfiguracionArea, LlamadaTurno
-from apps.core import services
+from apps.core.models import Tramite, Turno, Area
+from apps.core import services, websocket_utils
 from .forms import SolicitudTurnoForm
 from .services import crear_turno
 
@@ -60,85 +58,75 @@ def confirmacion(request, pk):
 
 
 # ---------- MONITOR EN SALA DE ESPERA ----------
-def monitor(request):
-    hoy = timezone.localdate()
-    
-    # Obtener área (por query param o la primera activa)
+def _area_monitor(request):
+    """Área del monitor (por query param o la primera activa)."""
     area_id = request.GET.get('area')
     if area_id:
-        area = Area.objects.filter(pk=area_id, activa=True).first()
-    else:
-        area = Area.objects.filter(activa=True).first()
-    
+        return Area.objects.filter(pk=area_id, activa=True).first()
+    return Area.objects.filter(activa=True).first()
+
+
+def _particionar_snapshot(turnos):
+    """Separa los turnos activos del snapshot en las secciones del monitor."""
+    llamando = [t for t in turnos if t['estado_id'] == Turno.LLAMANDO]
+    atencion = [t for t in turnos if t['estado_id'] == Turno.EN_ATENCION]
+    pendientes = [t for t in turnos if t['estado_id'] == Turno.PENDIENTE]
+    llamando.sort(key=lambda t: t['fecha_hora_creacion'] or '', reverse=True)
+    atencion.sort(key=lambda t: t['fecha_hora_inicio_atencion'] or '', reverse=True)
+    return llamando[:4], atencion[:8], pendientes[:20]
+
+
+def monitor(request):
+    """
+    Render inicial del monitor. A partir de acá la pantalla se actualiza sólo
+    con los eventos WebSocket; ante un salto de secuencia o una reconexión
+    pide `monitor_snapshot` para resincronizar.
+    """
+    area = _area_monitor(request)
+
     # Obtener configuración del área
     config = services.obtener_config_area(area) if area else {}
     datos_llamada = services.obtener_datos_llamada(area) if area else {}
-    
-    # Turnos llamando (para mostrar en pantalla con alerta)
-    turnos_llamando = Turno.objects.filter(
-        fecha_turno=hoy,
-        estado_id=Turno.LLAMANDO,
-        **({"area": area} if area else {}),
-    ).select_related(
-        'ticket__persona', 'tramite', 'mesa_asignada'    ).annotate(
-        ultima_llamada_id=Max('llamadas__id')    ).order_by('-fecha_hora_creacion')[:4]
-    
-    # Turnos en atención
-    turnos_atencion = Turno.objects.filter(
-        fecha_turno=hoy,
-        estado_id=Turno.EN_ATENCION,
-        **({"area": area} if area else {}),
-    ).select_related(
-        'ticket__persona', 'tramite', 'mesa_asignada'
-    ).order_by('-fecha_hora_inicio_atencion')[:8]
-    
-    # Turnos pendientes (en espera)
-    turnos_pendientes = Turno.objects.filter(
-        fecha_turno=hoy,
-        estado_id=Turno.PENDIENTE,
-        **({"area": area} if area else {}),
-    ).select_related(
-        'ticket__persona', 'tramite'
-    ).order_by('fecha_hora_creacion')[:20]
-    
-    # Todos los turnos del día para la lista
-    lista = Turno.objects.filter(
-        fecha_turno=hoy,
-        **({"area": area} if area else {}),
-    ).select_related(
-        'ticket__persona', 'tramite', 'mesa_asignada', 'estado'
-    ).order_by("fecha_hora_creacion")
-    
-    # Llamadas recientes (últimos 30 segundos) para detección en tiempo real
-    # Incluye tanto LLAMADA como RELLAMADA
-    tiempo_ventana = timezone.now() - timedelta(seconds=30)
-    llamadas_recientes = LlamadaTurno.objects.filter(
-        fecha_hora__gte=tiempo_ventana,
-        turno__estado_id=Turno.LLAMANDO,
-        **({"turno__area": area} if area else {}),
-    ).select_related(
-        'turno__ticket__persona', 'turno__tramite', 'turno__mesa_asignada'
-    ).order_by('-fecha_hora')
-    
+
+    snapshot = services.obtener_snapshot_monitor(area) if area else {
+        'area_id': None, 'seq': 0, 'fecha': timezone.localdate().isoformat(), 'turnos': [],
+        'estimacion': None,
+    }
+    turnos_llamando, turnos_atencion, turnos_pendientes = _particionar_snapshot(snapshot['turnos'])
+
     context = {
-        'turnos': lista,
         'turnos_llamando': turnos_llamando,
         'turnos_atencion': turnos_atencion,
         'turnos_pendientes': turnos_pendientes,
-        'llamadas_recientes': llamadas_recientes,
-        'total_activos': Turno.objects.filter(
-            fecha_turno=hoy,
-            estado_id__in=[Turno.PENDIENTE, Turno.LLAMANDO, Turno.EN_ATENCION],
-            **({"area": area} if area else {}),
-        ).count(),
+        'total_activos': len(snapshot['turnos']),
+        'snapshot': snapshot,
         'area': area,
         'config': config,
         'datos_llamada': datos_llamada,
     }
-    
+
     return render(request, "turnos/monitor.html", context)
 
 
+def monitor_snapshot(request):
+    """
+    GET /turnos/monitor/snapshot/?area=<id>&seq=<n>
+    Resincronización del monitor. Si `seq` coincide con la secuencia vigente
+    del área responde sin leer los turnos (sólo se consulta el Área).
+    Público: los turnos van sin DNI (ver websocket_utils.version_publica).
+    """
+    area = _area_monitor(request)
+    if not area:
+        return JsonResponse({'error': 'Área no encontrada'}, status=404)
+
+    seq_cliente = request.GET.get('seq')
+    seq = websocket_utils.secuencia_actual(area.id)
+    if seq_cliente is not None and seq_cliente == str(seq):
+        return JsonResponse({'area_id': area.id, 'seq': seq, 'sin_cambios': True})
+
+    return JsonResponse(services.obtener_snapshot_monitor(area))
+
+
 # ---------- TRÁMITES EN FORMATO JSON ----------
 def tramites_json(request):
     data = [
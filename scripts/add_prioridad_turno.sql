@@ -0,0 +1,64 @@
+-- =====================================================================
+-- Script: Prioridad desnormalizada en Turno
+-- Versión de esquema: 1.5.0
+-- Fecha: 2026-10-18
+-- Descripción: Copia Ticket.Prioridad en Turno.Prioridad para que la
+--              selección del próximo turno sea un seek sobre
+--              (FkIdArea, FkIdEstadoTurno, Prioridad DESC, FechaHoraCreacion)
+--              sin JOIN a Ticket. Requiere create_indices_turno.sql (1.4.0).
+-- =====================================================================
+
+USE Turnero;
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.columns WHERE object_id = OBJECT_ID(N'[dbo].[Turno]') AND name = 'Prioridad')
+BEGIN
+    ALTER TABLE [dbo].[Turno]
+    ADD [Prioridad] INT NOT NULL CONSTRAINT [DF_Turno_Prioridad] DEFAULT 0;
+    PRINT '✓ Columna Turno.Prioridad agregada';
+END
+ELSE
+    PRINT '⚠ Columna Turno.Prioridad ya existe';
+GO
+
+-- Copiar la prioridad de los tickets existentes
+UPDATE t
+SET t.[Prioridad] = tk.[Prioridad]
+FROM [dbo].[Turno] t
+JOIN [dbo].[Ticket] tk ON tk.[IdTicket] = t.[FkIdTicket]
+WHERE t.[Prioridad] <> tk.[Prioridad];
+PRINT '✓ Prioridad copiada desde Ticket';
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Turno_Cola_Prioridad' AND object_id = OBJECT_ID(N'[dbo].[Turno]'))
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Turno_Cola_Prioridad]
+    ON [dbo].[Turno] ([FkIdArea], [FkIdEstadoTurno], [Prioridad] DESC, [FechaHoraCreacion])
+    INCLUDE ([FkIdTicket], [FkIdTramite], [NumeroVisible]);
+    PRINT '✓ IX_Turno_Cola_Prioridad creado';
+END
+GO
+
+-- Reemplazado por IX_Turno_Cola_Prioridad
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Turno_Cola_Llegada' AND object_id = OBJECT_ID(N'[dbo].[Turno]'))
+BEGIN
+    DROP INDEX [IX_Turno_Cola_Llegada] ON [dbo].[Turno];
+    PRINT '✓ IX_Turno_Cola_Llegada eliminado (reemplazado)';
+END
+GO
+
+-- =====================================================================
+-- VERSIÓN DEL ESQUEMA
+-- =====================================================================
+IF NOT EXISTS (SELECT * FROM dbo.SchemaVersion WHERE Version = '1.5.0')
+BEGIN
+    INSERT INTO dbo.SchemaVersion (Version, Descripcion)
+    VALUES ('1.5.0', 'Turno.Prioridad desnormalizada e índice de cola por prioridad');
+    PRINT '✓ Versión de esquema registrada: 1.5.0';
+END
+GO
+
+PRINT '========================================';
+PRINT 'Script completado exitosamente';
+PRINT '========================================';
+GO
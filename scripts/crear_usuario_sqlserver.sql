@@ -64,6 +64,7 @@ GRANT SELECT, INSERT, UPDATE, DELETE ON dbo.Turno                       TO [turn
 GRANT SELECT, INSERT, UPDATE, DELETE ON dbo.TurnoHistorialDerivacion    TO [turnero_user];
 GRANT SELECT, INSERT, UPDATE, DELETE ON dbo.ConfiguracionArea           TO [turnero_user];
 GRANT SELECT, INSERT, UPDATE, DELETE ON dbo.ConfiguracionAreaHistorial  TO [turnero_user];
+GRANT SELECT, INSERT, UPDATE, DELETE ON dbo.ContadorTurnoDiario         TO [turnero_user];
 PRINT '✓ Permisos CRUD en tablas principales';
 GO
 
@@ -0,0 +1,50 @@
+-- =====================================================================
+-- Script: Crear tabla ContadorTurnoDiario
+-- Fecha: 2026-10-18
+-- Descripción: Contador de numero_visible por área y día. Reemplaza el
+--              cálculo MAX(NumeroVisible)+1 sobre Turno al emitir.
+-- =====================================================================
+
+USE Turnero;
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.objects WHERE object_id = OBJECT_ID(N'[dbo].[ContadorTurnoDiario]') AND type in (N'U'))
+BEGIN
+    CREATE TABLE [dbo].[ContadorTurnoDiario] (
+        [IdContadorTurnoDiario] INT IDENTITY(1,1) NOT NULL,
+        [FkIdArea] INT NOT NULL,
+        [Fecha] DATE NOT NULL,
+        [UltimoNumero] INT NOT NULL DEFAULT 0,
+        CONSTRAINT [PK_ContadorTurnoDiario] PRIMARY KEY CLUSTERED ([IdContadorTurnoDiario] ASC),
+        CONSTRAINT [uq_contador_area_fecha] UNIQUE ([FkIdArea], [Fecha]),
+        CONSTRAINT [FK_ContadorTurnoDiario_Area]
+            FOREIGN KEY ([FkIdArea]) REFERENCES [dbo].[Area] ([IdArea])
+            ON DELETE CASCADE
+    );
+
+    PRINT '✓ Tabla ContadorTurnoDiario creada';
+END
+ELSE
+    PRINT '⚠ Tabla ContadorTurnoDiario ya existe';
+GO
+
+-- Inicializar el día en curso con los turnos ya emitidos
+INSERT INTO [dbo].[ContadorTurnoDiario] ([FkIdArea], [Fecha], [UltimoNumero])
+SELECT t.[FkIdArea], t.[FechaTurno], MAX(t.[NumeroVisible])
+FROM [dbo].[Turno] t
+WHERE t.[FechaTurno] = CAST(GETDATE() AS DATE)
+  AND NOT EXISTS (
+      SELECT 1 FROM [dbo].[ContadorTurnoDiario] c
+      WHERE c.[FkIdArea] = t.[FkIdArea] AND c.[Fecha] = t.[FechaTurno]
+  )
+GROUP BY t.[FkIdArea], t.[FechaTurno];
+PRINT '✓ Contadores del día inicializados';
+GO
+
+GRANT SELECT, INSERT, UPDATE, DELETE ON dbo.ContadorTurnoDiario TO [turnero_user];
+GO
+
+PRINT '========================================';
+PRINT 'Script completado exitosamente';
+PRINT '========================================';
+GO
@@ -0,0 +1,96 @@
+-- =====================================================================
+-- Script: Índices para las consultas frecuentes sobre Turno / Ticket
+-- Versión de esquema: 1.4.0
+-- Fecha: 2026-10-18
+-- Descripción: Un índice por cada forma de consulta que ejecuta la app.
+--              Deben coincidir (nombre y columnas clave) con Meta.indexes
+--              de Turno y Ticket en apps/core/models.py.
+--              Verificar con: python manage.py reportar_indices
+-- =====================================================================
+
+USE Turnero;
+GO
+
+-- Cola del área por estado y día: panel del operador, monitor,
+-- dashboard, vencimiento de pendientes anteriores
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Turno_Area_Estado_Fecha' AND object_id = OBJECT_ID(N'[dbo].[Turno]'))
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Turno_Area_Estado_Fecha]
+    ON [dbo].[Turno] ([FkIdArea], [FkIdEstadoTurno], [FechaTurno])
+    INCLUDE ([FkIdTicket], [NumeroVisible], [FechaHoraCreacion]);
+    PRINT '✓ IX_Turno_Area_Estado_Fecha creado';
+END
+GO
+
+-- Numeración visible del día (semilla de ContadorTurnoDiario)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Turno_Area_Fecha_Numero' AND object_id = OBJECT_ID(N'[dbo].[Turno]'))
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Turno_Area_Fecha_Numero]
+    ON [dbo].[Turno] ([FkIdArea], [FechaTurno], [NumeroVisible]);
+    PRINT '✓ IX_Turno_Area_Fecha_Numero creado';
+END
+GO
+
+-- Turno en curso del operador (LLAMANDO / EN_ATENCION)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Turno_Operador_Estado' AND object_id = OBJECT_ID(N'[dbo].[Turno]'))
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Turno_Operador_Estado]
+    ON [dbo].[Turno] ([FkIdOperador], [FkIdEstadoTurno]);
+    PRINT '✓ IX_Turno_Operador_Estado creado';
+END
+GO
+
+-- Turno activo / turnos del día de una persona en el área:
+-- Ticket por persona y Turno por ticket
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Ticket_Persona_Area' AND object_id = OBJECT_ID(N'[dbo].[Ticket]'))
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Ticket_Persona_Area]
+    ON [dbo].[Ticket] ([FkIdPersona], [FkIdArea]);
+    PRINT '✓ IX_Ticket_Persona_Area creado';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Turno_Ticket_Estado' AND object_id = OBJECT_ID(N'[dbo].[Turno]'))
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Turno_Ticket_Estado]
+    ON [dbo].[Turno] ([FkIdTicket], [FkIdEstadoTurno])
+    INCLUDE ([FkIdArea], [FechaTurno]);
+    PRINT '✓ IX_Turno_Ticket_Estado creado';
+END
+GO
+
+-- Próximo turno: pendientes del área en orden de llegada
+-- (la prioridad se toma de Ticket por la PK)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Turno_Cola_Llegada' AND object_id = OBJECT_ID(N'[dbo].[Turno]'))
+BEGIN
+    CREATE NONCLUSTERED INDEX [IX_Turno_Cola_Llegada]
+    ON [dbo].[Turno] ([FkIdArea], [FkIdEstadoTurno], [FechaHoraCreacion])
+    INCLUDE ([FkIdTicket]);
+    PRINT '✓ IX_Turno_Cola_Llegada creado';
+END
+GO
+
+-- IX_Turno_Cola (FkIdArea, FkIdEstadoTurno) queda cubierto por los
+-- índices anteriores: sólo suma costo de escritura
+IF EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_Turno_Cola' AND object_id = OBJECT_ID(N'[dbo].[Turno]'))
+BEGIN
+    DROP INDEX [IX_Turno_Cola] ON [dbo].[Turno];
+    PRINT '✓ IX_Turno_Cola eliminado (redundante)';
+END
+GO
+
+-- =====================================================================
+-- VERSIÓN DEL ESQUEMA
+-- =====================================================================
+IF NOT EXISTS (SELECT * FROM dbo.SchemaVersion WHERE Version = '1.4.0')
+BEGIN
+    INSERT INTO dbo.SchemaVersion (Version, Descripcion)
+    VALUES ('1.4.0', 'Índices de consultas frecuentes sobre Turno y Ticket');
+    PRINT '✓ Versión de esquema registrada: 1.4.0';
+END
+GO
+
+PRINT '========================================';
+PRINT 'Script completado exitosamente';
+PRINT '========================================';
+GO
@@ -10,6 +10,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'turnero.settings')
 django.setup()
 
 from django.db import connections
+from apps.core.models import ConfiguracionArea
 
 SQL_STATEMENTS = [
     # 1. Borrar historial que referencia la tabla vieja
@@ -107,6 +108,9 @@ def main():
             print(f"  ✗ ERROR: {e}")
             raise
     
+    # Descartar configuraciones cacheadas (en todos los procesos si la caché es compartida)
+    ConfiguracionArea.invalidar_cache()
+
     # Verificar resultado
     cursor.execute("SELECT COUNT(*) FROM ConfiguracionArea")
     result = cursor.fetchone()
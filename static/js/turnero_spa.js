@@ -34,14 +34,16 @@ document.addEventListener("DOMContentLoaded", () => {
       headers:{"Content-Type":"application/json","X-CSRFToken":csrftoken},
       body:JSON.stringify({dni:parseInt(dniInput.value,10)})
     })
-    .then(r=>r.json().then(d=>({ok:r.ok, data:d})))
-    .then(({ok,data})=>{
-        if(!ok) return Promise.reject(data.detail || "Error");
+    .then(r=>r.json().then(d=>({ok:r.ok, status:r.status, data:d})))
+    .then(({ok,status,data})=>{
+        // 503: padrón caído y DNI desconocido → se sigue sólo con el DNI
+        const sinPadron = status === 503;
+        if(!ok && !sinPadron) return Promise.reject(data.detail || "Error");
         personaData = {
           dni: dniInput.value,
-          nombre: data.nombre,
-          apellido: data.apellido,
-          nombreCompleto: `${data.apellido}, ${data.nombre}`,
+          nombre: data.nombre || '',
+          apellido: data.apellido || '',
+          nombreCompleto: sinPadron ? `DNI ${dniInput.value}` : `${data.apellido}, ${data.nombre}`,
           fechaNac: data.fecha_nacimiento || '',
           sexo: data.sexo || ''
         };
@@ -97,7 +99,7 @@ document.addEventListener("DOMContentLoaded", () => {
     .then(r=>r.json().then(d=>({ok:r.ok,data:d})))
     .then(({ok,data})=>{
         if(!ok) return Promise.reject(data.detail||"Error");
-        mostrarPantallaOK(personaData.nombreCompleto,catNombre,data.espera,15);
+        mostrarPantallaOK(personaData.nombreCompleto,catNombre,data.espera,15,data.espera_estimada_min,data.espera_estimada_max_min);
         show("#pantalla-ok");
     })
     .catch(err=>showAlert(err,"warning"));
@@ -112,10 +114,15 @@ document.addEventListener("DOMContentLoaded", () => {
   }
 
   /* pantalla OK */
-  function mostrarPantallaOK(nombre,categoria,espera,seg=15){
+  function mostrarPantallaOK(nombre,categoria,espera,seg=15,minutos=null,minutosMax=null){
     $("#ok-nombre").textContent=nombre;
     $("#ok-cat").textContent=categoria;
-    $("#ok-espera").innerHTML=`Tiene <strong>${espera}</strong> persona(s) en espera antes que usted.`;
+    let texto=`Tiene <strong>${espera}</strong> persona(s) en espera antes que usted.`;
+    if(espera>0&&minutos!=null){
+      const rango=minutosMax>minutos?`${minutos} a ${minutosMax}`:`${minutos}`;
+      texto+=`<br>Espera estimada: <strong>${rango} min</strong>.`;
+    }
+    $("#ok-espera").innerHTML=texto;
     const c=$("#ok-countdown"),n=$("#count-num");let t=seg;
     c.classList.remove("visually-hidden");n.textContent=t;
     if(countdownId)clearInterval(countdownId);
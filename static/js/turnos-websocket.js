@@ -6,6 +6,8 @@
 class TurnosWebSocket {
     constructor(options = {}) {
         this.options = {
+            // Ruta del socket: '/ws/turnos/area/<id>/' o '/ws/turnos/?area=<id>&operador=<id>'
+            path: '/ws/turnos/',
             reconnectInterval: 3000,
             maxReconnectAttempts: 5,
             debug: false,
@@ -37,7 +39,7 @@ class TurnosWebSocket {
     connect() {
         try {
             const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-            const wsUrl = `${protocol}//${window.location.host}/ws/turnos/`;
+            const wsUrl = `${protocol}//${window.location.host}${this.options.path}`;
             
             this.log('Conectando a WebSocket...', wsUrl);
             
@@ -120,6 +122,12 @@ class TurnosWebSocket {
                     }
                     break;
                     
+                case 'turnos_vencidos':
+                    if (this.options.onTurnosVencidos) {
+                        this.options.onTurnosVencidos(data);
+                    }
+                    break;
+                    
                 case 'stats_actualizadas':
                     if (this.options.onStatsActualizadas) {
                         this.options.onStatsActualizadas(data);
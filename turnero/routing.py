@@ -8,5 +8,8 @@ from apps.core import consumers
 
 websocket_urlpatterns = [
     # WebSocket para actualizaciones de turnos (Monitor y Operador)
+    # Suscripción por query string (?area=&mesa=&operador=) o mensaje "subscribe"
     re_path(r'ws/turnos/$', consumers.TurnosConsumer.as_asgi()),
+    # Suscripción directa a un área (monitores)
+    re_path(r'ws/turnos/area/(?P<area>\d+)/$', consumers.TurnosConsumer.as_asgi()),
 ]
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     "rest_framework",
     "api",
     "widget_tweaks",
+    "channels",
 ]
 
 
@@ -80,6 +81,49 @@ LOGOUT_REDIRECT_URL = "/login/"
 
 
 WSGI_APPLICATION = 'turnero.wsgi.application'
+ASGI_APPLICATION = 'turnero.asgi.application'
+
+
+# --- Tiempo real (Channels) ---
+# Sin REDIS_URL: capa en memoria y caché local (un solo proceso uvicorn).
+# Con REDIS_URL: capa y caché compartidas entre procesos/servidores; la caché
+# guarda la secuencia de eventos por área que usan los monitores.
+REDIS_URL = env('REDIS_URL', default='')
+
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [REDIS_URL]},
+        },
+    }
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        # Búsquedas de personas en Aportes (apps.core.services_aportes), aparte
+        # de las claves de coordinación del `default`. Sin Redis la caché de
+        # personas es sólo del proceso.
+        'personas': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'personas',
+        },
+        # Registro de eventos de la cola en memoria (apps.core.cola): los demás
+        # procesos aplican los eventos que no vieron sin volver a la BD
+        'cola': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'cola',
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
 
 
 # Database
@@ -93,6 +137,24 @@ DATABASES_SQLITE = {
     }
 }
 
+# Conexiones persistentes (por alias, desde .env)
+# Cada thread reutiliza su conexión ODBC (TLS / Trusted_Connection) hasta
+# CONN_MAX_AGE segundos en lugar de abrir una por request; CONN_HEALTH_CHECKS
+# la verifica antes de reutilizarla tras un corte. Además, el driver manager de
+# ODBC mantiene su propio pool (ODBC_POOLING, ver apps.core.apps) que descarta
+# las conexiones ociosas. Conexiones por proceso ≤ threads que usan la BD:
+# los del executor en que uvicorn corre las vistas sync (ASGI_THREADS). La
+# variante async de Aportes (services_aportes.abuscar_persona_por_dni) usa
+# database_sync_to_async, que cierra las conexiones vencidas de su thread.
+def _conexion_persistente(prefijo: str) -> dict:
+    return {
+        'CONN_MAX_AGE': env.int(f'{prefijo}_CONN_MAX_AGE', default=300),
+        'CONN_HEALTH_CHECKS': env.bool(f'{prefijo}_CONN_HEALTH_CHECKS', default=True),
+    }
+
+
+ODBC_POOLING = env.bool('ODBC_POOLING', default=True)
+
 # SQL Server (producción)
 DATABASES = {
     'default': {
@@ -102,6 +164,7 @@ DATABASES = {
         'PASSWORD': env('SQL_PASS'),
         'HOST': env('DB_HOST'),
         'PORT': '',
+        **_conexion_persistente('DB'),
         'OPTIONS': {
             'driver': env('DB_DRIVER'),
             'extra_params': 'TrustServerCertificate=yes',
@@ -113,14 +176,66 @@ DATABASES = {
         'NAME': 'Aportes',
         'HOST': env('APORTES_DB_HOST'),
         'PORT': '',
+        **_conexion_persistente('APORTES'),
         'OPTIONS': {
             'driver': env('DB_DRIVER'),
             'extra_params': 'TrustServerCertificate=yes;Trusted_Connection=yes',
+            # Segundos: un Aportes lento no debe retener el worker
+            'connection_timeout': env.int('APORTES_CONNECT_TIMEOUT', default=3),
+            'query_timeout': env.int('APORTES_QUERY_TIMEOUT', default=3),
         },
     }
 }
 
 
+# Segundos que cada proceso reutiliza ConfiguracionArea sin volver a consultar.
+# Guardar desde el admin la invalida en el acto (en todos los procesos si hay Redis).
+CONFIG_AREA_CACHE_TTL = env.int('CONFIG_AREA_CACHE_TTL', default=30)
+
+# Segundos que cada proceso reutiliza la identidad (roles, mesa) de un usuario.
+# Se recarga al iniciar sesión y al editar Usuario/Rol/Mesa desde el admin.
+IDENTIDAD_CACHE_TTL = env.int('IDENTIDAD_CACHE_TTL', default=60)
+
+# Segundos que cada proceso reutiliza el perfil de ruteo (trámites y pesos) de
+# una mesa/operador. Se recarga al editar Mesa/Trámite/Usuario desde el admin.
+RUTEO_CACHE_TTL = env.int('RUTEO_CACHE_TTL', default=60)
+
+# Cola en memoria por área (apps.core.cola): se mantiene con los eventos de
+# turno y cada tantos segundos se rehidrata desde la BD para corregir desvíos.
+COLA_RECONCILIACION_SEG = env.int('COLA_RECONCILIACION_SEG', default=300)
+# Con REDIS_URL: cuánto se guarda cada evento para los demás procesos y cuántos
+# eventos atrasados se aplican antes de preferir rehidratar
+COLA_EVENTOS_TTL_SEG = env.int('COLA_EVENTOS_TTL_SEG', default=600)
+COLA_EVENTOS_MAX = env.int('COLA_EVENTOS_MAX', default=500)
+
+# Espera estimada (apps.core.estimacion): peso de cada atención nueva en el
+# promedio móvil, muestras antes de "olvidar" la mitad del histograma, y
+# segundos sin llamar/finalizar tras los que una mesa deja de contar como activa.
+ESTIMACION_ALFA = env.float('ESTIMACION_ALFA', default=0.2)
+ESTIMACION_VENTANA = env.int('ESTIMACION_VENTANA', default=500)
+ESTIMACION_VENTANA_MESAS_SEG = env.int('ESTIMACION_VENTANA_MESAS_SEG', default=900)
+
+# Días que se conservan los eventos de LlamadaTurno (los borra el comando
+# limpiar_llamadas, programado fuera del horario de atención). Default 1: las
+# últimas 24 h, lo que conservaba la limpieza que antes corría en cada llamada.
+LLAMADAS_RETENCION_DIAS = env.int('LLAMADAS_RETENCION_DIAS', default=1)
+
+# Estadísticas del dashboard: las transiciones ajustan el snapshot en caché;
+# cada tantos segundos se recalcula entero con una consulta.
+DASHBOARD_STATS_TTL = env.int('DASHBOARD_STATS_TTL', default=300)
+
+# Caché de búsquedas de persona en Aportes (segundos / cantidad de DNIs por proceso).
+# Los DNIs no encontrados se recuerdan menos tiempo para no demorar altas recientes.
+APORTES_CACHE_TTL = env.int('APORTES_CACHE_TTL', default=600)
+APORTES_CACHE_TTL_NEGATIVO = env.int('APORTES_CACHE_TTL_NEGATIVO', default=60)
+APORTES_CACHE_MAX = env.int('APORTES_CACHE_MAX', default=5000)
+
+# Circuit breaker de Aportes: fallos seguidos para abrirlo y segundos hasta reintentar.
+# Con el circuito abierto las búsquedas usan la tabla local Persona.
+APORTES_CIRCUITO_FALLOS = env.int('APORTES_CIRCUITO_FALLOS', default=5)
+APORTES_CIRCUITO_REINTENTO = env.int('APORTES_CIRCUITO_REINTENTO', default=30)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
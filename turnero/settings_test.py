@@ -0,0 +1,36 @@
+#turnero/settings_test.py
+"""
+Settings para correr los tests sin SQL Server ni Redis:
+
+    python manage.py test -t . apps/core apps/turnos apps/atencion apps/administracion \
+        --settings=turnero.settings_test
+
+Usa DATABASES_SQLITE (y una base SQLite para el alias `aportes`, que los
+tests no consultan) y caché/capa de Channels en memoria. Las migraciones de
+core no describen las tablas managed=False del esquema existente: la base de
+prueba se arma desde los modelos y esas tablas las crea apps.core.tests.base.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES_SQLITE
+
+DATABASES = {
+    **DATABASES_SQLITE,
+    'aportes': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'aportes.sqlite3',
+    },
+}
+
+MIGRATION_MODULES = {'core': None}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels.layers.InMemoryChannelLayer',
+    },
+}